@@ -0,0 +1,26 @@
+"""Stand-in for Blender's 'blf' module. Calls are counted so that drawing code can be measured."""
+
+from typing import Dict, Tuple
+
+calls: Dict[str, int] = {}
+_fonts: Dict[str, int] = {}
+
+def _count(name: str) -> None: calls[name] = calls.get(name, 0) + 1
+
+def load(filepath: str) -> int:
+    _count('load')
+    if filepath not in _fonts: _fonts[filepath] = len(_fonts) + 1
+    return _fonts[filepath]
+
+def unload(filepath: str) -> None:
+    _count('unload')
+    _fonts.pop(filepath, None)
+
+def position(fontid: int, x: float, y: float, z: float) -> None: _count('position')
+def color(fontid: int, r: float, g: float, b: float, a: float) -> None: _count('color')
+def size(fontid: int, size: float) -> None: _count('size')
+def draw(fontid: int, text: str) -> None: _count('draw')
+
+def dimensions(fontid: int, text: str) -> Tuple[float, float]:
+    _count('dimensions')
+    return (len(text) * 7.0, 10.0)
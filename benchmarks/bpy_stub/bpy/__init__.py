@@ -0,0 +1,65 @@
+"""Minimal stand-in for Blender's 'bpy' module used by the benchmarks.
+
+Only the parts used by the manager are implemented, and they do no real work,
+so the measured time is the time spent in the manager itself.
+"""
+
+from . import types, utils, props, app, path
+
+class _Area:
+    def __init__(self, type: str = 'VIEW_3D') -> None:
+        self.type = type
+        self.redraw_count = 0
+
+    def tag_redraw(self) -> None: self.redraw_count += 1
+
+class _KeyMapItems(list): # type: ignore
+    def new(self, idname: str, type: str, value: str, **kwargs): # type: ignore
+        item = types.KeyMapItem()
+        item.idname, item.type, item.value = idname, type, value # type: ignore
+        item.__dict__.update(kwargs)
+        self.append(item)
+        return item
+
+    def remove(self, item) -> None: # type: ignore
+        super().remove(item)
+        item.__class__ = _RemovedStruct #Blenderと同じく、削除したアイテムの属性は読めなくなる
+
+class _RemovedStruct:
+    def __getattribute__(self, name: str): # type: ignore
+        raise ReferenceError('StructRNA of type KeyMapItem has been removed')
+
+class _KeyMaps(dict): # type: ignore
+    def new(self, name: str, space_type: str = 'EMPTY', region_type: str = 'WINDOW', modal: bool = False, tool: bool = False): # type: ignore
+        keymap = self.get((name, space_type, region_type))
+        if keymap is None:
+            keymap = types.KeyMap()
+            keymap.name, keymap.keymap_items = name, _KeyMapItems() # type: ignore
+            self[(name, space_type, region_type)] = keymap
+        return keymap
+
+class _KeyConfig:
+    def __init__(self) -> None: self.keymaps = _KeyMaps()
+
+class _KeyConfigs:
+    def __init__(self) -> None: self.addon = _KeyConfig()
+
+class _Screen:
+    def __init__(self) -> None: self.areas = [_Area()]
+
+class _Window:
+    def __init__(self) -> None: self.screen = _Screen()
+
+class _WindowManager:
+    def __init__(self) -> None:
+        self.keyconfigs = _KeyConfigs()
+        self.windows = [_Window()]
+
+class _Context:
+    def __init__(self) -> None:
+        self.window_manager = _WindowManager()
+        self.area = self.window_manager.windows[0].screen.areas[0]
+        self.region = None
+        self.scene = types.Scene()
+
+context = _Context()
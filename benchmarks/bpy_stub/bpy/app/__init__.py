@@ -0,0 +1,5 @@
+"""Stand-in for 'bpy.app'."""
+
+from . import translations, timers, handlers
+
+version = (4, 1, 0)
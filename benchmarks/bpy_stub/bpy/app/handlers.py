@@ -0,0 +1,12 @@
+"""Stand-in for 'bpy.app.handlers' (only the lists used by the manager)."""
+
+from typing import Any, Callable, List
+
+load_pre: List[Callable[..., Any]] = []
+load_post: List[Callable[..., Any]] = []
+save_pre: List[Callable[..., Any]] = []
+save_post: List[Callable[..., Any]] = []
+depsgraph_update_post: List[Callable[..., Any]] = []
+frame_change_post: List[Callable[..., Any]] = []
+
+def persistent(func: Callable[..., Any]) -> Callable[..., Any]: return func
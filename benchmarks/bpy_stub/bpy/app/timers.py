@@ -0,0 +1,40 @@
+"""Stand-in for 'bpy.app.timers'. Timers only run when 'run_pending()' is called.
+
+Like Blender, timers are identified by the identity of the function object.
+"""
+
+from typing import Any, Callable, List
+
+_timers: List[List[Any]] = [] #[関数, 間隔]
+
+def _find(function: Callable[[], Any]) -> List[Any] | None:
+    return next((timer for timer in _timers if timer[0] is function), None)
+
+def register(function: Callable[[], Any], first_interval: float = 0, persistent: bool = False) -> None:
+    timer = _find(function)
+    if timer is None: _timers.append([function, first_interval])
+    else: timer[1] = first_interval
+
+def unregister(function: Callable[[], Any]) -> None:
+    timer = _find(function)
+    if timer is None: raise ValueError('Error: function is not registered')
+    _timers.remove(timer)
+
+def is_registered(function: Callable[[], Any]) -> bool: return _find(function) is not None
+
+def run_pending(limit: int = 100000) -> int:
+    """Call every registered timer until all of them have finished (ignoring the intervals)
+
+    Returns:
+        int: Number of timer calls
+    """
+    count = 0
+    while _timers and count < limit:
+        for timer in list(_timers):
+            if not any(t is timer for t in _timers): continue
+            interval = timer[0]()
+            count += 1
+            if interval is None:
+                if any(t is timer for t in _timers): _timers.remove(timer)
+            else: timer[1] = interval
+    return count
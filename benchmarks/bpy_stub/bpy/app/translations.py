@@ -0,0 +1,11 @@
+"""Stand-in for 'bpy.app.translations'."""
+
+from typing import Any, Dict
+
+_tables: Dict[str, Any] = {}
+
+def register(module_name: str, translations_dict: Any) -> None:
+    if module_name in _tables: raise ValueError(f'add-on "{module_name}" has already registered translations')
+    _tables[module_name] = translations_dict
+
+def unregister(module_name: str) -> None: _tables.pop(module_name, None)
@@ -0,0 +1,5 @@
+"""Stand-in for 'bpy.path'."""
+
+import os
+
+def abspath(path: str) -> str: return os.path.abspath(path[2:] if path.startswith('//') else path)
@@ -0,0 +1,27 @@
+"""Stand-in for 'bpy.props'. Each function returns a deferred property that keeps its arguments."""
+
+from typing import Any
+
+class _DeferredProperty:
+    def __init__(self, function: str, keywords: Any) -> None:
+        self.function = function
+        self.keywords = keywords
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _DeferredProperty) and self.function == other.function and self.keywords == other.keywords
+
+    def __repr__(self) -> str: return f'{self.function}({self.keywords})'
+
+def _property(function: str) -> Any:
+    return lambda **keywords: _DeferredProperty(function, keywords)
+
+BoolProperty = _property('BoolProperty')
+BoolVectorProperty = _property('BoolVectorProperty')
+CollectionProperty = _property('CollectionProperty')
+EnumProperty = _property('EnumProperty')
+FloatProperty = _property('FloatProperty')
+FloatVectorProperty = _property('FloatVectorProperty')
+IntProperty = _property('IntProperty')
+IntVectorProperty = _property('IntVectorProperty')
+PointerProperty = _property('PointerProperty')
+StringProperty = _property('StringProperty')
@@ -0,0 +1,25 @@
+"""Stand-in for 'bpy.types'. Every attribute is a distinct class that is created on first access."""
+
+from typing import Any, Dict, List
+
+class bpy_struct:
+    is_registered: bool = False
+
+class _Space(bpy_struct):
+    _handlers: List[Any] = []
+
+    @classmethod
+    def draw_handler_add(cls, func: Any, args: Any, region_type: str, draw_type: str) -> Any:
+        handler = (func, args, region_type, draw_type)
+        cls._handlers.append(handler)
+        return handler
+
+    @classmethod
+    def draw_handler_remove(cls, handler: Any, region_type: str) -> None: cls._handlers.remove(handler)
+
+_classes: Dict[str, type] = {}
+
+def __getattr__(name: str) -> type:
+    if name.startswith('__'): raise AttributeError(name)
+    if name not in _classes: _classes[name] = type(name, (_Space if name.startswith('Space') else bpy_struct, ), {'__module__': __name__})
+    return _classes[name]
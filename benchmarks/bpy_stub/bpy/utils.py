@@ -0,0 +1,9 @@
+"""Stand-in for 'bpy.utils'. Registration only toggles 'is_registered', like Blender it rejects duplicates."""
+
+def register_class(cls: type) -> None:
+    if cls.__dict__.get('is_registered'): raise ValueError(f'register_class(...): already registered as a subclass "{cls.__name__}"')
+    cls.is_registered = True # type: ignore
+
+def unregister_class(cls: type) -> None:
+    if not cls.__dict__.get('is_registered'): raise RuntimeError(f'unregister_class(...): missing bl_rna attribute from "{cls.__name__}"')
+    cls.is_registered = False # type: ignore
@@ -0,0 +1,198 @@
+"""Benchmarks of the add-on manager outside Blender.
+
+A synthetic add-on tree is generated for each size, and discovery, classification, registration,
+reload and unregistration are run against the 'bpy' stand-in in 'bpy_stub'.
+Each run is executed in a fresh process so that no module is already imported.
+
+Examples:
+    python benchmarks/run.py --modules 10 100 1000 --repeat 5 --output baseline.json
+    python benchmarks/run.py --modules 10 100 1000 --repeat 5 --compare baseline.json --threshold 0.2
+"""
+
+from typing import Any, Dict, List
+
+import os
+import sys
+import json
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from time import perf_counter_ns
+from os.path import dirname, join, abspath
+
+BENCH_DIR = dirname(abspath(__file__))
+STUB_DIR = join(BENCH_DIR, 'bpy_stub')
+PACKAGE = 'bench_addon'
+TARGET_DIR = 'operators'
+
+FORMAT_VERSION = 1
+
+def main(argv: List[str] | None = None) -> int:
+    args = _parse_args(argv)
+
+    if args.worker: return _worker(json.loads(args.worker))
+
+    results: Dict[str, Dict[str, float]] = {}
+    for modules in args.modules:
+        config = {
+            'shape': {
+                'modules': modules, 'depth': args.depth, 'per_dir': args.per_dir, 'classes': args.classes,
+                'priority_ratio': args.priority_ratio, 'helper_ratio': args.helper_ratio, 'ignore_ratio': args.ignore_ratio,
+                'keymap_ratio': args.keymap_ratio, 'vendor_files': args.vendor_files, 'seed': args.seed,
+            },
+            'touch': args.touch, 'keys': args.keys, 'is_static_scan': args.static_scan, 'is_cache': args.cache,
+        }
+
+        runs = [_run_worker(config) for _ in range(args.repeat)]
+        #各指標の中央値を使う
+        results[f'modules={modules}'] = {metric: statistics.median(run[metric] for run in runs) for metric in runs[0]}
+        print(_format_case(f'modules={modules}', results[f'modules={modules}']))
+
+    baseline = {'version': FORMAT_VERSION, 'python': platform.python_version(), 'platform': platform.platform(), 'repeat': args.repeat, 'results': results}
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            return _compare(json.load(f), baseline, args.threshold, args.min_ms)
+
+    return 0
+
+def _parse_args(argv: List[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Benchmark the add-on manager with synthetic add-on trees.')
+    parser.add_argument('--modules', type=int, nargs='+', default=[10, 100, 1000], help='Number of modules of each generated tree (10 - 10000)')
+    parser.add_argument('--depth', type=int, default=3, help='Maximum folder depth')
+    parser.add_argument('--per-dir', type=int, default=20, help='Modules per folder')
+    parser.add_argument('--classes', type=int, default=2, help='Classes per module')
+    parser.add_argument('--priority-ratio', type=float, default=0.3, help='Ratio of classes with the priority decorator')
+    parser.add_argument('--helper-ratio', type=float, default=0.2, help='Ratio of modules without add-on classes')
+    parser.add_argument('--ignore-ratio', type=float, default=0.05, help='Ratio of modules listed in ignore lists')
+    parser.add_argument('--keymap-ratio', type=float, default=0.2, help='Ratio of modules that add a keymap in register()')
+    parser.add_argument('--vendor-files', type=int, default=0, help='Files in an ignored vendor folder')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--touch', type=int, default=5, help='Modules modified before reload_changed()')
+    parser.add_argument('--keys', type=int, default=1000, help='Keymap items added in the KeymapManager benchmark')
+    parser.add_argument('--static-scan', action='store_true', help="Enable 'is_static_scan'")
+    parser.add_argument('--cache', action='store_true', help='Enable the discovery cache and also measure a warm load')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per size. The median is reported.')
+    parser.add_argument('--output', help='Write the results as a JSON baseline')
+    parser.add_argument('--compare', help='Compare the results with a JSON baseline and exit with 1 on regressions')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed relative slowdown (0.25 = 25%%)')
+    parser.add_argument('--min-ms', type=float, default=1.0, help='Slowdowns smaller than this are not reported')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+def _run_worker(config: Dict[str, Any]) -> Dict[str, float]:
+    """Run one benchmark in a new process"""
+    proc = subprocess.run([sys.executable, abspath(__file__), '--worker', json.dumps(config)], capture_output=True, text=True)
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stdout + proc.stderr)
+        raise RuntimeError(f'The benchmark process failed with exit code {proc.returncode}.')
+
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def _worker(config: Dict[str, Any]) -> int:
+    """Measure each phase (executed in the benchmark process)"""
+    sys.path.insert(0, STUB_DIR)
+    sys.path.insert(0, BENCH_DIR)
+    sys.dont_write_bytecode = True
+
+    from tree_gen import TreeShape, generate # type: ignore
+
+    with tempfile.TemporaryDirectory(prefix='addon_bench_') as tmp:
+        init_path = generate(tmp, TreeShape(**config['shape']), PACKAGE, TARGET_DIR)
+        sys.path.insert(0, tmp)
+
+        from bench_addon.manager.core.addon_manager import AddonManager # type: ignore
+        from bench_addon.manager.core.proc_loader import ProcLoader # type: ignore
+        from bench_addon.manager.core.profiler import Profiler # type: ignore
+        from bench_addon.manager.core.keymap_manager import Key, KeymapManager # type: ignore
+        from bpy.types import Operator # type: ignore
+
+        cache_path = join(tmp, 'discovery_cache.json') if config['is_cache'] else None
+        profiler = Profiler(is_import_tree=False)
+        result: Dict[str, float] = {}
+
+        with _timer(result, 'load'):
+            manager = AddonManager(init_path, [TARGET_DIR], PACKAGE, is_debug_mode=True, cache_path=cache_path,
+                                   is_static_scan=config['is_static_scan'], profiler=profiler)
+        with _timer(result, 'register'): manager.register()
+
+        #ファイルを書き換えてから変更されたモジュールだけ再読込する
+        _touch(join(tmp, PACKAGE, TARGET_DIR), config['touch'])
+        with _timer(result, 'reload_changed'): result['reloaded_modules'] = len(manager.reload_changed())
+
+        with _timer(result, 'unregister'): manager.unregister()
+
+        for phase in ('discovery', 'import', 'classify'):
+            result[phase] = profiler.report()['phases'].get(phase, {}).get('total_ms', 0.0)
+
+        if cache_path:
+            loader = ProcLoader(init_path, is_debug_mode=True, cache_path=cache_path, is_static_scan=config['is_static_scan'])
+            with _timer(result, 'discovery_warm'): loader.load_files([TARGET_DIR])
+
+        #キーマップの追加と解除
+        operators = [type(f'BENCH_OT_key{i}', (Operator, ), {'bl_idname': f'bench.key{i}'}) for i in range(config['keys'])]
+        with _timer(result, 'keymap_add'):
+            for i, op in enumerate(operators): KeymapManager().add(Key(op, f'F{i % 12 + 1}'))
+        with _timer(result, 'keymap_unregister'): KeymapManager().unregister()
+
+    print(json.dumps(result))
+    return 0
+
+class _timer:
+    """Store the elapsed time of the block in milliseconds"""
+
+    def __init__(self, result: Dict[str, float], name: str) -> None:
+        self.__result, self.__name = result, name
+
+    def __enter__(self) -> None: self.__start = perf_counter_ns()
+    def __exit__(self, *args: Any) -> None: self.__result[self.__name] = (perf_counter_ns() - self.__start) / 1e6
+
+def _touch(root: str, count: int) -> None:
+    """Modify the first 'count' modules that define add-on classes"""
+    touched = 0
+    for cur, dirs, files in os.walk(root):
+        dirs.sort()
+        for file in sorted(files):
+            if touched >= count: return
+            path = join(cur, file)
+            with open(path, 'r', encoding='utf-8') as f:
+                if 'class BENCH_OT_' not in f.read(): continue
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write('\n#touched\n') #サイズが変わるので更新時刻の分解能に依存しない
+            touched += 1
+
+def _format_case(name: str, result: Dict[str, float]) -> str:
+    return f'{name}\n' + '\n'.join(f'  {metric:<20}{value:>12.3f}' for metric, value in result.items())
+
+def _compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float, min_ms: float) -> int:
+    """Print the differences from the baseline and return 1 if a metric regressed"""
+    regressions: List[str] = []
+    for case, metrics in current['results'].items():
+        base = baseline.get('results', {}).get(case)
+        if base is None:
+            print(f'{case}: not in the baseline')
+            continue
+
+        for metric, value in metrics.items():
+            if metric not in base or metric == 'reloaded_modules': continue
+            old = base[metric]
+            ratio = value / old if old > 0 else float('inf') if value > 0 else 1.0
+            is_regression = ratio > 1 + threshold and value - old > min_ms
+            if is_regression: regressions.append(f'{case} {metric}')
+            print(f'{case:<16}{metric:<20}{old:>12.3f}{value:>12.3f}{ratio:>8.2f}x{"  REGRESSION" if is_regression else ""}')
+
+    if regressions:
+        print(f'{len(regressions)} regression(s): ' + ', '.join(regressions))
+        return 1
+
+    print('No regressions.')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
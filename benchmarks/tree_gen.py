@@ -0,0 +1,136 @@
+"""Generates synthetic add-on trees for the benchmarks.
+
+The generated add-on has the following structure. The 'manager' folder is linked (or copied) from this repository.
+
+    <out>/<package>/
+        __init__.py
+        manager/
+        operators/            (target directory)
+            __init__.py       (ignore list)
+            d0/d1/.../m<N>.py (modules nested up to 'depth' levels)
+            vendor_lib/       (files that are only reached if the ignore rules are not applied)
+"""
+
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List
+
+import os
+import random
+import shutil
+from os.path import dirname, join, abspath
+
+MANAGER_DIR = join(dirname(dirname(abspath(__file__))), 'manager')
+
+@dataclass
+class TreeShape:
+    """Shape of a synthetic add-on tree
+    """
+
+    modules:        int   = 100   #モジュール数
+    depth:          int   = 3     #フォルダの最大の深さ
+    per_dir:        int   = 20    #フォルダごとのモジュール数
+    classes:        int   = 2     #モジュールごとのクラス数
+    priority_ratio: float = 0.3   #priorityデコレータを付けるクラスの割合
+    helper_ratio:   float = 0.2   #アドオンのクラスを含まないモジュールの割合
+    ignore_ratio:   float = 0.05  #ignoreリストで無視するモジュールの割合
+    keymap_ratio:   float = 0.2   #register()でショートカットキーを追加するモジュールの割合
+    vendor_files:   int   = 0     #無視されるvendorフォルダ内のファイル数
+    seed:           int   = 0
+
+    def to_dict(self) -> Dict[str, Any]: return asdict(self)
+
+def generate(out_dir: str, shape: TreeShape, package: str = 'bench_addon', target_dir: str = 'operators') -> str:
+    """Generate an add-on tree
+
+    Args:
+        out_dir (str): Directory in which the add-on folder is created
+        shape (TreeShape): Shape of the tree
+        package (str, optional): Name of the add-on folder. Defaults to 'bench_addon'.
+        target_dir (str, optional): Name of the target directory. Defaults to 'operators'.
+
+    Returns:
+        str: Path to the '__init__.py' file of the generated add-on
+    """
+    rnd = random.Random(shape.seed)
+    root = join(out_dir, package)
+    if os.path.exists(root): shutil.rmtree(root)
+    os.makedirs(join(root, target_dir))
+
+    _write(join(root, '__init__.py'), '')
+    _link_manager(join(root, 'manager'))
+
+    dirs = _make_dirs(rnd, shape)
+    ignore: Dict[str, List[str]] = {}
+
+    for index in range(shape.modules):
+        rel_dir = dirs[index // shape.per_dir]
+        name = f'm{index}'
+        path = join(root, target_dir, *rel_dir, f'{name}.py')
+
+        if rnd.random() < shape.ignore_ratio:
+            ignore.setdefault('/'.join(rel_dir), []).append(name)
+            _write(path, 'raise RuntimeError("ignored module was imported")\n')
+            continue
+
+        is_helper = rnd.random() < shape.helper_ratio
+        _write(path, _module_source(rnd, shape, package, index, is_helper))
+
+    #各フォルダの__init__.pyに無視リストを書き込む
+    for rel_dir in set(map(tuple, dirs)) | {()}:
+        rules = ignore.get('/'.join(rel_dir), [])
+        if not rel_dir and shape.vendor_files: rules = rules + ['vendor*']
+        _write(join(root, target_dir, *rel_dir, '__init__.py'), f'ignore = {rules!r}\n')
+
+    for index in range(shape.vendor_files):
+        _write(join(root, target_dir, 'vendor_lib', f'sub{index % 10}', f'v{index}.py'), 'raise RuntimeError("vendored module was imported")\n')
+
+    return join(root, '__init__.py')
+
+def _make_dirs(rnd: random.Random, shape: TreeShape) -> List[List[str]]:
+    """Decide the folder of each group of 'per_dir' modules"""
+    count = max(1, -(-shape.modules // shape.per_dir))
+    dirs: List[List[str]] = [[]]
+    while len(dirs) < count:
+        parent = rnd.choice([d for d in dirs if len(d) < shape.depth] or [[]])
+        dirs.append(parent + [f'd{len(dirs)}'])
+    return dirs
+
+def _module_source(rnd: random.Random, shape: TreeShape, package: str, index: int, is_helper: bool) -> str:
+    """Generate the source code of a module"""
+    if is_helper:
+        return f'TABLE = {{i: i * {index} for i in range(100)}}\n\nclass Helper{index}:\n    pass\n'
+
+    lines = [
+        'from bpy.types import Operator',
+        f'from {package}.manager.core.proc_loader import priority',
+        f'from {package}.manager.core.keymap_manager import Key, KeymapManager',
+        '',
+    ]
+    for c in range(shape.classes):
+        if rnd.random() < shape.priority_ratio: lines.append(f'@priority({rnd.randint(0, 20)})')
+        lines += [
+            f'class BENCH_OT_m{index}_c{c}(Operator):',
+            f'    bl_idname = "bench.m{index}_c{c}"',
+            f'    bl_label = "m{index} c{c}"',
+            '',
+            '    def execute(self, context):',
+            "        return {'FINISHED'}",
+            '',
+        ]
+
+    if shape.classes and rnd.random() < shape.keymap_ratio:
+        lines += ['def register():', f"    KeymapManager().add(Key(BENCH_OT_m{index}_c0, 'F{index % 12 + 1}'))", '']
+
+    return '\n'.join(lines)
+
+def _link_manager(dst: str) -> None:
+    """Link the manager folder of this repository into the add-on (copy it if links are not supported)"""
+    try:
+        os.symlink(MANAGER_DIR, dst, target_is_directory=True)
+    except OSError:
+        shutil.copytree(MANAGER_DIR, dst)
+
+def _write(path: str, text: str) -> None:
+    os.makedirs(dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
@@ -1,14 +1,26 @@
 #This program is distributed under the MIT License.
 #See the LICENSE file for details.
 
-from typing import List, Any, Dict
+from typing import List, Any, Dict, Set, Callable
 from types import ModuleType
 
-from importlib import reload
+import sys
+from importlib import reload, import_module
+from os.path import dirname, isfile
+from functools import partial
 
 from .proc_loader import ProcLoader
 from .keymap_manager import KeymapManager
 from .properties_manager import PropertiesManager
+from .hot_reload import HotReloader
+from .registration_scheduler import RegistrationScheduler
+from .registration_journal import RegistrationJournal
+from .profiler import Profiler, NullProfiler, NULL_PROFILER
+from .manifest import RegistrationManifest
+from .feature_group import FeatureGroup, FeatureMonitor
+from .import_report import ImportReport
+from .module_unloader import ModuleUnloader, UnloadReport
+from .utils.gen_msg import MsgType, gen_msg
 
 from bpy.utils import register_class, unregister_class # type: ignore
 from bpy.app import translations
@@ -18,7 +30,11 @@ class AddonManager:
     """
 
     def __init__(self, path: str, target_dirs: List[str], addon_name: str | None = None,
-                 translation_table: Dict[str, Dict[tuple[Any, Any], str]] | None = None, cat_name: str | None = None, is_debug_mode: bool = False) -> None:
+                 translation_table: Dict[str, Dict[tuple[Any, Any], str]] | None = None, cat_name: str | None = None, is_debug_mode: bool = False,
+                 cache_path: str | None = None, is_static_scan: bool = False, is_import_fallback: bool = False,
+                 profiler: Profiler | None = None, is_bytecode_warmup: bool = False, manifest: str | None = None,
+                 archive: str | None = None, is_lazy_operators: bool = False, feature_groups: List[FeatureGroup] | None = None,
+                 feature_interval: float = 1.0) -> None:
         """Initialize
 
         Args:
@@ -28,36 +44,218 @@ class AddonManager:
             translation_table (Dict[str, Dict[tuple[Any, Any], str]] | None, optional): Standard format translation table of Blender. Defaults to None.
             cat_name (str | None, optional): 'bl_category' attribute that is assigned by default to subclasses of 'bpy.types.Panel'. Defaults to None.
             is_debug_mode (bool, optional): Presence or absence of debug mode. Defaults to False.
+            cache_path (str | None, optional): Path to the discovery cache file. Discovery is not cached if None. Defaults to None.
+            is_static_scan (bool, optional): Skip importing modules that statically contain no add-on classes or 'register'/'unregister' functions. Defaults to False.
+            is_import_fallback (bool, optional): Import '__init__.py' to read 'ignore' lists that are not literals. Defaults to False.
+            profiler (Profiler | None, optional): Profiler that measures loading and registration. Nothing is measured if None. Defaults to None.
+            is_bytecode_warmup (bool, optional): Compile the modules to bytecode in parallel before importing them (see 'BytecodeWarmup'). Defaults to False.
+            manifest (str | None, optional): Name of a manifest module generated by 'RegistrationManifest' in the add-on package (example: 'addon_manifest').
+                The folders are not searched if it exists. In debug mode its checksum is verified. Defaults to None.
+            archive (str | None, optional): Path to an archive built by 'AddonArchive' (example: 'addon.zip'). If it exists,
+                the modules are discovered from its index and imported from it. Defaults to None.
+            is_lazy_operators (bool, optional): Register proxies for the operators of the modules listed in the 'lazy' lists of '__init__.py' files,
+                and import the modules the first time the operators are polled or run (see 'LazyOperator'). Defaults to False.
+            feature_groups (List[FeatureGroup] | None, optional): Groups of folders that are loaded and registered only while they are needed.
+                Their folders must not be included in 'target_dirs'. Defaults to None.
+            feature_interval (float, optional): Seconds between checks of the open editors for the feature groups. Defaults to 1.0.
         """
         self.__addon_name = addon_name
         self.__is_debug_mode = is_debug_mode
-        self.__modules, self.__classes = ProcLoader(path, is_debug_mode=self.__is_debug_mode).load(target_dirs, cat_name)
+        self.__profiler: Profiler | NullProfiler = profiler or NULL_PROFILER
+        #機能グループは同じ設定の別のローダーで読み込む
+        self.__new_loader = partial(ProcLoader, path, is_debug_mode=self.__is_debug_mode, cache_path=cache_path,
+                                    is_static_scan=is_static_scan, is_import_fallback=is_import_fallback, profiler=profiler,
+                                    is_bytecode_warmup=is_bytecode_warmup, archive=archive, is_lazy_operators=is_lazy_operators)
+        self.__loader = self.__new_loader()
+        with self.__profiler.span('phase', 'load'):
+            loaded = self.__load_manifest(manifest, dirname(path) if isfile(path) else path, target_dirs) if manifest else None
+            self.__modules, self.__classes = loaded or self.__loader.load(target_dirs, cat_name)
         PropertiesManager().set_name(self.__addon_name)
         self.__translation_table = translation_table
+        self.__cat_name = cat_name
+        self.__is_registered = False
+        self.__registered_classes: Dict[object, None] = {} #登録済みのクラス(登録順)
+        self.__hooked_modules: Set[str] = set()             #register()を呼び出したモジュール
+        self.__scheduler: RegistrationScheduler | None = None
+        self.__is_translations_registered = False
+
+        self.__groups: Dict[str, FeatureGroup] = {group.name: group for group in feature_groups or []}
+        self.__features: Dict[str, tuple[List[ModuleType], List[object]]] = {} #有効な機能グループ -> (モジュール, クラス)
+        self.__monitor = FeatureMonitor(list(self.__groups.values()), self.activate_feature, self.deactivate_feature, feature_interval) if self.__groups else None
+
+        #このマネージャー自身のパッケージは再読込しない
+        self.__reloader = HotReloader(self.__loader.package, [__package__.rsplit('.', 1)[0]]) if self.__is_debug_mode else None
 
         self.reload()
 
-    def register(self) -> None:
+    @property
+    def import_report(self) -> ImportReport:
+        """Modules of the add-on that failed to import (they are skipped and the rest of the add-on is registered)"""
+        return self.__loader.report
+
+    @property
+    def is_fully_registered(self) -> bool:
+        """Whether all classes and 'register' functions have been registered (including staged registration)"""
+        return self.__is_registered and (self.__scheduler is None or self.__scheduler.is_done)
+
+    def register(self, is_staged: bool = False, critical_priority: int | None = None, budget_ms: float = 5.0,
+                 on_complete: Callable[[RegistrationScheduler], Any] | None = None) -> RegistrationScheduler | None:
         """Perform registration of the add-on class and each function
+
+        Classes that are already registered ('is_registered') and modules whose 'register' function has already been called are skipped,
+        so calling this again is cheap. If a step fails, only the steps applied by this call are rolled back in reverse order and the exception is raised again.
+
+        In staged mode, only the critical classes (see 'critical' decorator) and the translations are registered immediately.
+        The other classes and the 'register' functions of the modules are registered in chunks from 'bpy.app.timers',
+        so that enabling a large add-on does not freeze the UI.
+
+        Args:
+            is_staged (bool, optional): Register the non-critical classes and functions in time-sliced chunks. Defaults to False.
+            critical_priority (int | None, optional): Classes with a priority of this value or less are also registered immediately. Defaults to None.
+            budget_ms (float, optional): Time budget of each chunk in milliseconds. Defaults to 5.0.
+            on_complete (Callable[[RegistrationScheduler], Any] | None, optional): Function called when the registration is complete. Defaults to None.
+
+        Returns:
+            RegistrationScheduler | None: Scheduler of the staged registration, or None if it is not staged
         """
-        for cls in self.__classes:
-            register_class(cls)
+        if self.__scheduler and not self.__scheduler.is_done: return self.__scheduler #段階的な登録の途中
+
+        journal = RegistrationJournal()
+        steps: List[tuple[str, Callable[[], Any]]] = []
+        is_registered = self.__is_registered
 
-        self.__call('register')
+        with self.__profiler.span('phase', 'register'):
+            try:
+                self.__register_translations(journal)
+                self.__is_registered = True
 
-        if self.__translation_table and self.__addon_name: translations.register(self.__addon_name, self.__translation_table) #type: ignore
+                if not is_staged:
+                    for cls in self.__classes: self.__register_class(cls, journal)
+                    for mdl in self.__modules: self.__register_module(mdl, journal)
+                    if self.__monitor: self.__monitor.start()
+                    return None
 
-    def unregister(self) -> None:
+                #重要なクラスはすぐに登録し、残りはタイマーで少しずつ登録する
+                for cls in self.__classes:
+                    if ProcLoader.isCritical(cls, critical_priority): self.__register_class(cls, journal)
+                    else: steps.append((self.__class_name(cls), partial(self.__register_class, cls)))
+                steps += [(mdl.__name__, partial(self.__register_module, mdl)) for mdl in self.__modules]
+            except Exception:
+                #この呼び出しで適用したものだけを逆順に取り消す
+                with self.__profiler.span('phase', 'rollback'): journal.rollback()
+                self.__is_registered = is_registered
+                raise
+
+        self.__scheduler = RegistrationScheduler(steps, budget_ms)
+        if on_complete: self.__scheduler.add_done_callback(on_complete)
+        if self.__monitor: self.__scheduler.add_done_callback(lambda _: self.__monitor.start()) # type: ignore
+        self.__scheduler.start()
+
+        return self.__scheduler
+
+    def unregister(self, is_unload: bool = False) -> UnloadReport | None:
         """Unregister the add-on class and each function
+
+        Only what has been registered is unregistered, so an add-on whose staged registration has not finished can also be unregistered.
+
+        In unload mode, the modules of the add-on are also removed from 'sys.modules', the path added to 'sys.path' is removed,
+        the singletons are reset and the references held by this manager are dropped, so the memory used by the add-on can be reclaimed
+        (see 'ModuleUnloader'). The manager cannot be registered again after unloading; the add-on is imported again when it is enabled.
+
+        Args:
+            is_unload (bool, optional): Unload the modules of the add-on. Defaults to False.
+
+        Returns:
+            UnloadReport | None: Result of unloading, or None if not unloading
+        """
+        if self.__scheduler:
+            self.__scheduler.cancel()
+            self.__scheduler = None
+
+        if self.__monitor: self.__monitor.stop()
+        for name in reversed(list(self.__features)): self.deactivate_feature(name)
+
+        with self.__profiler.span('phase', 'unregister'):
+            for cls in reversed(list(self.__registered_classes)): self.__unregister_class(cls)
+
+            for mdl in self.__modules:
+                if mdl.__name__ in self.__hooked_modules: self.__invoke(mdl, 'unregister')
+            self.__hooked_modules.clear()
+
+            with self.__profiler.span('keymaps', 'unregister'): KeymapManager().unregister()
+            with self.__profiler.span('properties', 'unregister'): PropertiesManager().unregister()
+            self.__unregister_translations()
+        self.__is_registered = False
+
+        if not is_unload: return None
+
+        with self.__profiler.span('phase', 'unload'): report = self.__unload()
+        if self.__is_debug_mode: print(gen_msg(AddonManager, MsgType.INFO, report.format()))
+        return report
+
+    def activate_feature(self, name: str) -> bool:
+        """Load and register a feature group (it is only recorded as used if it is already active)
+
+        If a step fails, the steps applied for the group are rolled back and the exception is raised again.
+
+        Args:
+            name (str): Group name
+
+        Raises:
+            KeyError: Thrown if the group does not exist.
+
+        Returns:
+            bool: Whether the group is active (False if the add-on is not registered)
+        """
+        group = self.__groups[name]
+        if not self.__is_registered: return False
+        if self.__monitor: self.__monitor.touch(name)
+        if name in self.__features: return True
+
+        journal = RegistrationJournal()
+        modules: List[ModuleType] = []
+        with self.__profiler.span('feature', name):
+            try:
+                modules, classes = self.__new_loader().load(group.target_dirs, self.__cat_name) # type: ignore
+                for cls in classes: self.__register_class(cls, journal)
+                for mdl in modules: self.__register_module(mdl, journal)
+            except Exception:
+                journal.rollback()
+                self.__forget_modules(modules) #再試行したときは新しく読み込む
+                if self.__monitor: self.__monitor.touch(name, is_active=False)
+                raise
+
+        self.__features[name] = (modules, classes) # type: ignore
+        return True
+
+    def deactivate_feature(self, name: str) -> bool:
+        """Unregister a feature group and remove its modules from 'sys.modules' so that they can be freed
+
+        Args:
+            name (str): Group name
+
+        Returns:
+            bool: Whether the group was active
         """
-        for cls in reversed(self.__classes):
-            unregister_class(cls)
+        feature = self.__features.pop(name, None)
+        if self.__monitor: self.__monitor.touch(name, is_active=False)
+        if feature is None: return False
 
-        self.__call('unregister')
+        modules, classes = feature
+        with self.__profiler.span('feature', name):
+            for cls in reversed(classes): self.__unregister_class(cls)
+            for mdl in reversed(modules):
+                if mdl.__name__ in self.__hooked_modules: self.__unregister_module(mdl)
 
-        KeymapManager().unregister()
-        PropertiesManager().unregister()
-        if self.__translation_table and self.__addon_name: translations.unregister(self.__addon_name)
+            self.__forget_modules(modules) #次に有効にしたときは新しく読み込む
+
+        return True
+
+    def is_feature_active(self, name: str) -> bool: return name in self.__features
+
+    def touch_feature(self, name: str) -> None:
+        """Record that an active feature group is in use, so it is not deactivated as idle"""
+        if self.__monitor and name in self.__features: self.__monitor.touch(name)
 
     def reload(self) -> None:
         """ Reload the add-on class when the 'script.reload' operator is called
@@ -67,14 +265,173 @@ class AddonManager:
         for mdl in self.__modules:
             reload(mdl) # type: ignore
 
-    def __call(self, identifier: str) -> None:
-        """Invoke the function specified by 'identifier' for all add-on modules.
+    def reload_changed(self) -> List[str]:
+        """Reload only the modules changed on disk and the modules that import them.
 
-        Args:
-            identifier (str): The name of the function you want to call
+        The modules are reloaded in dependency order. If the add-on is registered, only the classes
+        of the reloaded modules are unregistered and registered again. The keymaps and properties added again
+        by their 'register' functions are applied as a diff, so unchanged ones are not recreated.
+        If a module fails to reload (such as a syntax error while editing), the modules are registered again in their current state
+        and the exception is raised. The failed module is reloaded again by the next call.
+        This works only in debug mode.
+
+        Returns:
+            List[str]: Names of the reloaded modules
         """
-        for mdl in self.__modules:
-            self.__invoke(mdl, identifier)
+        if not self.__reloader: return []
+
+        if self.__scheduler: self.__scheduler.flush() #段階的な登録が終わっていなければ先に完了させる
+
+        #有効な機能グループは一度無効にして、再読込の後に新しく読み込む
+        features = list(self.__features)
+        for name in reversed(features): self.deactivate_feature(name)
+
+        try:
+            with self.__profiler.span('phase', 'reload_changed'):
+                return self.__reload_changed(self.__reloader)
+        finally:
+            for name in features: self.activate_feature(name)
+
+    def __reload_changed(self, reloader: HotReloader) -> List[str]:
+        """Reload the changed modules and register them again (see 'reload_changed()')"""
+        names = reloader.plan()
+        if not names: return []
+
+        affected: Set[str] = set(names)
+        loaded = [mdl for mdl in self.__modules if mdl.__name__ in affected]
+
+        #影響を受けるクラスと各機能を解除する
+        if self.__is_registered:
+            #プロパティグループを解除する前に、それを指すプロパティを削除する(解除したグループを指したまま残らないようにする)
+            PropertiesManager().detach([cls for cls in self.__registered_classes if cls.__module__ in affected]) # type: ignore
+            for cls in reversed(list(self.__registered_classes)):
+                if cls.__module__ in affected: self.__unregister_class(cls)
+
+            #register()を呼び出していないモジュール(前回の再読込に失敗したものなど)のunregister()は呼び出さない
+            for mdl in reversed(loaded):
+                if mdl.__name__ not in self.__hooked_modules: continue
+                self.__hooked_modules.discard(mdl.__name__)
+                self.__invoke(mdl, 'unregister')
+
+        try:
+            with self.__profiler.span('reload', ', '.join(names)): reloader.reload(names)
+        except Exception:
+            #編集中の構文エラーなどで失敗した場合は、現在のモジュールの状態を登録し直してから例外を投げる
+            #(失敗したモジュールは変更されたままなので、次の呼び出しで再び読み込まれる)
+            self.__classes = self.__loader.load_classes(self.__modules, self.__cat_name, self.__loader.proxies) # type: ignore
+            if self.__is_registered:
+                try:
+                    self.__register_reloaded(loaded, affected)
+                except Exception as e:
+                    print(gen_msg(AddonManager, MsgType.ERROR, f'Failed to register the modules again after the reload failed. \n {e}'))
+            raise
+
+        self.__classes = self.__loader.load_classes(self.__modules, self.__cat_name, self.__loader.proxies) # type: ignore
+        if self.__is_registered: self.__register_reloaded(loaded, affected)
+
+        return names
+
+    def __register_reloaded(self, loaded: List[ModuleType], affected: Set[str]) -> None:
+        """Register the classes and the 'register' functions of the reloaded modules again (see 'reload_changed()')"""
+        #キーマップとプロパティは再度追加されたものとの差分だけを反映する
+        owners = [mdl.__name__ for mdl in loaded]
+        KeymapManager().begin_update(owners)
+        PropertiesManager().begin_update(owners)
+        try:
+            for cls in self.__classes:
+                if cls.__module__ in affected: self.__register_class(cls)
+
+            for mdl in loaded:
+                self.__register_module(mdl)
+        finally:
+            with self.__profiler.span('keymaps', 'commit_update'): KeymapManager().commit_update()
+            with self.__profiler.span('properties', 'commit_update'): PropertiesManager().commit_update()
+
+    def __unload(self) -> UnloadReport:
+        """Drop the references to the add-on and unload its modules"""
+        unloader = ModuleUnloader(self.__loader.package, self.__loader.root, self.__loader.added_path)
+
+        #監視タイマーとリローダーはこのマネージャーのメソッドやモジュールを参照しているため、先に外す
+        self.__monitor = None
+        self.__reloader = None
+        self.__groups.clear()
+        self.__features.clear()
+        self.__modules, self.__classes = [], []
+        self.__registered_classes.clear()
+
+        KeymapManager.reset()
+        PropertiesManager.reset()
+
+        return unloader.unload()
+
+    @staticmethod
+    def __forget_modules(modules: List[ModuleType]) -> None:
+        """Remove modules from 'sys.modules' and from the attributes of their parent packages"""
+        for mdl in modules:
+            sys.modules.pop(mdl.__name__, None)
+            parent, _, child = mdl.__name__.rpartition('.')
+            if getattr(sys.modules.get(parent), child, None) is mdl: delattr(sys.modules[parent], child)
+
+    def __load_manifest(self, name: str, addon_path: str, target_dirs: List[str]) -> List[Any] | None:
+        """Load the modules and classes from a manifest (None if it cannot be used)"""
+        try:
+            manifest = import_module(f'{self.__loader.package}.{name}')
+        except ModuleNotFoundError: return None #マニフェストがない場合(開発中など)は通常どおり探索する
+
+        if not RegistrationManifest.is_valid(manifest, addon_path, target_dirs, self.__is_debug_mode, is_verify=self.__is_debug_mode):
+            print(gen_msg(AddonManager, MsgType.CAUTION, f'The manifest "{manifest.__name__}" does not match the add-on and was ignored. Generate it again.'))
+            return None
+
+        try:
+            with self.__profiler.span('manifest', manifest.__name__): return RegistrationManifest.load(manifest, self.__loader)
+        except (ImportError, AttributeError, KeyError) as e:
+            print(gen_msg(AddonManager, MsgType.CAUTION, f'Failed to load from the manifest "{manifest.__name__}". The folders are searched instead. \n {e}'))
+            return None
+
+    def __register_class(self, cls: object, journal: RegistrationJournal | None = None) -> None:
+        """Register a class and record it (classes that are already registered are only recorded)"""
+        if not getattr(cls, 'is_registered', False):
+            with self.__profiler.span('register_class', self.__class_name(cls)): register_class(cls)
+            if journal is not None: journal.record(self.__class_name(cls), partial(self.__unregister_class, cls))
+        self.__registered_classes[cls] = None
+
+    def __unregister_class(self, cls: object) -> None:
+        """Unregister a registered class (classes that are no longer registered are only forgotten)"""
+        if getattr(cls, 'is_registered', True):
+            with self.__profiler.span('unregister_class', self.__class_name(cls)): unregister_class(cls)
+        self.__registered_classes.pop(cls, None)
+
+    def __register_module(self, mdl: ModuleType, journal: RegistrationJournal | None = None) -> None:
+        """Invoke the 'register' function of a module and record it (modules that have already been called are skipped)"""
+        if mdl.__name__ in self.__hooked_modules: return
+
+        self.__hooked_modules.add(mdl.__name__)
+        if journal is not None: journal.record(mdl.__name__, partial(self.__unregister_module, mdl)) #途中で失敗した場合も取り消せるように先に記録する
+        self.__invoke(mdl, 'register')
+
+    def __unregister_module(self, mdl: ModuleType) -> None:
+        """Invoke the 'unregister' function of a module and delete the keymaps and properties it added"""
+        self.__hooked_modules.discard(mdl.__name__)
+        try:
+            self.__invoke(mdl, 'unregister')
+        finally:
+            KeymapManager().delete_owner(mdl.__name__)
+            PropertiesManager().delete_owner(mdl.__name__)
+
+    def __register_translations(self, journal: RegistrationJournal) -> None:
+        """Register the translation table if it has not been registered"""
+        if not self.__translation_table or not self.__addon_name or self.__is_translations_registered: return
+
+        with self.__profiler.span('translations', 'register'): translations.register(self.__addon_name, self.__translation_table) #type: ignore
+        self.__is_translations_registered = True
+        journal.record('translations', self.__unregister_translations)
+
+    def __unregister_translations(self) -> None:
+        """Unregister the translation table if it has been registered"""
+        if not self.__is_translations_registered: return
+
+        with self.__profiler.span('translations', 'unregister'): translations.unregister(self.__addon_name)
+        self.__is_translations_registered = False
 
     def __invoke(self, mdl: ModuleType | object, identifier: str) -> None:
         """If 'mdl' module has a function named 'identifier', invoke it.
@@ -83,4 +440,15 @@ class AddonManager:
             mdl (ModuleType | object): Module from which to call function
             identifier (str): Name of the function to call
         """
-        if hasattr(mdl, identifier): getattr(mdl, identifier)()
+        if not hasattr(mdl, identifier): return
+
+        #モジュールが追加したキーマップとプロパティを記録する
+        name = getattr(mdl, '__name__', None)
+        with KeymapManager().owner(name), PropertiesManager().owner(name), \
+             self.__profiler.memory_span(identifier, str(name)), self.__profiler.span(identifier, str(name)):
+            getattr(mdl, identifier)()
+
+    @staticmethod
+    def __class_name(cls: object) -> str:
+        """Get the qualified name of a class used in the profiler"""
+        return f'{cls.__module__}.{cls.__qualname__}' # type: ignore
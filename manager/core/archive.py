@@ -0,0 +1,156 @@
+#This program is distributed under the MIT License.
+#See the LICENSE file for details.
+
+from typing import Dict, List, Sequence
+
+import os
+import sys
+import json
+import marshal
+import argparse
+import zipfile
+from zipimport import zipimporter, ZipImportError
+from os.path import join, dirname, isfile, relpath, getmtime
+from time import localtime
+from importlib import import_module
+from importlib.util import MAGIC_NUMBER, source_hash
+
+from .utils.gen_msg import MsgType, gen_msg
+from .static_scan import StaticScanner
+
+class AddonArchive:
+    """Bundles the target folders of an add-on into one zip archive that is imported with 'zipimport'.
+
+    The archive holds the Python files, their bytecode and an index of the folders (sub-folders, Python files and 'ignore' lists),
+    so discovery reads the index instead of listing folders and reading '__init__.py' files, and imports read from the archive
+    instead of searching and checking files one by one. Only Python files are bundled.
+    """
+
+    VERSION: int = 1
+    INDEX_NAME: str = '__index__.json'
+
+    def __init__(self, path: str) -> None:
+        """Open an archive and read its index
+
+        Args:
+            path (str): Path to the archive
+
+        Raises:
+            ValueError: Thrown if the file is not an archive of this version.
+        """
+        self.__path = path
+        try:
+            #zipimportは中央ディレクトリをキャッシュするため、インポート時にアーカイブを読み直さない
+            self.__importer = zipimporter(path)
+            index = json.loads(self.__importer.get_data(self.INDEX_NAME))
+        except (ZipImportError, OSError, ValueError) as e:
+            raise ValueError(gen_msg(AddonArchive, MsgType.ERROR, f'"{path}" is not an add-on archive. \n {e}')) from e
+
+        if not isinstance(index, dict) or index.get('version') != self.VERSION: # type: ignore
+            raise ValueError(gen_msg(AddonArchive, MsgType.ERROR, f'"{path}" was built with another version. Build it again.'))
+
+        self.__dirs: Dict[str, Dict[str, List[str]]] = index['dirs']
+
+    @property
+    def path(self) -> str: return self.__path
+
+    def entry(self, rel_path: str) -> Dict[str, List[str]] | None:
+        """Get the entry of a folder from the index
+
+        Args:
+            rel_path (str): Path of the folder relative to the add-on folder
+
+        Returns:
+            Dict[str, List[str]] | None: Entry with 'dirs', 'files' and 'ignore' keys, or None if the folder is not in the archive
+        """
+        return self.__dirs.get(rel_path.replace(os.sep, '/'))
+
+    def install(self, package: str) -> None:
+        """Put the archive at the front of the search path of the add-on package, so the target folders are imported from it
+
+        Args:
+            package (str): Package name of the add-on
+        """
+        search_path: List[str] = import_module(package).__path__ # type: ignore
+        if self.__path not in search_path: search_path.insert(0, self.__path)
+
+    @classmethod
+    def build(cls, path: str, target_dirs: List[str], output: str | None = None) -> str:
+        """Bundle the target folders of an add-on into an archive
+
+        The bytecode is compiled by the running Python, so build the archive with the Python of the Blender version that loads it
+        (if the version differs, the sources in the archive are compiled on import instead).
+
+        Args:
+            path (str): Path to the add-on folder or '__init__.py' file
+            target_dirs (List[str]): Target folders
+            output (str | None, optional): Path of the archive. 'addon.zip' in the add-on folder if None. Defaults to None.
+
+        Raises:
+            ValueError: Thrown if an 'ignore' list is not a literal.
+
+        Returns:
+            str: Path of the written archive
+        """
+        addon_path = dirname(path) if isfile(path) else path
+        output = output or join(addon_path, 'addon.zip')
+        dirs: Dict[str, Dict[str, List[str]]] = {}
+
+        with zipfile.ZipFile(output, 'w', zipfile.ZIP_STORED) as archive: #展開の時間を省くため圧縮しない
+            for target in target_dirs:
+                for root, sub_dirs, files in os.walk(join(addon_path, target)):
+                    sub_dirs[:] = sorted(d for d in sub_dirs if d != '__pycache__')
+                    files = sorted(file for file in files if file.endswith('.py'))
+                    key = relpath(root, addon_path).replace(os.sep, '/')
+
+                    dirs[key] = {'dirs': list(sub_dirs), 'files': files, 'ignore': sorted(cls.__read_ignore(join(root, '__init__.py')))}
+                    for file in files: cls.__write_module(archive, join(root, file), f'{key}/{file}')
+
+            archive.writestr(cls.INDEX_NAME, json.dumps({'version': cls.VERSION, 'dirs': dirs}))
+
+        return output
+
+    @staticmethod
+    def __read_ignore(init_path: str) -> List[str]:
+        """Read the 'ignore' list of a folder (it is resolved at build time, so it must be a literal)"""
+        if not isfile(init_path): return []
+        try:
+            return list(StaticScanner.read_literal(init_path, 'ignore', []))
+        except ValueError as e:
+            raise ValueError(gen_msg(AddonArchive, MsgType.ERROR, f'{e} The "ignore" lists must be literals to build an archive.')) from e
+
+    @staticmethod
+    def __write_module(archive: zipfile.ZipFile, path: str, arcname: str) -> None:
+        """Write a Python file and its bytecode (hash-based, not checked against the source) into the archive"""
+        with open(path, 'rb') as f: source = f.read()
+        date_time = localtime(getmtime(path))[:6]
+
+        archive.writestr(zipfile.ZipInfo(arcname, date_time), source)
+        try:
+            code = compile(source, arcname, 'exec', dont_inherit=True)
+        except SyntaxError: return #バイトコードがなければインポート時にソースがコンパイルされ、エラーが報告される
+
+        #zipimportは.pycを書き込めないため、アーカイブに含めておく
+        data = MAGIC_NUMBER + (0b01).to_bytes(4, 'little') + source_hash(source) + marshal.dumps(code)
+        archive.writestr(zipfile.ZipInfo(arcname + 'c', date_time), data)
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Build an archive from the command line (run it with the Python of the Blender version, for example inside Blender)
+
+    The arguments after '--' are used when 'argv' is None, so it can be called from 'blender --background --python-expr'.
+
+    Returns:
+        int: Exit code
+    """
+    if argv is None: argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+
+    parser = argparse.ArgumentParser(description='Bundle the target folders of the add-on into one archive.')
+    parser.add_argument('path', help='Add-on folder')
+    parser.add_argument('dirs', nargs='+', help='Target folders')
+    parser.add_argument('--output', help="Path of the archive (default: 'addon.zip' in the add-on folder)")
+    args = parser.parse_args(argv)
+
+    output = AddonArchive.build(args.path, args.dirs, args.output)
+    print(gen_msg(AddonArchive, MsgType.INFO, f'Wrote "{output}".'))
+
+    return 0
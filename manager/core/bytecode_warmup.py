@@ -0,0 +1,125 @@
+#This program is distributed under the MIT License.
+#See the LICENSE file for details.
+
+#このモジュールはデプロイ時にBlenderの外から直接実行できるように、標準ライブラリだけに依存します。
+#例: path/to/blender/python/bin/python3.11 manager/core/bytecode_warmup.py path/to/addon_folder
+
+from typing import Iterable, List, Sequence
+
+import os
+import sys
+import argparse
+import py_compile
+from os.path import join, isdir, abspath
+from functools import partial
+from importlib.util import cache_from_source, MAGIC_NUMBER
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+class BytecodeWarmup:
+    """Compiles Python files to '.pyc' in a process pool, so that the first import does not compile them on the main thread.
+
+    Only files whose '.pyc' is missing or out of date are compiled, and the pool is only started when there are enough of them.
+    The bytecode is written in the same format as the import system (timestamp based), so it has to be run with
+    the same Python version as Blender.
+    """
+
+    def __init__(self, workers: int | None = None, min_parallel: int = 8) -> None:
+        """Initialize
+
+        Args:
+            workers (int | None, optional): Number of processes. The number of CPUs if None. Defaults to None.
+            min_parallel (int, optional): Files are compiled in this process when fewer than this number need compiling. Defaults to 8.
+        """
+        self.__workers = workers
+        self.__min_parallel = min_parallel
+
+    @staticmethod
+    def is_stale(path: str) -> bool:
+        """Check whether the '.pyc' of a source file is missing or out of date (the same check as the import system)
+
+        Args:
+            path (str): Path to the source file
+
+        Returns:
+            bool: Whether the file needs compiling
+        """
+        try:
+            st = os.stat(path)
+            with open(cache_from_source(path), 'rb') as f: header = f.read(16)
+        except OSError: return True
+
+        if len(header) < 16 or header[:4] != MAGIC_NUMBER or int.from_bytes(header[4:8], 'little') != 0: return True
+        return int.from_bytes(header[8:12], 'little') != int(st.st_mtime) & 0xFFFFFFFF or int.from_bytes(header[12:16], 'little') != st.st_size & 0xFFFFFFFF
+
+    @staticmethod
+    def collect(root: str) -> List[str]:
+        """Get all Python files in a folder (the '__pycache__' folders are skipped)
+
+        Args:
+            root (str): Target folder
+
+        Returns:
+            List[str]: Paths of the Python files
+        """
+        paths: List[str] = []
+        for cur, dirs, files in os.walk(root):
+            dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+            paths += [join(cur, file) for file in sorted(files) if file.endswith('.py')]
+        return paths
+
+    def run(self, paths: Iterable[str]) -> tuple[List[str], List[str]]:
+        """Compile the files that need compiling
+
+        Files that fail to compile are not reported as errors here, because the error is raised when they are imported.
+
+        Args:
+            paths (Iterable[str]): Paths to the source files
+
+        Returns:
+            tuple[List[str], List[str]]: Compiled files and files that failed to compile
+        """
+        if sys.dont_write_bytecode: return ([], [])
+
+        stale = [path for path in dict.fromkeys(paths) if self.is_stale(path)]
+        if not stale: return ([], [])
+
+        #py_compileは一時ファイルに書き込んでから置き換えるため、Blenderが同時に読み込んでも壊れたファイルは読まれない
+        compile_file = partial(py_compile.compile, quiet=2, invalidation_mode=py_compile.PycInvalidationMode.TIMESTAMP)
+
+        if len(stale) < self.__min_parallel or self.__workers == 1: results = list(map(compile_file, stale))
+        else:
+            try:
+                #Blenderのようにスレッドを持つプロセスからforkするのは安全でないため、spawnで起動する
+                with ProcessPoolExecutor(self.__workers, mp_context=get_context('spawn')) as executor:
+                    results = list(executor.map(compile_file, stale, chunksize=max(len(stale) // (4 * (self.__workers or os.cpu_count() or 1)), 1)))
+            except (OSError, RuntimeError): results = list(map(compile_file, stale)) #プロセスを起動できない環境ではこのプロセスでコンパイルする
+
+        compiled = [path for path, cfile in zip(stale, results) if cfile]
+        failed = [path for path, cfile in zip(stale, results) if not cfile]
+        return (compiled, failed)
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Compile the add-on folders given on the command line
+
+    Returns:
+        int: Exit code (1 if a file failed to compile)
+    """
+    parser = argparse.ArgumentParser(description='Compile add-on modules to bytecode before Blender imports them.')
+    parser.add_argument('folders', nargs='+', help='Add-on folders')
+    parser.add_argument('--workers', type=int, default=None, help='Number of processes (default: number of CPUs)')
+    args = parser.parse_args(argv)
+
+    paths: List[str] = []
+    for folder in args.folders:
+        if not isdir(folder): parser.error(f'"{folder}" is not a folder or does not exist.')
+        paths += BytecodeWarmup.collect(abspath(folder))
+
+    compiled, failed = BytecodeWarmup(args.workers, min_parallel=1).run(paths)
+    for path in failed: print(f'Failed to compile "{path}".', file=sys.stderr)
+    print(f'{len(compiled)} compiled, {len(paths) - len(compiled) - len(failed)} up to date, {len(failed)} failed.')
+
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
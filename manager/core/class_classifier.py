@@ -0,0 +1,61 @@
+#This program is distributed under the MIT License.
+#See the LICENSE file for details.
+
+from typing import List, Iterator
+from types import ModuleType
+
+from weakref import WeakKeyDictionary
+
+class ClassClassifier:
+    """Determines which target class an add-on class inherits.
+
+    The targets are held in a set and compared with the MRO of each class, and the result is memoized per class object.
+    """
+
+    def __init__(self, target_classes: List[object]) -> None:
+        """Initialize
+
+        Args:
+            target_classes (List[object]): Classes to load
+        """
+        self.__targets = frozenset(target_classes)
+        self.__verdicts: WeakKeyDictionary[type, object | None] = WeakKeyDictionary() #クラス -> 一致した対象のクラス
+
+    def classify(self, clazz: type) -> object | None:
+        """Get the target class inherited by the class
+
+        Args:
+            clazz (type): Class to check
+
+        Returns:
+            object | None: The closest target class in the MRO, or None if it is not an add-on class (including the target classes themselves)
+        """
+        try:
+            return self.__verdicts[clazz]
+        except KeyError:
+            pass
+
+        #自分自身は除外し、MROの中で最初に見つかった対象のクラスを採用する
+        base = next((c for c in clazz.__mro__[1:] if c in self.__targets), None)
+        self.__verdicts[clazz] = base
+
+        return base
+
+    def iter_classes(self, mdl: ModuleType) -> Iterator[tuple[type, object]]:
+        """Get the add-on classes defined in the module
+
+        Classes imported from other modules are skipped. The classes are yielded in the order of their names in the module
+        (the same order as 'inspect.getmembers()'), which decides the registration order of classes with the same priority.
+
+        Args:
+            mdl (ModuleType): Target module
+
+        Yields:
+            Iterator[tuple[type, object]]: Class and the target class it inherits
+        """
+        name = mdl.__name__
+        for _, clazz in sorted(vars(mdl).items(), key=lambda item: item[0]): #定義順ではなく名前順にする
+            if not isinstance(clazz, type) or not clazz.__module__ == name: continue
+
+            base = self.classify(clazz)
+            if base is not None: yield clazz, base
@@ -0,0 +1,67 @@
+#This program is distributed under the MIT License.
+#See the LICENSE file for details.
+
+from typing import Dict, List, Set, Iterable
+
+class DependencyGraph:
+    """Import dependencies between the modules of the add-on.
+    """
+
+    def __init__(self) -> None:
+        self.__order: Dict[str, int] = {}            #モジュール -> 追加された順番
+        self.__imports: Dict[str, Set[str]] = {}     #モジュール -> インポートしているモジュール
+        self.__dependents: Dict[str, Set[str]] = {}  #モジュール -> インポートされているモジュール
+
+    def add(self, name: str, imports: Iterable[str]) -> None:
+        """Add or replace a module and its imports
+
+        Args:
+            name (str): Module name
+            imports (Iterable[str]): Names of the modules imported by the module
+        """
+        for old in self.__imports.get(name, set()):
+            self.__dependents.get(old, set()).discard(name)
+
+        if name not in self.__order: self.__order[name] = len(self.__order)
+        self.__imports[name] = set(imports) - {name}
+
+        for dep in self.__imports[name]:
+            self.__dependents.setdefault(dep, set()).add(name)
+
+    def affected(self, changed: Iterable[str]) -> List[str]:
+        """Get the changed modules and all modules depending on them
+
+        Args:
+            changed (Iterable[str]): Names of the changed modules
+
+        Returns:
+            List[str]: Affected modules, sorted so that each module comes after the modules it imports
+        """
+        affected: Set[str] = set()
+        stack = [name for name in changed if name in self.__order]
+        while stack:
+            name = stack.pop()
+            if name in affected: continue
+            affected.add(name)
+            stack += self.__dependents.get(name, set())
+
+        return self.__sort(affected)
+
+    def __sort(self, names: Set[str]) -> List[str]:
+        """Topologically sort the modules (modules in a cycle keep the order in which they were added)"""
+        pending = {name: len(self.__imports[name] & names) for name in names}
+        ready = sorted((name for name, count in pending.items() if count == 0), key=self.__order.__getitem__)
+
+        result: List[str] = []
+        while ready:
+            name = ready.pop(0)
+            result.append(name)
+            del pending[name]
+            for dep in self.__dependents.get(name, set()):
+                if dep not in pending: continue
+                pending[dep] -= 1
+                if pending[dep] == 0: ready.append(dep)
+            ready.sort(key=self.__order.__getitem__)
+
+        #循環参照しているモジュールは追加された順番で最後に並べる
+        return result + sorted(pending, key=self.__order.__getitem__)
@@ -0,0 +1,121 @@
+#This program is distributed under the MIT License.
+#See the LICENSE file for details.
+
+from typing import Any, Dict, List
+
+import os
+import json
+from os.path import dirname, exists
+
+from .utils.gen_msg import MsgType, gen_msg
+
+class DiscoveryCache:
+    """Persists the results of add-on discovery between sessions.
+
+    Entries are grouped into sections and stored together with a fingerprint (modification time and size).
+    An entry whose fingerprint no longer matches is treated as missing, so stale data is invalidated per entry.
+    """
+
+    VERSION: int = 2
+
+    def __init__(self, path: str) -> None:
+        """Initialize and read the cache file if it exists
+
+        Args:
+            path (str): Path to the cache file (JSON)
+        """
+        self.__path = path
+        self.__sections: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.__is_dirty = False
+
+        if not exists(path): return
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(gen_msg(DiscoveryCache, MsgType.CAUTION, f'Failed to read the cache "{path}". It will be rebuilt. \n {e}'))
+            return
+
+        #バージョンが異なる場合は読み込まない
+        if isinstance(data, dict) and data.get('version') == self.VERSION: self.__sections = data.get('sections', {}) # type: ignore
+
+    @property
+    def path(self) -> str: return self.__path
+
+    @staticmethod
+    def fingerprint(*paths: str) -> List[int]:
+        """Generate a fingerprint from the modification time and size of the files
+
+        Args:
+            *paths (str): Target files or directories. Missing paths are recorded as -1.
+
+        Returns:
+            List[int]: Fingerprint
+        """
+        result: List[int] = []
+        for path in paths:
+            try:
+                st = os.stat(path)
+                result += [st.st_mtime_ns, st.st_size]
+            except OSError:
+                result += [-1, -1]
+
+        return result
+
+    def get(self, section: str, key: str, fingerprint: List[int]) -> Any:
+        """Retrieve an entry
+
+        Args:
+            section (str): Section name
+            key (str): Entry key
+            fingerprint (List[int]): Current fingerprint of the entry
+
+        Returns:
+            Any: Stored value, or None if it does not exist or is stale
+        """
+        entry = self.__sections.get(section, {}).get(key)
+        if entry is None or entry['fingerprint'] != fingerprint: return None
+
+        return entry['value']
+
+    def set(self, section: str, key: str, fingerprint: List[int], value: Any) -> None:
+        """Store an entry
+
+        Args:
+            section (str): Section name
+            key (str): Entry key
+            fingerprint (List[int]): Fingerprint of the entry
+            value (Any): Value that can be serialized to JSON
+        """
+        self.__sections.setdefault(section, {})[key] = {'fingerprint': fingerprint, 'value': value}
+        self.__is_dirty = True
+
+    def discard(self, section: str, key: str) -> None:
+        """Delete an entry
+
+        Args:
+            section (str): Section name
+            key (str): Entry key
+        """
+        if self.__sections.get(section, {}).pop(key, None) is not None: self.__is_dirty = True
+
+    def keys(self, section: str) -> List[str]:
+        """Get the keys of all entries in the section"""
+        return list(self.__sections.get(section, {}).keys())
+
+    def save(self) -> None:
+        """Write the cache to a file if it has changed
+        """
+        if not self.__is_dirty: return
+
+        tmp_path = f'{self.__path}.tmp'
+        try:
+            if dirname(self.__path): os.makedirs(dirname(self.__path), exist_ok=True)
+            #書き込み途中のファイルが読まれないように一時ファイルを経由する
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': self.VERSION, 'sections': self.__sections}, f)
+            os.replace(tmp_path, self.__path)
+            self.__is_dirty = False
+        except OSError as e:
+            print(gen_msg(DiscoveryCache, MsgType.CAUTION, f'Failed to write the cache "{self.__path}". \n {e}'))
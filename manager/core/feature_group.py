@@ -0,0 +1,104 @@
+#This program is distributed under the MIT License.
+#See the LICENSE file for details.
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Set
+from time import monotonic
+
+from .utils.gen_msg import MsgType, gen_msg
+
+import bpy
+from bpy.app import timers
+
+#必要になったときだけ読み込む機能のまとまり
+@dataclass
+class FeatureGroup:
+    """Target folders that are loaded and registered only when they are needed
+
+    A group is activated when an editor of one of its space types is open in any window, or explicitly with
+    'AddonManager.activate_feature()'. If 'idle_timeout' is set, it is deactivated after being unused for that many seconds
+    (no editor of its space types is open and 'AddonManager.touch_feature()' has not been called).
+    """
+
+    name:         str
+    target_dirs:  List[str]
+    space_types:  List[str]    = field(default_factory=list) #有効にするエディターの種類(例: 'NODE_EDITOR', 'SEQUENCE_EDITOR', 'CLIP_EDITOR')
+    idle_timeout: float | None = None                        #使われなくなってから無効にするまでの秒数(Noneは無効にしない)
+
+class FeatureMonitor:
+    """Watches the editors open in all windows with a timer and activates or deactivates feature groups.
+    """
+
+    def __init__(self, groups: List[FeatureGroup], activate: Callable[[str], Any], deactivate: Callable[[str], Any], interval: float = 1.0) -> None:
+        """Initialize
+
+        Args:
+            groups (List[FeatureGroup]): Groups to watch
+            activate (Callable[[str], Any]): Function called with the name of a group to activate
+            deactivate (Callable[[str], Any]): Function called with the name of a group to deactivate
+            interval (float, optional): Seconds between checks. Defaults to 1.0.
+        """
+        self.__groups = groups
+        self.__activate = activate
+        self.__deactivate = deactivate
+        self.__interval = interval
+        self.__active: Set[str] = set()
+        self.__last_used: Dict[str, float] = {}
+        self.__failed: Set[str] = set() #有効にできなかったグループ(明示的に有効にされるまで再試行しない)
+        self.__timer = self.__tick #同じバウンドメソッドを使い続ける(理由はRegistrationSchedulerを参照)
+
+    @property
+    def is_running(self) -> bool: return timers.is_registered(self.__timer)
+
+    def start(self) -> None:
+        """Start watching (the first check is done immediately)"""
+        if not self.is_running: timers.register(self.__timer, first_interval=0.0, persistent=True)
+
+    def stop(self) -> None:
+        """Stop watching"""
+        if self.is_running: timers.unregister(self.__timer)
+
+    def touch(self, name: str, is_active: bool = True) -> None:
+        """Record that a group has been used now
+
+        Args:
+            name (str): Group name
+            is_active (bool, optional): Whether the group is active. Defaults to True.
+        """
+        self.__last_used[name] = monotonic()
+        if is_active:
+            self.__active.add(name)
+            self.__failed.discard(name)
+        else: self.__active.discard(name)
+
+    def check(self) -> None:
+        """Activate the groups whose editors are open and deactivate the idle groups"""
+        now = monotonic()
+        open_types = self.__open_space_types()
+
+        for group in self.__groups:
+            if open_types.intersection(group.space_types):
+                self.__last_used[group.name] = now
+                if group.name not in self.__active and group.name not in self.__failed: self.__call(self.__activate, group.name)
+            elif group.name in self.__active and group.idle_timeout is not None and now - self.__last_used.get(group.name, now) >= group.idle_timeout:
+                self.__call(self.__deactivate, group.name)
+
+    def __tick(self) -> float:
+        """Timer function"""
+        self.check()
+        return self.__interval
+
+    def __call(self, func: Callable[[str], Any], name: str) -> None:
+        """Call a function without throwing (an exception would stop the timer)"""
+        try:
+            func(name)
+        except Exception as e:
+            self.__failed.add(name)
+            print(gen_msg(FeatureMonitor, MsgType.ERROR, f'Failed to switch the feature group "{name}". \n {e}'))
+
+    @staticmethod
+    def __open_space_types() -> Set[str]:
+        """Get the types of the editors open in all windows"""
+        window_manager = bpy.context.window_manager
+        if window_manager is None: return set()
+        return {area.type for window in window_manager.windows for area in window.screen.areas}
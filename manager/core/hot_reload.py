@@ -0,0 +1,102 @@
+#This program is distributed under the MIT License.
+#See the LICENSE file for details.
+
+from typing import Dict, List
+from types import ModuleType
+
+import sys
+from importlib import reload
+
+from .discovery_cache import DiscoveryCache
+from .dependency_graph import DependencyGraph
+from .static_scan import StaticScanner
+
+class HotReloader:
+    """Detects the add-on modules changed on disk and reloads them together with their dependents.
+    """
+
+    def __init__(self, package: str, excluded: List[str] | None = None) -> None:
+        """Initialize and record the current state of the modules
+
+        Args:
+            package (str): Package name of the add-on
+            excluded (List[str] | None, optional): Packages that are never reloaded (such as this manager). Defaults to None.
+        """
+        self.__package = package
+        self.__excluded = tuple(excluded or [])
+        self.__scanner = StaticScanner([], package)
+        self.__graph = DependencyGraph()
+        self.__fingerprints: Dict[str, List[int]] = {}
+
+        self.snapshot()
+
+    def snapshot(self) -> None:
+        """Record the fingerprints of all add-on modules as the unchanged state
+        """
+        self.__fingerprints = {name: DiscoveryCache.fingerprint(mdl.__file__) for name, mdl in self.__tracked().items()} # type: ignore
+
+    def changed(self) -> List[str]:
+        """Get the modules whose files have changed since the last snapshot
+
+        Returns:
+            List[str]: Names of the changed modules
+        """
+        changed: List[str] = []
+        for name, mdl in self.__tracked().items():
+            fingerprint = DiscoveryCache.fingerprint(mdl.__file__) # type: ignore
+            if name not in self.__fingerprints: self.__fingerprints[name] = fingerprint #後からインポートされたモジュールは現在の状態を基準にする
+            elif not self.__fingerprints[name] == fingerprint: changed.append(name)
+
+        return changed
+
+    def plan(self) -> List[str]:
+        """Get the modules that have to be reloaded
+
+        Returns:
+            List[str]: Changed modules and their dependents in the order to reload them
+        """
+        changed = self.changed()
+        if not changed: return []
+
+        tracked = self.__tracked()
+        for name, mdl in tracked.items():
+            summary = self.__scanner.scan(mdl.__file__) # type: ignore (ファイルが変わっていなければ前回の解析結果が使われる)
+            imports = [self.__resolve(mdl, item) for item in summary.imports]
+            self.__graph.add(name, [item for item in imports if item in tracked])
+
+        return self.__graph.affected(changed)
+
+    def reload(self, names: List[str]) -> List[ModuleType]:
+        """Reload the modules in order and record their new state
+
+        Args:
+            names (List[str]): Modules to reload
+
+        Returns:
+            List[ModuleType]: Reloaded modules
+        """
+        modules = [reload(sys.modules[name]) for name in names]
+        for mdl in modules:
+            self.__fingerprints[mdl.__name__] = DiscoveryCache.fingerprint(mdl.__file__) # type: ignore
+
+        return modules
+
+    def __tracked(self) -> Dict[str, ModuleType]:
+        """Get the imported modules of the add-on (excluding the add-on package itself)"""
+        prefix = self.__package + '.'
+        return {
+            name: mdl for name, mdl in list(sys.modules.items())
+            if name.startswith(prefix) and not name.startswith(self.__excluded) and getattr(mdl, '__file__', None) and mdl.__file__.endswith('.py') # type: ignore
+        }
+
+    @staticmethod
+    def __resolve(mdl: ModuleType, name: str) -> str:
+        """Convert a relative import of the module into an absolute module name"""
+        level = len(name) - len(name.lstrip('.'))
+        if level == 0: return name
+
+        parts = (mdl.__package__ or '').split('.')
+        if level > 1: parts = parts[:-(level - 1)]
+
+        rest = name[level:]
+        return '.'.join(parts + [rest]) if rest else '.'.join(parts)
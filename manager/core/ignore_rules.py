@@ -0,0 +1,69 @@
+#This program is distributed under the MIT License.
+#See the LICENSE file for details.
+
+from typing import Any, Dict, List
+
+import re
+from fnmatch import translate
+
+class IgnoreMatcher:
+    """Matches module paths against the compiled 'ignore' rules.
+
+    Module paths are handled as tuples of names relative to the add-on folder (example: ('operators', 'sub', 'mdl')).
+    Each rule is relative to the directory whose '__init__.py' defines it, and has one of the following forms.
+
+    - Module path (example: 'sub.mdl'): The module, or the package and everything below it
+    - Glob pattern (example: 'vendor*'): Matched against the relative module path with 'fnmatch' syntax
+    - Regular expression prefixed with 're:' (example: 're:.*_test'): Matched against the whole relative module path
+    """
+
+    REGEX_PREFIX: str = 're:'
+    GLOB_CHARS:   str = '*?['
+
+    __TERMINAL: str = '' #トライ木の終端を表すキー(モジュール名に空文字列は使われない)
+
+    def __init__(self) -> None:
+        self.__trie: Dict[str, Any] = {}                             #モジュールパスのトライ木
+        self.__patterns: Dict[tuple[str, ...], List[re.Pattern[str]]] = {} #基準ディレクトリ -> コンパイル済みのパターン
+
+    def add(self, base: tuple[str, ...], rule: str) -> None:
+        """Compile and add a rule
+
+        Args:
+            base (tuple[str, ...]): Module path of the directory that defines the rule
+            rule (str): Ignore rule
+        """
+        if rule.startswith(self.REGEX_PREFIX):
+            self.__patterns.setdefault(base, []).append(re.compile(rule[len(self.REGEX_PREFIX):]))
+        elif any(c in rule for c in self.GLOB_CHARS):
+            self.__patterns.setdefault(base, []).append(re.compile(translate(rule)))
+        else:
+            node = self.__trie
+            for part in base + tuple(rule.strip('.').split('.')):
+                node = node.setdefault(part, {})
+            node[self.__TERMINAL] = True
+
+    def is_ignored(self, parts: tuple[str, ...]) -> bool:
+        """Check whether the module or package is ignored
+
+        Module path rules also match everything below the package. Patterns are only compared with the given path,
+        so directories that match should be pruned during traversal.
+
+        Args:
+            parts (tuple[str, ...]): Module path relative to the add-on folder
+
+        Returns:
+            bool: Whether it is ignored
+        """
+        node = self.__trie
+        for part in parts:
+            node = node.get(part)
+            if node is None: break
+            if self.__TERMINAL in node: return True
+
+        for base, patterns in self.__patterns.items():
+            if len(parts) <= len(base) or parts[:len(base)] != base: continue
+            rel = '.'.join(parts[len(base):])
+            if any(p.fullmatch(rel) for p in patterns): return True
+
+        return False
@@ -0,0 +1,56 @@
+#This program is distributed under the MIT License.
+#See the LICENSE file for details.
+
+from dataclasses import dataclass
+from typing import Dict, List
+
+#インポートに失敗したモジュールの情報
+@dataclass
+class ImportFailure:
+    """Module that failed to import
+    """
+
+    module:     str          #モジュール名
+    path:       str          #モジュールのファイル
+    error:      str          #例外の型名
+    message:    str          #例外のメッセージ
+    traceback:  str  = ''    #トレースバック(キャッシュからスキップした場合は空)
+    is_skipped: bool = False #前回失敗してから変更されていないため、インポートせずにスキップしたか
+
+class ImportReport:
+    """Failures collected by one 'ProcLoader.load_modules()' call.
+
+    The failed modules are quarantined: they are not returned by the loader, so their classes and
+    'register' functions are skipped while the rest of the add-on is registered.
+    """
+
+    def __init__(self) -> None:
+        self.__failures: Dict[str, ImportFailure] = {}
+
+    def __bool__(self) -> bool: return bool(self.__failures)
+
+    def __len__(self) -> int: return len(self.__failures)
+
+    def __contains__(self, module: str) -> bool: return module in self.__failures
+
+    @property
+    def failures(self) -> List[ImportFailure]:
+        """Failures in import order"""
+        return list(self.__failures.values())
+
+    def add(self, failure: ImportFailure) -> None:
+        """Record a failure
+
+        Args:
+            failure (ImportFailure): Failure of a module
+        """
+        self.__failures[failure.module] = failure
+
+    def format(self) -> str:
+        """Format the failures as text (one line per module)
+
+        Returns:
+            str: Formatted failures, or an empty string if there are none
+        """
+        lines = [f'{f.module}: {f.error}: {f.message}' + (' (skipped, unchanged since it failed)' if f.is_skipped else '') for f in self.__failures.values()]
+        return '\n'.join(lines)
@@ -2,9 +2,11 @@
 #See the LICENSE file for details.
 
 from dataclasses import dataclass
-from typing import Self, List
+from typing import Self, List, Dict, Any, Iterator
+from contextlib import contextmanager
 
 from .proc_loader import ProcLoader
+from .exceptions import ContextError
 
 from bpy import context
 from bpy.types import KeyMap, KeyMapItem
@@ -26,9 +28,30 @@ class Key:
     alt:          bool = False
     oskey:        bool = False
 
+#キーマップの場所
+@dataclass(frozen=True)
+class KeymapLocation:
+    """Arguments of 'keymaps.new()' that identify a keymap
+    """
+
+    name:        str  = 'Window'
+    space_type:  str  = 'EMPTY'
+    region_type: str  = 'WINDOW'
+    modal:       bool = False
+    tool:        bool = False
+
 #ショートカットキーを登録する
 class KeymapManager:
     """Manage the keymap.
+
+    Keymaps are cached per location, and the added items are indexed by operator 'bl_idname' and by keymap,
+    so deleting an item or an operator does not scan all registered items.
+
+    Between 'begin_update()' and 'commit_update()', keys that are added again with the same declaration
+    reuse the existing keymap items, and only the keys that are no longer declared are deleted.
+
+    Raises:
+        ContextError: Thrown if an update is started while another update is in progress.
     """
 
     #シングルトンパターン
@@ -42,7 +65,73 @@ class KeymapManager:
         if self.__isInitialized: return
         self.__isInitialized = True
 
-        self.__shortcut_keys: List[tuple[KeyMap, KeyMapItem]] = []
+        self.__keymaps: Dict[KeymapLocation, KeyMap] = {}                                     #場所 -> キーマップ
+        self.__shortcut_keys: Dict[tuple[KeyMap, KeyMapItem], str | None] = {}                #追加したキー -> 所有者(追加順)
+        self.__by_idname: Dict[str, Dict[tuple[KeyMap, KeyMapItem], None]] = {}              #bl_idname -> 追加したキー
+        self.__by_keymap: Dict[KeyMap, Dict[KeyMapItem, None]] = {}                           #キーマップ -> 追加したアイテム
+        self.__owner: str | None = None                                                       #現在追加しているキーの所有者(モジュール名)
+        self.__owned_keys: Dict[str, Dict[tuple[KeyMap, KeyMapItem], None]] = {}              #所有者 -> 追加したキー
+        self.__declarations: Dict[tuple[KeyMap, KeyMapItem], tuple[Any, ...]] = {}            #追加したキー -> 宣言(場所とキーの設定)
+        self.__pending: Dict[tuple[Any, ...], List[tuple[KeyMap, KeyMapItem]]] | None = None  #更新中: 再度宣言されていない既存のキー
+        self.__update_stats: Dict[str, int] = {}
+
+    @contextmanager
+    def owner(self, name: str | None) -> Iterator[None]:
+        """Attribute the keys added within the block to the owner.
+
+        Args:
+            name (str | None): Owner name (usually a module name)
+        """
+        prev, self.__owner = self.__owner, name
+        try:
+            yield
+        finally:
+            self.__owner = prev
+
+    def delete_owner(self, name: str) -> int:
+        """Delete all keymaps added by the owner.
+
+        Args:
+            name (str): Owner name
+
+        Returns:
+            int: Number of deleted keymap items
+        """
+        return sum(self.delete(kms) for kms in list(self.__owned_keys.pop(name, {})))
+
+    def begin_update(self, owners: List[str] | None = None) -> None:
+        """Start re-applying the keys of the owners as a diff.
+
+        Keys added until 'commit_update()' with the same operator, key settings and location as an existing key
+        of these owners reuse the existing keymap item instead of creating a new one.
+
+        Args:
+            owners (List[str] | None, optional): Owners whose keys are declared again. All keys if None. Defaults to None.
+
+        Raises:
+            ContextError: Thrown if an update is already in progress.
+        """
+        if self.__pending is not None: raise ContextError('"begin_update()" was called before the previous update was committed.')
+
+        if owners is None: targets = list(self.__shortcut_keys)
+        else: targets = [kms for owner in owners for kms in self.__owned_keys.get(owner, {})]
+
+        self.__pending = {}
+        for kms in targets: self.__pending.setdefault(self.__declarations[kms], []).append(kms)
+        self.__update_stats = {'added': 0, 'kept': 0, 'removed': 0}
+
+    def commit_update(self) -> Dict[str, int]:
+        """Delete the keys that were not declared again since 'begin_update()' and finish the update.
+
+        Returns:
+            Dict[str, int]: Number of keys that were 'added', 'kept' and 'removed'
+        """
+        pending, self.__pending = self.__pending or {}, None
+        for kms_list in pending.values():
+            for kms in kms_list:
+                if self.delete(kms): self.__update_stats['removed'] += 1
+
+        return self.__update_stats
 
     #ショートカットキーを追加する
     def add(self, keys: List[Key] | Key,
@@ -61,31 +150,51 @@ class KeymapManager:
         Returns:
             List[tuple[KeyMap, KeyMapItem]]: Registered key's keymap and keymap items
         """
-        if not isinstance(keys, List): keys = [keys] #リストでなければリストにする
+        return self.add_bulk({KeymapLocation(name, space_type, region_type, modal, tool): keys})
+
+    def add_bulk(self, bindings: Dict[KeymapLocation, List[Key] | Key]) -> List[tuple[KeyMap, KeyMapItem]]:
+        """Add keys to several keymaps in one pass
+
+        Args:
+            bindings (Dict[KeymapLocation, List[Key] | Key]): Keys to add, grouped by keymap location
 
+        Returns:
+            List[tuple[KeyMap, KeyMapItem]]: Registered key's keymap and keymap items
+        """
         key_config = context.window_manager.keyconfigs.addon #キーコンフィグ
 
         if not key_config: return [] #キーコンフィグがなければ中止
 
         shortcut_keys: List[tuple[KeyMap, KeyMapItem]] = [] #今回追加したショートカットキーを入れるリスト
 
-        #指定したロケーションでのキーマップを取得する
-        keymap = key_config.keymaps.new(
-            name=name, space_type=space_type, region_type=region_type, modal=modal, tool=tool
-        )
+        for location, keys in bindings.items():
+            if not isinstance(keys, List): keys = [keys] #リストでなければリストにする
 
-        for k in keys:
-            if ProcLoader.isDisabled(k.operator): continue
+            keymap = self.__get_keymap(key_config, location)
 
-            #キーマップにアイテムを追加する
-            keymap_item = keymap.keymap_items.new(
-                k.operator.bl_idname, k.key, k.trigger, # type: ignore
-                key_modifier=k.key_modifier, any=k.any, shift=k.shift, ctrl=k.ctrl, alt=k.alt, oskey=k.oskey
-            )
+            for k in keys:
+                if ProcLoader.isDisabled(k.operator): continue
+
+                declaration = (location, k.operator.bl_idname, k.key, k.trigger, k.key_modifier, k.any, k.shift, k.ctrl, k.alt, k.oskey) # type: ignore
+
+                #更新中で同じ宣言のキーがあればそのまま使う
+                kms = self.__take_pending(declaration)
+                if kms:
+                    self.__unindex(kms)
+                    self.__index(kms[0], kms[1], declaration) #現在の所有者に付け替える
+                    shortcut_keys.append(kms)
+                    self.__update_stats['kept'] += 1
+                    continue
 
-            shortcut_keys.append((keymap, keymap_item))
+                #キーマップにアイテムを追加する
+                keymap_item = keymap.keymap_items.new(
+                    k.operator.bl_idname, k.key, k.trigger, # type: ignore
+                    key_modifier=k.key_modifier, any=k.any, shift=k.shift, ctrl=k.ctrl, alt=k.alt, oskey=k.oskey
+                )
 
-        self.__shortcut_keys += shortcut_keys
+                shortcut_keys.append((keymap, keymap_item))
+                self.__index(keymap, keymap_item, declaration)
+                if self.__pending is not None: self.__update_stats['added'] += 1
 
         return shortcut_keys
 
@@ -100,27 +209,78 @@ class KeymapManager:
         """
 
         if type(subject) == tuple:
-            try:
-                subject[0].keymap_items.remove(subject[1]) #type: ignore
-                self.__shortcut_keys.remove(subject) #type: ignore
-                return True
-            except ValueError:
-                return False
-        else:
-            is_deleted = False
-            for keymap, keymap_item in self.__shortcut_keys:
-                if not keymap_item.idname == subject.bl_idname: continue  # type: ignore
-                keymap.keymap_items.remove(keymap_item)
-                is_deleted = True
-            return is_deleted
+            if subject not in self.__shortcut_keys: return False
+            #削除したアイテムは参照できなくなるため、索引から先に外す
+            self.__unindex(subject) #type: ignore
+            subject[0].keymap_items.remove(subject[1]) #type: ignore
+            return True
+
+        kms_list = list(self.__by_idname.get(subject.bl_idname, {})) # type: ignore
+        for kms in kms_list: self.delete(kms)
+        return bool(kms_list)
 
     def unregister(self):
         """Delete all keymaps registered in this class.
         """
 
-        for kms in self.__shortcut_keys:
-            self.delete(kms)
+        for keymap, items in self.__by_keymap.items():
+            for keymap_item in items: keymap.keymap_items.remove(keymap_item)
 
+        self.__keymaps.clear()
         self.__shortcut_keys.clear()
+        self.__by_idname.clear()
+        self.__by_keymap.clear()
+        self.__owned_keys.clear()
+        self.__declarations.clear()
+        self.__pending = None
+
+    @classmethod
+    def reset(cls) -> None:
+        """Delete all keymaps and discard the instance, so that the next call creates a new one.
+        """
+        instance = cls.__dict__.get('_instance')
+        if instance is None: return
+
+        instance.unregister()
+        del cls._instance
+
+    def __get_keymap(self, key_config: object, location: KeymapLocation) -> KeyMap:
+        """Get the keymap of the location, creating it only the first time"""
+        keymap = self.__keymaps.get(location)
+        if keymap is None:
+            keymap = key_config.keymaps.new( # type: ignore
+                name=location.name, space_type=location.space_type, region_type=location.region_type, modal=location.modal, tool=location.tool
+            )
+            self.__keymaps[location] = keymap
+
+        return keymap # type: ignore
+
+    def __take_pending(self, declaration: tuple[Any, ...]) -> tuple[KeyMap, KeyMapItem] | None:
+        """Take an existing key with the same declaration during an update"""
+        if not self.__pending: return None
+
+        kms_list = self.__pending.get(declaration)
+        while kms_list:
+            kms = kms_list.pop()
+            if kms in self.__shortcut_keys: return kms #更新中に削除されたキーは使わない
+
+        return None
+
+    def __index(self, keymap: KeyMap, keymap_item: KeyMapItem, declaration: tuple[Any, ...]) -> None:
+        """Add a registered key to the indexes"""
+        kms = (keymap, keymap_item)
+        self.__shortcut_keys[kms] = self.__owner
+        self.__declarations[kms] = declaration
+        self.__by_idname.setdefault(declaration[1], {})[kms] = None #宣言のbl_idnameを使う
+        self.__by_keymap.setdefault(keymap, {})[keymap_item] = None
+        if self.__owner: self.__owned_keys.setdefault(self.__owner, {})[kms] = None
+
+    def __unindex(self, kms: tuple[KeyMap, KeyMapItem]) -> None:
+        """Remove a deleted key from the indexes"""
+        owner = self.__shortcut_keys.pop(kms)
+        declaration = self.__declarations.pop(kms)
+        self.__by_idname.get(declaration[1], {}).pop(kms, None) #削除されたアイテムの属性は参照できないため、宣言から取得する
+        self.__by_keymap.get(kms[0], {}).pop(kms[1], None)
+        if owner: self.__owned_keys.get(owner, {}).pop(kms, None)
 
     __isInitialized = False
@@ -0,0 +1,241 @@
+#This program is distributed under the MIT License.
+#See the LICENSE file for details.
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List
+
+import ast
+import builtins
+from importlib import import_module
+
+from .utils.gen_msg import MsgType, gen_msg
+from .static_scan import StaticScanner
+
+from bpy import props, types
+from bpy.types import Operator
+
+#静的に読み取ったオペレーターの定義
+@dataclass
+class OperatorSpec:
+    """Definition of an operator read from the source without importing its module
+    """
+
+    module:      str                                                          #モジュール名
+    name:        str                                                          #クラス名
+    attributes:  Dict[str, Any]                                               #'bl_'で始まる属性
+    properties:  List[tuple[str, str, Dict[str, Any]]] = field(default_factory=list) #(プロパティ名, bpy.propsの関数名, キーワード引数)
+    methods:     List[str]      = field(default_factory=list)                 #クラスで定義されたBlenderのコールバック
+    priority:    int | None     = None
+    is_critical: bool           = False
+
+class LazyOperator:
+    """Registers lightweight proxies of operators and imports their modules on first use.
+
+    A proxy has the 'bl_' attributes, the properties and the callbacks of the operator read from the source.
+    The first time one of its callbacks is called (usually 'poll' or 'invoke'), the real module is imported
+    and the attributes of the real class (methods, helpers and class variables) are copied onto the proxy,
+    so later calls run the real code directly.
+    Only literal values can be read statically, so operators that use other values are imported normally.
+    """
+
+    #コールバック -> (クラスメソッドか, 引数の数(selfまたはclsを除く), 読み込めなかった場合の戻り値)
+    CALLBACKS: Dict[str, tuple[bool, int, Any]] = {
+        'poll':        (True,  1, False),
+        'description': (True,  2, ''),
+        'execute':     (False, 1, {'CANCELLED'}),
+        'invoke':      (False, 2, {'CANCELLED'}),
+        'modal':       (False, 2, {'CANCELLED'}),
+        'draw':        (False, 1, None),
+        'cancel':      (False, 1, None),
+        'check':       (False, 1, False),
+    }
+
+    __FAILED: object = object() #インポートに失敗したことを表す
+
+    @classmethod
+    def parse(cls, path: str, module: str, class_names: List[str]) -> List[OperatorSpec] | None:
+        """Read the operators of a module
+
+        Args:
+            path (str): Path to the module file
+            module (str): Module name
+            class_names (List[str]): Names of the add-on classes in the module (see 'StaticScanner')
+
+        Returns:
+            List[OperatorSpec] | None: Operators, or None if the module has to be imported
+                (one of the classes cannot be made lazy, no operator was read, or the module has other classes that look like add-on classes)
+        """
+        tree = StaticScanner.parse(path)
+        if tree is None: return None
+
+        specs: List[OperatorSpec] = []
+        read: set[str] = set() #読み取ったクラス(無効化されたクラスを含む)
+        for node in StaticScanner.iter_module_level(tree.body):
+            if not isinstance(node, ast.ClassDef): continue
+            if node.name not in class_names:
+                if cls.__is_addon_class(node): return None #スキャナーが見落としたクラスは遅延読み込みの対象外になるため、モジュールごとインポートする
+                continue
+
+            spec = cls.__parse_class(node, module)
+            if spec is None: return None
+            if spec is not cls.__FAILED: specs.append(spec) # type: ignore
+            read.add(node.name)
+
+        if not read or read != set(class_names): return None
+        return specs
+
+    @classmethod
+    def create(cls, spec: OperatorSpec) -> type:
+        """Create a proxy class
+
+        Args:
+            spec (OperatorSpec): Definition of the operator
+
+        Returns:
+            type: Proxy class that can be registered in place of the operator
+        """
+        namespace: Dict[str, Any] = dict(spec.attributes)
+        namespace.update({
+            '__module__': spec.module,
+            '__qualname__': spec.name,
+            '__annotations__': {name: getattr(props, func)(**kwargs) for name, func, kwargs in spec.properties},
+            'addon_proc_lazy_spec': spec,
+        })
+        if spec.priority is not None: namespace['addon_proc_priority'] = spec.priority
+        if spec.is_critical: namespace['addon_proc_is_critical'] = True
+
+        for method in spec.methods: namespace[method] = cls.__stub(method)
+
+        return type(spec.name, (Operator, ), namespace)
+
+    @staticmethod
+    def is_loaded(proxy: type) -> bool:
+        """Check whether the module of a proxy has been imported"""
+        return proxy.__dict__.get('addon_proc_lazy_real') not in (None, LazyOperator.__FAILED)
+
+    @classmethod
+    def load(cls, proxy: type) -> type | None:
+        """Import the module of a proxy and copy the attributes of the real class onto it (done only once)
+
+        Args:
+            proxy (type): Proxy class
+
+        Returns:
+            type | None: Real class, or None if the module could not be imported
+        """
+        real = proxy.__dict__.get('addon_proc_lazy_real')
+        if real is cls.__FAILED: return None
+        if real is not None: return real
+
+        spec: OperatorSpec = proxy.addon_proc_lazy_spec # type: ignore
+        try:
+            real = getattr(import_module(spec.module), spec.name)
+        except Exception as e: #描画中に呼ばれるため、例外を投げずに記録して以降は再試行しない
+            print(gen_msg(LazyOperator, MsgType.ERROR, f'Failed to load "{spec.module}.{spec.name}". \n {e}'))
+            setattr(proxy, 'addon_proc_lazy_real', cls.__FAILED)
+            return None
+
+        for name, value in vars(real).items():
+            if name.startswith(('__', 'bl_', 'addon_proc_')): continue #Blenderが管理する属性とこのマネージャーの属性はコピーしない
+            setattr(proxy, name, value)
+
+        setattr(proxy, 'addon_proc_lazy_real', real)
+        return real
+
+    @classmethod
+    def __parse_class(cls, node: ast.ClassDef, module: str) -> OperatorSpec | object | None:
+        """Read one class (returns __FAILED for disabled classes and None if the class cannot be made lazy)"""
+        if len(node.bases) != 1 or node.keywords: return None
+        base = StaticScanner.dotted_name(node.bases[0])
+        if base is None or base.split('.')[-1] != Operator.__name__: return None
+
+        spec = OperatorSpec(module, node.name, {})
+
+        #このマネージャーのデコレーターだけを扱う(他のデコレーターはクラスを書き換える可能性がある)
+        for decorator in node.decorator_list:
+            call = decorator if isinstance(decorator, ast.Call) else None
+            name = StaticScanner.dotted_name(call.func if call else decorator)
+            name = name.split('.')[-1] if name else None
+
+            if name == 'disable' and not call: return cls.__FAILED
+            elif name == 'critical' and not call: spec.is_critical = True
+            elif name == 'priority' and call and len(call.args) == 1 and not call.keywords:
+                value = cls.__literal(call.args[0])
+                if not isinstance(value, int): return None
+                spec.priority = value
+            else: return None
+
+        for stmt in node.body:
+            if isinstance(stmt, ast.Assign):
+                names = [t.id for t in stmt.targets if isinstance(t, ast.Name) and t.id.startswith('bl_')]
+                if not names: continue
+                value = cls.__literal(stmt.value)
+                if value is cls.__FAILED: return None
+                for name in names: spec.attributes[name] = value
+            elif isinstance(stmt, ast.AnnAssign) and isinstance(stmt.target, ast.Name) and isinstance(stmt.annotation, ast.Call):
+                prop = cls.__parse_property(stmt.annotation)
+                if prop is None: return None
+                spec.properties.append((stmt.target.id, prop[0], prop[1]))
+            elif isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef)) and stmt.name in cls.CALLBACKS:
+                spec.methods.append(stmt.name)
+
+        return spec
+
+    @staticmethod
+    def __is_addon_class(node: ast.ClassDef) -> bool:
+        """Check whether a class looks like an add-on class ('bl_' attributes or a base in 'bpy.types')"""
+        for stmt in node.body:
+            targets = stmt.targets if isinstance(stmt, ast.Assign) else [stmt.target] if isinstance(stmt, ast.AnnAssign) else []
+            if any(isinstance(t, ast.Name) and t.id.startswith('bl_') for t in targets): return True
+
+        for base in node.bases:
+            name = StaticScanner.dotted_name(base)
+            if name and name not in vars(builtins) and hasattr(types, name.split('.')[-1]): return True
+
+        return False
+
+    @classmethod
+    def __parse_property(cls, node: ast.Call) -> tuple[str, Dict[str, Any]] | None:
+        """Read a property definition such as 'FloatProperty(name="Value", default=1.0)'"""
+        name = StaticScanner.dotted_name(node.func)
+        func = name.split('.')[-1] if name else ''
+        if not func.endswith('Property') or not hasattr(props, func) or node.args: return None
+
+        kwargs: Dict[str, Any] = {}
+        for keyword in node.keywords:
+            value = cls.__literal(keyword.value)
+            if keyword.arg is None or value is cls.__FAILED: return None #'update'等の関数や'**kwargs'は読み取れない
+            kwargs[keyword.arg] = value
+
+        return (func, kwargs)
+
+    @classmethod
+    def __literal(cls, node: ast.expr) -> Any:
+        """Evaluate a literal (returns __FAILED if it is not a literal)"""
+        try:
+            return ast.literal_eval(node)
+        except ValueError:
+            return cls.__FAILED
+
+    @classmethod
+    def __stub(cls, method: str) -> Callable[..., Any]:
+        """Create a callback that loads the real class and calls its method"""
+        is_class_method, arg_count, default = cls.CALLBACKS[method]
+
+        def call(owner: Any, *args: Any) -> Any:
+            proxy = owner if isinstance(owner, type) else type(owner)
+            if cls.load(proxy) is None: return default
+
+            func = getattr(owner, method, None)
+            if func is None or getattr(getattr(func, '__func__', func), 'addon_proc_is_lazy_stub', False): return default #実際のクラスで定義されていない
+            return func(*args)
+
+        #Blenderはコールバックの引数の数を確認するため、元のメソッドと同じ数にする
+        if arg_count == 1:
+            def stub(owner: Any, context: Any) -> Any: return call(owner, context)
+        else:
+            def stub(owner: Any, context: Any, other: Any) -> Any: return call(owner, context, other)
+
+        setattr(stub, 'addon_proc_is_lazy_stub', True)
+        stub.__name__ = stub.__qualname__ = method
+        return classmethod(stub) if is_class_method else stub # type: ignore
@@ -0,0 +1,202 @@
+#This program is distributed under the MIT License.
+#See the LICENSE file for details.
+
+from typing import Any, Dict, List, Sequence
+from types import ModuleType
+
+import os
+import sys
+import argparse
+import hashlib
+from os.path import join, dirname, isfile, relpath
+
+from .utils.gen_msg import MsgType, gen_msg
+from .proc_loader import ProcLoader
+
+class RegistrationManifest:
+    """Freezes the result of 'ProcLoader.load()' into a generated Python module for release builds.
+
+    The manifest holds the modules in import order, the classes in registration order and the attributes
+    the loader assigned ('bl_idname', 'bl_category'), so the add-on can be loaded without walking the folders,
+    reading the ignore lists, classifying the classes or sorting them.
+    Its checksum covers the Python files in the target folders and the debug mode, so it can be verified against the tree.
+    """
+
+    VERSION: int = 1
+    ATTRIBUTES: tuple[str, ...] = ('bl_idname', 'bl_category') #ProcLoaderが自動で設定する属性
+
+    @staticmethod
+    def checksum(addon_path: str, target_dirs: List[str], is_debug_mode: bool = False) -> str:
+        """Compute the checksum of the Python files in the target folders
+
+        Args:
+            addon_path (str): Path to the add-on folder
+            target_dirs (List[str]): Target folders
+            is_debug_mode (bool, optional): Debug mode (the 'debug' folders are only loaded in debug mode). Defaults to False.
+
+        Returns:
+            str: Hexadecimal SHA-256 digest
+        """
+        digest = hashlib.sha256(repr((sorted(target_dirs), is_debug_mode)).encode())
+
+        for target in sorted(target_dirs):
+            for root, dirs, files in os.walk(join(addon_path, target)):
+                dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+                for file in sorted(files):
+                    if not file.endswith('.py'): continue
+                    path = join(root, file)
+                    digest.update(relpath(path, addon_path).replace(os.sep, '/').encode() + b'\0')
+                    with open(path, 'rb') as f: digest.update(hashlib.sha256(f.read()).digest())
+
+        return digest.hexdigest()
+
+    @classmethod
+    def build(cls, loader: ProcLoader, addon_path: str, target_dirs: List[str], cat_name: str | None = None, is_debug_mode: bool = False) -> str:
+        """Run the loader pipeline and generate the source of the manifest module
+
+        Args:
+            loader (ProcLoader): Loader of the add-on
+            addon_path (str): Path to the add-on folder
+            target_dirs (List[str]): Target folders
+            cat_name (str | None, optional): Default category name applied to the panel. Defaults to None.
+            is_debug_mode (bool, optional): Debug mode of the loader. Defaults to False.
+
+        Raises:
+            ValueError: Thrown if a module fails to import.
+
+        Returns:
+            str: Source of the manifest module
+        """
+        modules = loader.load_modules(loader.load_files(target_dirs))
+        if loader.report: raise ValueError(gen_msg(RegistrationManifest, MsgType.ERROR, f'Fix the modules that failed to load before generating the manifest. \n{loader.report.format()}'))
+
+        #ローダーが設定した属性だけを記録するため、読み込み前に定義されていた属性を調べておく
+        defined = {(clazz, attr) for mdl in modules for clazz in vars(mdl).values()
+                   if isinstance(clazz, type) and clazz.__module__ == mdl.__name__ for attr in cls.ATTRIBUTES if hasattr(clazz, attr)}
+
+        classes = loader.load_classes(modules, cat_name)
+
+        #クラスはモジュール内で束縛されている名前で記録する(ローカルで定義されたクラスも参照できる)
+        names: Dict[object, str] = {}
+        for mdl in modules:
+            for name, clazz in vars(mdl).items():
+                if isinstance(clazz, type) and clazz.__module__ == mdl.__name__: names.setdefault(clazz, name)
+        keys = [(clazz.__module__, names[clazz]) for clazz in classes] # type: ignore
+
+        attributes: Dict[tuple[str, str], Dict[str, Any]] = {}
+        for key, clazz in zip(keys, classes):
+            assigned = {attr: getattr(clazz, attr) for attr in cls.ATTRIBUTES if hasattr(clazz, attr) and (clazz, attr) not in defined}
+            if assigned: attributes[key] = assigned
+
+        lines = [
+            "#This file was generated by 'manager/core/manifest.py'. Do not edit it.",
+            '',
+            f'VERSION = {cls.VERSION!r}',
+            f'TARGET_DIRS = {list(target_dirs)!r}',
+            f'IS_DEBUG_MODE = {is_debug_mode!r}',
+            f'CHECKSUM = {cls.checksum(addon_path, target_dirs, is_debug_mode)!r}',
+            '',
+            'MODULES = [',
+            *[f'    {mdl.__name__!r},' for mdl in modules],
+            ']',
+            '',
+            'CLASSES = [',
+            *[f'    {key!r},' for key in keys],
+            ']',
+            '',
+            'ATTRIBUTES = {',
+            *[f'    {key!r}: {value!r},' for key, value in attributes.items()],
+            '}',
+            '',
+        ]
+        return '\n'.join(lines)
+
+    @classmethod
+    def write(cls, path: str, target_dirs: List[str], output: str | None = None, cat_name: str | None = None, is_debug_mode: bool = False) -> str:
+        """Generate the manifest of an add-on and write it
+
+        Args:
+            path (str): Path to the add-on folder or '__init__.py' file
+            target_dirs (List[str]): Target folders
+            output (str | None, optional): Path of the manifest module. 'addon_manifest.py' in the add-on folder if None. Defaults to None.
+            cat_name (str | None, optional): Default category name applied to the panel. Defaults to None.
+            is_debug_mode (bool, optional): Debug mode of the loader. Defaults to False.
+
+        Returns:
+            str: Path of the written manifest
+        """
+        addon_path = dirname(path) if isfile(path) else path
+        output = output or join(addon_path, 'addon_manifest.py')
+
+        source = cls.build(ProcLoader(addon_path, is_debug_mode=is_debug_mode), addon_path, target_dirs, cat_name, is_debug_mode)
+        with open(output, 'w', encoding='utf-8') as f: f.write(source)
+
+        return output
+
+    @classmethod
+    def is_valid(cls, manifest: ModuleType, addon_path: str, target_dirs: List[str], is_debug_mode: bool = False, is_verify: bool = False) -> bool:
+        """Check whether a manifest can be used
+
+        Args:
+            manifest (ModuleType): Manifest module
+            addon_path (str): Path to the add-on folder
+            target_dirs (List[str]): Target folders
+            is_debug_mode (bool, optional): Debug mode. Defaults to False.
+            is_verify (bool, optional): Also compare the checksum with the files (reads all files in the target folders). Defaults to False.
+
+        Returns:
+            bool: Whether the manifest matches
+        """
+        if getattr(manifest, 'VERSION', None) != cls.VERSION or getattr(manifest, 'TARGET_DIRS', None) != list(target_dirs): return False
+        if getattr(manifest, 'IS_DEBUG_MODE', None) != is_debug_mode: return False
+        return not is_verify or manifest.CHECKSUM == cls.checksum(addon_path, target_dirs, is_debug_mode)
+
+    @staticmethod
+    def load(manifest: ModuleType, loader: ProcLoader) -> List[Sequence[ModuleType | object]]:
+        """Import the modules of a manifest and get the classes without searching the folders
+
+        The classes of modules that fail to import are skipped (see 'ProcLoader.load_modules()').
+
+        Args:
+            manifest (ModuleType): Manifest module
+            loader (ProcLoader): Loader of the add-on (used to import the modules)
+
+        Raises:
+            AttributeError: Thrown if a class in the manifest does not exist.
+
+        Returns:
+            List[Sequence[ModuleType | object]]: Loaded modules and classes (Module in column 0, class in column 1)
+        """
+        modules = loader.load_modules(manifest.MODULES)
+
+        classes: List[object] = []
+        for key in manifest.CLASSES:
+            if key[0] in loader.report: continue
+            clazz = getattr(sys.modules[key[0]], key[1])
+            for attr, value in manifest.ATTRIBUTES.get(key, {}).items(): setattr(clazz, attr, value)
+            classes.append(clazz)
+
+        return [modules, classes]
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Generate a manifest from the command line (run it inside Blender, because the add-on classes are imported)
+
+    The arguments after '--' are used when 'argv' is None, so it can be called from 'blender --background --python-expr'.
+
+    Returns:
+        int: Exit code
+    """
+    if argv is None: argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+
+    parser = argparse.ArgumentParser(description='Generate a registration manifest for a release build of the add-on.')
+    parser.add_argument('path', help='Add-on folder')
+    parser.add_argument('dirs', nargs='+', help='Target folders')
+    parser.add_argument('--output', help="Path of the manifest module (default: 'addon_manifest.py' in the add-on folder)")
+    parser.add_argument('--cat-name', help="Default 'bl_category' of the panels")
+    parser.add_argument('--debug', action='store_true', help='Include the debug folders')
+    args = parser.parse_args(argv)
+
+    output = RegistrationManifest.write(args.path, args.dirs, args.output, args.cat_name, args.debug)
+    print(gen_msg(RegistrationManifest, MsgType.INFO, f'Wrote "{output}".'))
+
+    return 0
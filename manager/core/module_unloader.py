@@ -0,0 +1,141 @@
+#This program is distributed under the MIT License.
+#See the LICENSE file for details.
+
+from dataclasses import dataclass, field
+from typing import Any, List
+
+import gc
+import sys
+import linecache
+import tracemalloc
+import zipimport
+from os.path import abspath, normcase, sep
+
+from .utils.gen_msg import MsgType, gen_msg
+
+from bpy.app import handlers
+
+#アンロードの結果
+@dataclass
+class UnloadReport:
+    """Result of unloading an add-on
+    """
+
+    modules:          List[str]                                 #sys.modulesから削除したモジュール
+    handlers:         List[str] = field(default_factory=list)   #残っていたため削除したハンドラー
+    singletons:       List[str] = field(default_factory=list)   #破棄したシングルトン
+    is_path_restored: bool       = False                        #sys.pathからアドオンのフォルダを削除したか
+    objects:          int        = 0                            #解放されたオブジェクトの数(ガベージコレクションが追跡しているもの)
+    bytes:            int | None = None                         #解放されたメモリ(tracemallocで追跡していない場合はNone)
+
+    def format(self) -> str:
+        """Format the result as one line of text"""
+        size = 'unknown bytes (tracemalloc is not tracing)' if self.bytes is None else f'{self.bytes} bytes'
+        return f'Unloaded {len(self.modules)} modules, reclaimed {self.objects} objects and {size}.'
+
+class ModuleUnloader:
+    """Removes an add-on package from the interpreter so that its modules can be freed.
+
+    The modules of the package are removed from 'sys.modules' and their parent packages, the path added by 'ProcLoader' is removed from 'sys.path',
+    the singletons defined in the package are reset, and the caches and handlers that would keep the modules alive are cleared.
+    The reclaimed objects are counted with 'gc', and the reclaimed bytes are measured with 'tracemalloc' if it is tracing.
+    """
+
+    def __init__(self, package: str, root: str, added_path: str | None = None) -> None:
+        """Initialize
+
+        Args:
+            package (str): Package name of the add-on
+            root (str): Path to the add-on folder
+            added_path (str | None, optional): Path added to 'sys.path' for the add-on (it is removed). Defaults to None.
+        """
+        self.__package = package
+        self.__root = normcase(abspath(root))
+        self.__added_path = added_path
+
+    def unload(self) -> UnloadReport:
+        """Unload the add-on package
+
+        Call it after the add-on has been unregistered. The modules keep working for the objects that still reference them,
+        but they are imported again the next time the add-on is enabled.
+
+        Returns:
+            UnloadReport: Result
+        """
+        gc.collect() #以前のゴミを計測に含めない
+        objects = len(gc.get_objects())
+        memory = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+
+        names = sorted(name for name in sys.modules if self.__is_own_name(name))
+        report = UnloadReport(list(names))
+
+        #シングルトンは自身のモジュールがなくなっても、タイマーや描画ハンドラーから参照されていると残り続ける
+        for name in names:
+            for clazz in list(vars(sys.modules[name]).values()):
+                if not isinstance(clazz, type) or clazz.__module__ != name or '_instance' not in vars(clazz): continue
+                self.__reset(clazz)
+                report.singletons.append(f'{name}.{clazz.__qualname__}')
+
+        report.handlers = self.__remove_handlers()
+
+        #子モジュールから削除する(親パッケージの属性からの参照も外す。アドオンのパッケージ自体はBlenderが参照している間は残る)
+        for name in reversed(names):
+            mdl = sys.modules.pop(name, None)
+            parent, _, child = name.rpartition('.')
+            if mdl is not None and getattr(sys.modules.get(parent), child, None) is mdl: delattr(sys.modules[parent], child)
+
+        if self.__added_path and self.__added_path in sys.path:
+            sys.path.remove(self.__added_path)
+            report.is_path_restored = True
+
+        self.__clear_caches()
+
+        gc.collect()
+        report.objects = max(objects - len(gc.get_objects()), 0)
+        if memory is not None and tracemalloc.is_tracing(): report.bytes = max(memory - tracemalloc.get_traced_memory()[0], 0)
+
+        return report
+
+    def __is_own_name(self, name: str) -> bool:
+        """Check whether a module belongs to the add-on package"""
+        return name == self.__package or name.startswith(self.__package + '.')
+
+    def __is_own_path(self, path: Any) -> bool:
+        """Check whether a path is inside the add-on folder"""
+        if not isinstance(path, str): return False
+        path = normcase(abspath(path))
+        return path == self.__root or path.startswith(self.__root + sep)
+
+    @staticmethod
+    def __reset(clazz: type) -> None:
+        """Reset a singleton ('reset()' releases what it holds, otherwise the instance is only discarded)"""
+        reset = getattr(clazz, 'reset', None)
+        try:
+            if callable(reset): reset()
+            elif '_instance' in vars(clazz): delattr(clazz, '_instance')
+        except Exception as e:
+            print(gen_msg(ModuleUnloader, MsgType.CAUTION, f'Failed to reset "{clazz.__qualname__}". \n {e}'))
+
+    def __remove_handlers(self) -> List[str]:
+        """Remove the application handlers of the add-on that were not removed by its 'unregister' function"""
+        removed: List[str] = []
+        for name in dir(handlers):
+            handler_list = getattr(handlers, name)
+            if name.startswith('_') or not isinstance(handler_list, list): continue
+
+            for func in list(handler_list): # type: ignore
+                if not self.__is_own_name(getattr(func, '__module__', None) or ''): continue
+                handler_list.remove(func) # type: ignore
+                removed.append(f'{name}: {func.__module__}.{getattr(func, "__qualname__", func)}')
+
+        if removed: print(gen_msg(ModuleUnloader, MsgType.CAUTION, f'Removed handlers that were not removed by the add-on. \n {", ".join(removed)}'))
+        return removed
+
+    def __clear_caches(self) -> None:
+        """Clear the caches of the import system and the source lines that reference files of the add-on"""
+        for path in [path for path in sys.path_importer_cache if self.__is_own_path(path)]: del sys.path_importer_cache[path]
+        for path in [path for path in linecache.cache if self.__is_own_path(path)]: del linecache.cache[path]
+
+        #アーカイブの中央ディレクトリのキャッシュ
+        zip_cache = getattr(zipimport, '_zip_directory_cache', {})
+        for path in [path for path in zip_cache if self.__is_own_path(path)]: del zip_cache[path]
@@ -4,18 +4,26 @@
 # pyright: reportAttributeAccessIssue = false
 # pyright: reportUnknownMemberType = false
 
-from typing import Sequence, List, Dict, Set
+from typing import Sequence, List, Dict, Set, Iterator
 from types import ModuleType
 
 import os
-from os import walk
-from os.path import dirname, basename, join, splitext, isfile, exists
+from os.path import dirname, basename, join, splitext, isfile, exists, relpath, abspath, normcase
 from importlib import import_module
-from inspect import getmembers, isclass
+from traceback import format_exc
 import sys
 
 from .utils.gen_msg import MsgType, gen_msg
 from .exceptions import DuplicateAttributeError
+from .discovery_cache import DiscoveryCache
+from .static_scan import StaticScanner
+from .ignore_rules import IgnoreMatcher
+from .class_classifier import ClassClassifier
+from .profiler import Profiler, NullProfiler, NULL_PROFILER
+from .bytecode_warmup import BytecodeWarmup
+from .archive import AddonArchive
+from .lazy_operator import LazyOperator, OperatorSpec
+from .import_report import ImportReport, ImportFailure
 
 from bpy import types
 
@@ -25,6 +33,12 @@ def disable(cls: object) -> object:
     cls.addon_proc_is_disabled = True
     return cls
 
+#このデコレータが付いている場合、段階的な登録でもそのクラスはすぐに登録されます。
+def critical(cls: object) -> object:
+    if hasattr(cls, 'addon_proc_is_critical'): raise DuplicateAttributeError("The 'addon_proc_is_critical' attribute is used in the 'critical' decorator.")
+    cls.addon_proc_is_critical = True
+    return cls
+
 #このデコレータで読み込みの優先順位を付けられます。付けられなかった場合は最後になります。
 def priority(pr: int):
     def _priority(cls: object):
@@ -57,25 +71,87 @@ class ProcLoader:
         types.FCurveSample, types.FCurveModifiers, types.CompositorNodeTree, types.ShaderNodeTree, types.TextureNodeTree, types.GeometryNodeTree, types.OperatorMacro
     )
 
-    def __init__(self, path: str, target_classes: List[object] | None = None, is_debug_mode: bool = False) -> None:
+    def __init__(self, path: str, target_classes: List[object] | None = None, is_debug_mode: bool = False, cache_path: str | None = None,
+                 is_static_scan: bool = False, is_import_fallback: bool = False, profiler: Profiler | None = None, is_bytecode_warmup: bool = False,
+                 archive: str | None = None, is_lazy_operators: bool = False) -> None:
         """Initialize and add addon folder to module search path
 
         Args:
             path (str): Path to the add-on folder
             target_classes (object | None, optional): Type of class to load. Defaults to None.
             is_debug_mode (bool, optional): Presence of debug mode. Defaults to False.
+            cache_path (str | None, optional): Path to the discovery cache file. The cache is not used if None.
+                Modules that failed to import are also recorded in it and skipped until they are edited. Defaults to None.
+            is_static_scan (bool, optional): Analyze modules statically and skip those without add-on classes or 'register'/'unregister' functions. Defaults to False.
+            is_import_fallback (bool, optional): Import '__init__.py' when its 'ignore' list is not a literal. Defaults to False.
+            profiler (Profiler | None, optional): Profiler that measures each phase. Nothing is measured if None. Defaults to None.
+            is_bytecode_warmup (bool, optional): Compile the modules to bytecode in parallel before importing them. Defaults to False.
+            archive (str | None, optional): Path to an archive built by 'AddonArchive' (relative to the add-on folder or absolute).
+                If it exists, the modules are discovered from its index and imported from it. Defaults to None.
+            is_lazy_operators (bool, optional): Register proxies for the operators of the modules listed in the 'lazy' lists, and import them on first use. Defaults to False.
         """
         root = dirname(path) if isfile(path) else path #指定されたパスがファイルであれば最後のフォルダまでのパスを取得する
         self.__dir_name = basename(root) #アドオンのフォルダ名       例:addon_folder
         self.__path = dirname(root)      #アドオンフォルダまでのパス 例:path/to/blender/script/
         self.__is_debug_mode = is_debug_mode
+        self.__is_import_fallback = is_import_fallback
+        self.__profiler: Profiler | NullProfiler = profiler or NULL_PROFILER
+        self.__warmup = BytecodeWarmup() if is_bytecode_warmup else None
+        self.__archive = self.__open_archive(join(root, archive)) if archive else None
+        self.__cache = DiscoveryCache(cache_path) if cache_path and not self.__archive else None #アーカイブの索引は一度で読めるためキャッシュしない
+        self.__scanned: Dict[str, Dict[str, List[str]]] = {} #今回の読み込みで走査したフォルダ
+        self.__rescanned: Dict[str, List[str]] = {}          #今回の読み込みで一覧を取得し直したフォルダのキャッシュキーとサブフォルダ
+        self.__lazy_specs: List[OperatorSpec] = []           #今回の読み込みで見つかった遅延読み込みするオペレーター
+        self.__proxies: List[object] = []
+        self.__report = ImportReport()
 
         if target_classes == None: self.__TARGET_CLASSES = self.DEFAULT_TARGET_CLASSES
         else: self.__TARGET_CLASSES = target_classes # type: ignore
 
+        self.__classifier = ClassClassifier(self.__TARGET_CLASSES)
+        self.__scanner = StaticScanner(self.__TARGET_CLASSES, self.__dir_name, self.__cache) if is_static_scan and not self.__archive else None
+
+        #遅延読み込みはソースを解析するため、アーカイブからは使用しない
+        self.__is_lazy = is_lazy_operators and not self.__archive
+        self.__lazy_scanner = (self.__scanner or StaticScanner(self.__TARGET_CLASSES, self.__dir_name, self.__cache)) if self.__is_lazy else None
+
         #モジュールの検索パスに登録する
+        self.__added_path: str | None = None
         if self.__path not in sys.path:
             sys.path.append(self.__path)
+            self.__added_path = self.__path
+
+        if self.__archive: self.__archive.install(self.__dir_name)
+
+    @property
+    def package(self) -> str:
+        """Package name of the add-on (name of the add-on folder)"""
+        return self.__dir_name
+
+    @property
+    def proxies(self) -> List[object]:
+        """Proxy classes of the lazy operators created by the last 'load()' or 'load_proxies()'"""
+        return list(self.__proxies)
+
+    @property
+    def added_path(self) -> str | None:
+        """Path this loader added to 'sys.path' (None if it was already there)"""
+        return self.__added_path
+
+    @property
+    def root(self) -> str:
+        """Path to the add-on folder"""
+        return join(self.__path, self.__dir_name)
+
+    @property
+    def report(self) -> ImportReport:
+        """Modules that failed to import in the last 'load_modules()'"""
+        return self.__report
+
+    @property
+    def archive(self) -> AddonArchive | None:
+        """Archive the modules are loaded from (None if the folders are used)"""
+        return self.__archive
 
     @staticmethod
     def isDisabled(clazz: object) -> bool:
@@ -89,6 +165,32 @@ class ProcLoader:
         """
         return hasattr(clazz, 'addon_proc_is_disabled') and clazz.addon_proc_is_disabled == True # type: ignore
 
+    @staticmethod
+    def isCritical(clazz: object, critical_priority: int | None = None) -> bool:
+        """Check whether the target class has to be registered immediately in staged registration
+
+        Args:
+            clazz (object): Target class
+            critical_priority (int | None, optional): Classes with a priority of this value or less (and 0 or more) are also critical. Defaults to None.
+
+        Returns:
+            bool: Whether the target class is marked as critical or has a high enough priority
+        """
+        if hasattr(clazz, 'addon_proc_is_critical') and clazz.addon_proc_is_critical == True: return True # type: ignore
+        if critical_priority is None or not hasattr(clazz, 'addon_proc_priority'): return False
+        return 0 <= clazz.addon_proc_priority <= critical_priority # type: ignore
+
+    def get_target_base(self, clazz: object) -> object | None:
+        """Get the target class that the add-on class inherits
+
+        Args:
+            clazz (object): Target class
+
+        Returns:
+            object | None: Matched target class, or None if it is not an add-on class
+        """
+        return self.__classifier.classify(clazz) # type: ignore
+
     #モジュールとクラスを取得する
     def load(self, dirs: List[str], cat_name: str | None = None) -> List[Sequence[ModuleType | object]]:
         """Load addon's modules and classes
@@ -100,8 +202,11 @@ class ProcLoader:
         Returns:
             List[Sequence[ModuleType | object]]: Loaded modules and classes(Module in column 0, class in column 1)
         """
-        modules = self.load_modules(self.load_files(dirs))
-        return [modules, self.load_classes(modules, cat_name)]
+        paths = self.load_files(dirs)
+        if self.__warmup and not self.__archive: self.warm_up(paths) #アーカイブにはバイトコードが含まれている
+
+        modules = self.load_modules(paths)
+        return [modules, self.load_classes(modules, cat_name, self.load_proxies())]
 
     #[アドオン名].[フォルダ名].[ファイル名]の形でモジュール名を取得する
     def load_files(self, dirs: List[str]) -> List[str]:
@@ -114,34 +219,113 @@ class ProcLoader:
             List[str]: Path of retrieved module
         """
         addon_path = join(self.__path, self.__dir_name) #アドオンへの絶対パス
-        return self.__search_target_dirs(dirs, addon_path)
+        self.__scanned.clear()
+        self.__rescanned.clear()
+        self.__lazy_specs.clear()
+
+        with self.__profiler.memory_span('discovery', ', '.join(dirs)), self.__profiler.span('discovery', ', '.join(dirs)):
+            modules = self.__search_target_dirs(dirs, addon_path)
+            if self.__cache:
+                self.__discard_removed_dirs()
+                self.__cache.save()
+
+        return modules
+
+    #インポートする前にモジュールを並列でバイトコードにコンパイルする
+    def warm_up(self, paths: List[str]) -> List[str]:
+        """Compile modules and their packages to '.pyc' in a process pool
+
+        Modules whose bytecode is up to date are skipped, so this costs little after the first launch.
+
+        Args:
+            paths (List[str]): Module paths (example: the result of 'load_files()')
+
+        Returns:
+            List[str]: Files that were compiled
+        """
+        files: Dict[str, None] = {}
+        for path in paths:
+            parts = path.split('.')
+            for i in range(1, len(parts)): #親パッケージの__init__.pyもインポートされる
+                init_path = join(self.__path, *parts[:i], '__init__.py')
+                if init_path not in files and exists(init_path): files[init_path] = None
+            files[join(self.__path, *parts) + '.py'] = None
+
+        with self.__profiler.span('warmup', self.__dir_name):
+            compiled, failed = (self.__warmup or BytecodeWarmup()).run(files)
+
+        for file in failed: print(gen_msg(ProcLoader, MsgType.CAUTION, f'Failed to compile "{file}". The error will be reported when it is imported.'))
+
+        return compiled
 
     #モジュールをインポートする
-    @staticmethod
-    def load_modules(paths: List[str]) -> List[ModuleType]:
+    def load_modules(self, paths: List[str]) -> List[ModuleType]:
         """Load a module based on its path
 
+        Each module is imported once. Modules that fail are reported, recorded in 'report' and left out of the result,
+        so the rest of the add-on can still be registered. If the discovery cache is enabled, a module whose error was raised
+        in its own file is recorded with the fingerprint of the file and skipped until the file is edited.
+        Import errors (such as a missing library) are not recorded, because they can be fixed without editing the module.
+
         Args:
             paths (List[str]): Path to the module
 
         Returns:
             List[ModuleType]: Loaded module
         """
+        self.__report = ImportReport()
+        modules: List[ModuleType] = []
+
         for path in paths:
+            #ファイルの確認はキャッシュを使用する場合と失敗した場合だけ行う(アーカイブから読み込む場合はキャッシュしない)
+            file = self.__get_module_file(path) if self.__cache else None
+            fingerprint = DiscoveryCache.fingerprint(file) if file else []
+
+            #前回失敗してから変更されていないモジュールはインポートしない
+            failed = self.__cache.get('failed', path, fingerprint) if self.__cache else None
+            if failed is not None:
+                self.__report.add(ImportFailure(path, file, failed['error'], failed['message'], is_skipped=True)) # type: ignore
+                print(gen_msg(ProcLoader, MsgType.CAUTION, f'Skipped "{path}" module because it failed to load and has not been edited since. \n {failed["error"]}: {failed["message"]}'))
+                continue
+
             try:
-                import_module(path)
-            except (ImportError, ModuleNotFoundError) as e:
+                with self.__profiler.import_span(path): modules.append(import_module(path))
+            except Exception as e:
+                file = file or self.__get_module_file(path)
+                self.__report.add(ImportFailure(path, file, type(e).__name__, str(e), format_exc()))
                 print(gen_msg(ProcLoader, MsgType.ERROR, f'Failed to load "{path}" module. \n {e}'))
+                if self.__cache and self.__is_own_error(e, file): self.__cache.set('failed', path, fingerprint, {'error': type(e).__name__, 'message': str(e)})
+                continue
 
-        return [import_module(mdl) for mdl in paths]
+            if self.__cache: self.__cache.discard('failed', path)
+
+        if self.__cache: self.__cache.save()
+
+        return modules
+
+    #遅延読み込みするオペレーターの代理クラスを作成する
+    def load_proxies(self) -> List[object]:
+        """Create proxy classes for the lazy operators found by the last 'load_files()'
+
+        The modules of the operators are not imported until the proxies are first used (see 'LazyOperator').
+
+        Returns:
+            List[object]: Proxy classes
+        """
+        with self.__profiler.span('lazy', ', '.join(spec.name for spec in self.__lazy_specs)):
+            self.__proxies = [LazyOperator.create(spec) for spec in self.__lazy_specs]
+        return list(self.__proxies)
 
     #モジュール内のクラスを取得する
-    def load_classes(self, modules: List[ModuleType], cat_name: str | None = None) -> List[object]:
+    def load_classes(self, modules: List[ModuleType], cat_name: str | None = None, proxies: List[object] | None = None) -> List[object]:
         """Retrieve addon class within a module
 
+        Only classes defined in each module are examined. Classes imported from other modules are skipped.
+
         Args:
             modules (List[ModuleType]): Target module
             cat_name (str | None, optional): Default category name applied to the panel. Defaults to None.
+            proxies (List[object] | None, optional): Proxy classes of lazy operators sorted together with the classes. Defaults to None.
 
         Returns:
             List[object]: Loaded classes
@@ -149,16 +333,17 @@ class ProcLoader:
         cls_priority: Dict[object, int] = {}
 
         for mdl in modules:
-            for clazz in getmembers(mdl, isclass):
-                clazz = clazz[1]
-                #対象のクラスがアドオンのクラスかつ無効でない場合追加する
-                if not any(issubclass(clazz, c) and not clazz == c for c in self.__TARGET_CLASSES): continue # type: ignore
+            #モジュール内で定義されたアドオンのクラスのうち、無効でないものを追加する
+            with self.__profiler.span('classify', mdl.__name__): classes = list(self.__classifier.iter_classes(mdl))
+            for clazz, _ in classes:
                 if hasattr(clazz, 'addon_proc_is_disabled') and clazz.addon_proc_is_disabled == True: continue
 
                 #優先順位とクラスを辞書に追加する
                 if hasattr(clazz, 'addon_proc_priority'): cls_priority[clazz] = clazz.addon_proc_priority
                 else: cls_priority[clazz] = -1
 
+        for proxy in proxies or []: cls_priority[proxy] = getattr(proxy, 'addon_proc_priority', -1)
+
         #優先順位を元にソートする(数が小さいほど先、-1(0以下)は最後)
         sorted_classes = sorted(cls_priority.items(), key=lambda item: float('inf') if item[1] < 0 else item[1])
 
@@ -182,98 +367,199 @@ class ProcLoader:
 
         for dir in dirs:
             cur_path = join(addon_path, dir)
-            if not exists(cur_path) or isfile(cur_path): raise NotADirectoryError(f'"{cur_path}" is not a folder or does not exist.')
+            if not self.__is_dir(cur_path): raise NotADirectoryError(f'"{cur_path}" is not a folder or does not exist.')
 
-            ignore_mdl = self.__read_module_attr(cur_path, 'ignore') #指定したフォルダからの相対パスの形
-            if not self.__is_debug_mode: ignore_mdl = ignore_mdl.union(set(('debug', )))
-            mdl_root = join(self.__dir_name, dir)            #[アドオンフォルダ]/[現在のフォルダ]
+            matcher = IgnoreMatcher() #指定したフォルダごとの無視ルール
+            if not self.__is_debug_mode: matcher.add((dir, ), 'debug')
+            lazy = IgnoreMatcher() if self.__is_lazy else None #遅延読み込みのルール(無視リストと同じ書式)
 
-            modules += self.__search_all_sub_dirs(cur_path, mdl_root, dir, ignore_mdl)
+            modules += self.__search_all_sub_dirs(cur_path, (dir, ), matcher, lazy)
 
         return modules
 
     #指定したフォルダのサブフォルダをすべて読み込み、無視リストとモジュールを取得する
-    def __search_all_sub_dirs(self, cur_path: str, mdl_root: str, dir: str, ignore_mdl: Set[str]) -> List[str]:
+    def __search_all_sub_dirs(self, cur_path: str, base: tuple[str, ...], matcher: IgnoreMatcher, lazy: IgnoreMatcher | None = None) -> List[str]:
         """Recursively search sub-folders of specified folder and retrieve modules
 
+        The ignore list of each folder is compiled into 'matcher' before its contents are examined,
+        and ignored sub-folders are removed from the walk so that they are never searched.
+
         Args:
             cur_path (str): Path of current directory
-            mdl_root (str): Absolute path to [addon folder]/[specified directory]
-            dir (str): Parent folder
-            ignore_mdl (Set[str]): Modules to ignore in the target folder
+            base (tuple[str, ...]): Module path of the current directory relative to the add-on folder
+            matcher (IgnoreMatcher): Ignore rules of the target folder
+            lazy (IgnoreMatcher | None, optional): Rules of the 'lazy' lists. Defaults to None.
 
         Returns:
             List[str]: Loaded modules
         """
         modules: List[str] = []
 
-        for root, sub_dirs, files in walk(cur_path):
-            if basename(root) == '__pycache__': continue #キャシュフォルダはスキップする
-            if self.__is_ignore_module(root, dir, ignore_mdl): continue #モジュールが無視リストに入っている場合はスキップ
+        for root, parts, sub_dirs, files in self.__walk(cur_path, base):
+            for rule in self.__scan_dir(root)['ignore']: matcher.add(parts, rule) #このフォルダの無視リストを追加する
+            if lazy:
+                for rule in self.__scan_dir(root).get('lazy', []): lazy.add(parts, rule)
 
-            ignore_local = self.__get_sub_ignore_folder(root, mdl_root, sub_dirs)
+            sub_dirs[:] = [sub for sub in sub_dirs if not matcher.is_ignored(parts + (sub, ))] #無視するフォルダは辿らない
 
-            modules += self.__get_all_modules(root, mdl_root, files, ignore_mdl.union(ignore_local))
+            modules += self.__get_all_modules(root, parts, files, matcher, lazy)
 
         return modules
 
     #対象のすべてのファイルのモジュールパスを取得する
-    def __get_all_modules(self, root: str, mdl_root: str, files: List[str], ignore_mdl: Set[str]) -> List[str]:
+    def __get_all_modules(self, root: str, parts: tuple[str, ...], files: List[str], matcher: IgnoreMatcher, lazy: IgnoreMatcher | None = None) -> List[str]:
         """Retrieve modules in sub-folders.
 
+        Modules that match the 'lazy' rules and contain only operators that can be read statically are not returned.
+        Their operators are recorded for 'load_proxies()' instead.
+
         Args:
             root (str): Parent directory of file
-            mdl_root (str): Absolute path to [addon folder]/[specified directory]
-            files (List[str]): Files existing in sub-folders
-            ignore_global (Set[str]): Modules to ignore in the target folder
-            ignore_local (Set[str]): Modules to ignore in sub-folders only
+            parts (tuple[str, ...]): Module path of the parent directory relative to the add-on folder
+            files (List[str]): Python files existing in the folder
+            matcher (IgnoreMatcher): Ignore rules of the target folder
+            lazy (IgnoreMatcher | None, optional): Rules of the 'lazy' lists. Defaults to None.
 
         Returns:
-            List[str]: _description_
+            List[str]: Module paths
         """
         modules: List[str] = []
         for file in files:
-            abs_path = join(root, file) #ファイルまでの絶対パスを取得する
-            if not isfile(abs_path) or not abs_path.endswith('.py'): continue #Pythonファイル以外は無視
-            if file == '__init__.py': continue #初期化ファイルも無視
+            if file == '__init__.py': continue #初期化ファイルは無視
 
-            mdl = self.__get_module_path(abs_path) #拡張子より左側だけをモジュールの形に変換する
+            mdl_parts = parts + (splitext(file)[0], ) #拡張子より左側だけをモジュールの形に変換する
+            if matcher.is_ignored(mdl_parts): continue
 
-            #アドオンフォルダ名と指定したフォルダ名を削除し、無視リストと比較する
-            rel_mdl_path = self.__get_relative_module_path(mdl_root, mdl)
-            if not rel_mdl_path in ignore_mdl: modules.append(mdl)
+            #アドオンのクラスや登録関数を含まないモジュールはインポートしない
+            abs_path = join(root, file)
+            if self.__scanner and not self.__scanner.scan(abs_path, self.__get_relative_path(abs_path)).is_candidate: continue
+
+            mdl_name = '.'.join((self.__dir_name, ) + mdl_parts)
+            if lazy and lazy.is_ignored(mdl_parts): #遅延読み込みのルールは無視リストと同じ方法で照合する
+                specs = self.__read_lazy(abs_path, mdl_name)
+                if specs is not None:
+                    self.__lazy_specs += specs
+                    continue
+
+            modules.append(mdl_name)
 
         return modules
 
-    #サブフォルダの__init__.pyファイルから無視リストを取得する
-    def __get_sub_ignore_folder(self, root: str, mdl_root: str, sub_dirs: List[str]) -> Set[str]:
-        """Get ignore list from subdirectories of specified directory
+    #os.walk()と同じ順序でフォルダを走査する(sub_dirsを書き換えると子孫フォルダを辿らない)
+    def __walk(self, top: str, parts: tuple[str, ...]) -> Iterator[tuple[str, tuple[str, ...], List[str], List[str]]]:
+        """Walk the directory tree top-down using the scanned (or cached) directory entries
 
         Args:
-            root (str): Absolute path of parent directory to search
-            mdl_root (str): Absolute path to [addon folder]/[specified directory]
-            sub_dirs (List[str]): List of subdirectories
+            top (str): Directory to start from
+            parts (tuple[str, ...]): Module path of 'top' relative to the add-on folder
 
-        Returns:
-            Set[str]: Ignore list (module path)
+        Yields:
+            Iterator[tuple[str, tuple[str, ...], List[str], List[str]]]: Directory path, its module path, sub-directory names and Python file names
         """
-        ignore_list: Set[str] = set([])
+        entry = self.__scan_dir(top)
+        sub_dirs = list(entry['dirs'])
+
+        yield top, parts, sub_dirs, list(entry['files'])
+
         for sub in sub_dirs:
-            abs_path = join(root, sub)
-            ignore = set([self.__get_relative_path(join(abs_path, item.replace('.', os.sep))) for item in self.__read_module_attr(abs_path, 'ignore')]) #モジュールパスから相対パスを生成する
-            ignore = set([self.__sep_to_period(item) for item in ignore if not basename(item.rstrip(os.sep)) == '__pycache__'])                  #相対パスをモジュールパスに変換し、システムフォルダを除外する
-            ignore = set([self.__get_relative_module_path(mdl_root, item) for item in ignore])                                                   #相対モジュールパスを取得する
+            yield from self.__walk(join(top, sub), parts + (sub, ))
+
+    #フォルダ内のサブフォルダ、Pythonファイル、無視リストを取得する
+    def __scan_dir(self, path: str) -> Dict[str, List[str]]:
+        """Get the sub-directories, Python files and ignore list of a directory
+
+        If the discovery cache is enabled and the fingerprint of the directory and its '__init__.py' has not changed,
+        the cached entry is returned without listing the directory or reading the ignore list.
+
+        Args:
+            path (str): Target directory
+
+        Returns:
+            Dict[str, List[str]]: Entry with 'dirs', 'files' and 'ignore' keys
+        """
+        if path in self.__scanned: return self.__scanned[path]
+
+        if self.__archive:
+            entry = self.__archive.entry(relpath(path, join(self.__path, self.__dir_name))) or {'dirs': [], 'files': [], 'ignore': []}
+            self.__scanned[path] = entry
+            return entry
+
+        key = self.__get_relative_path(path)
+        fingerprint = DiscoveryCache.fingerprint(path, join(path, '__init__.py')) if self.__cache else []
+
+        entry = self.__cache.get('dirs', key, fingerprint) if self.__cache else None
+        if entry is not None and self.__is_lazy and 'lazy' not in entry: entry = None #遅延読み込みが無効な状態でキャッシュされた
+        if entry is None:
+            dirs: List[str] = []
+            files: List[str] = []
+            with os.scandir(path) as it:
+                for item in it:
+                    if item.is_dir(follow_symlinks=False): #os.walk(followlinks=False)と同じく、シンボリックリンクのフォルダは辿らない
+                        if not item.name == '__pycache__': dirs.append(item.name) #キャッシュフォルダはスキップする
+                    elif item.is_file() and item.name.endswith('.py'): files.append(item.name)
+
+            entry = {'dirs': sorted(dirs), 'files': sorted(files), 'ignore': sorted(self.__read_module_attr(path, 'ignore'))}
+            if self.__is_lazy: entry['lazy'] = sorted(self.__read_module_attr(path, 'lazy'))
+
+            if self.__cache:
+                self.__rescanned[key] = entry['dirs']
+                self.__cache.set('dirs', key, fingerprint, entry)
+
+        self.__scanned[path] = entry
+        return entry
+
+    #遅延読み込みするモジュールのオペレーターを静的に読み取る
+    def __read_lazy(self, abs_path: str, mdl_name: str) -> List[OperatorSpec] | None:
+        """Read the operators of a module listed in a 'lazy' list (None if the module has to be imported)"""
+        summary = self.__lazy_scanner.scan(abs_path, self.__get_relative_path(abs_path)) # type: ignore
+        specs = LazyOperator.parse(abs_path, mdl_name, summary.classes) if summary.is_parsed and not (summary.has_register or summary.has_unregister) else None
+
+        if specs is None: print(gen_msg(ProcLoader, MsgType.CAUTION, f'"{mdl_name}" is imported normally, because it has other add-on classes, register()/unregister() functions, or values that are not literals.'))
+        return specs
+
+    #フォルダが存在するか確認する(アーカイブから読み込む場合は索引を参照する)
+    def __is_dir(self, path: str) -> bool:
+        """Check whether a folder exists in the archive or on disk"""
+        if self.__archive: return self.__archive.entry(relpath(path, join(self.__path, self.__dir_name))) is not None
+        return exists(path) and not isfile(path)
+
+    #アーカイブを開く(存在しない場合は通常どおりフォルダから読み込む)
+    @staticmethod
+    def __open_archive(path: str) -> AddonArchive | None:
+        """Open the archive if it exists"""
+        if not isfile(path): return None
+        try:
+            return AddonArchive(path)
+        except ValueError as e:
+            print(gen_msg(ProcLoader, MsgType.CAUTION, f'{e} The folders are used instead.'))
+            return None
 
-            ignore_list = ignore_list.union(ignore)
+    #削除されたサブフォルダのキャッシュを破棄する
+    def __discard_removed_dirs(self) -> None:
+        """Discard cache entries of sub-directories that no longer exist under the directories listed again by this load
 
-        return set(ignore_list)
+        The entries are checked in a single pass: an entry is discarded if one of its ancestors was listed again and no longer contains the entry's branch.
+        """
+        if not self.__rescanned: return
+
+        for cached in self.__cache.keys('dirs'): # type: ignore
+            parts = cached.split(os.sep)
+            for i in range(1, len(parts)):
+                sub_dirs = self.__rescanned.get(os.sep.join(parts[:i]))
+                if sub_dirs is not None and parts[i] not in sub_dirs:
+                    self.__cache.discard('dirs', cached) # type: ignore
+                    break
 
     #各ディレクトリの__init__.pyファイルから無視リストを取得する
     def __read_module_attr(self, cur_path: str, identifier: str) -> Set[str]:
         """Retrieve list if 'init.py' exists in sub-folder
 
+        The list is read from the syntax tree without importing the module.
+        If it is not a literal, the module is imported only when 'is_import_fallback' is enabled.
+
         Args:
             cur_path (str): Directory with 'init.py' file
+            identifier (str): Name of the list
 
         Returns:
             Set[str]: Modules list
@@ -282,11 +568,37 @@ class ProcLoader:
 
         if not exists(init_path): return set([])
 
+        try:
+            return set(StaticScanner.read_literal(init_path, identifier, []))
+        except ValueError:
+            if not self.__is_import_fallback:
+                print(gen_msg(ProcLoader, MsgType.CAUTION, f'"{identifier}" in "{init_path}" is not a literal and was ignored. Enable "is_import_fallback" to import the module and read it.'))
+                return set([])
+
+        #リテラルでない場合はモジュールをインポートして読み取る
         init_mdl = import_module(self.__get_module_path(init_path))
-        if hasattr(init_mdl, identifier): return set(init_mdl.ignore)
+        if hasattr(init_mdl, identifier): return set(getattr(init_mdl, identifier))
 
         return set([])
 
+    def __get_module_file(self, mdl_name: str) -> str:
+        """Get the file of a module from its name ('__init__.py' for a package)"""
+        path = join(self.__path, *mdl_name.split('.'))
+        return path + '.py' if isfile(path + '.py') else join(path, '__init__.py')
+
+    @staticmethod
+    def __is_own_error(e: Exception, file: str) -> bool:
+        """Check whether an exception was raised by the code of the file itself (only such failures are fixed by editing it)"""
+        if isinstance(e, ImportError): return False
+
+        if isinstance(e, SyntaxError): origin = e.filename
+        else:
+            tb = e.__traceback__
+            while tb and tb.tb_next: tb = tb.tb_next
+            origin = tb.tb_frame.f_code.co_filename if tb else None
+
+        return origin is not None and normcase(abspath(origin)) == normcase(abspath(file))
+
     def __get_module_path(self, abs_path: str):
         """Convert absolute path to module path"""
         return self.__conv_module_path(self.__get_relative_path(abs_path)) #import_module()関数に使えるモジュールパスを生成する(例：AddonName.operators.mdl)
@@ -318,29 +630,3 @@ class ProcLoader:
     def __sep_to_period(string: str) -> str:
         """Replace path separators with periods"""
         return string.replace(os.sep, '.')
-
-    @staticmethod
-    def __get_relative_module_path(root: str ,path: str):
-        """Remove 'root' path from 'path'"""
-        return path.lstrip(root.replace(os.sep, '.')).lstrip('.') #アドオンフォルダ名と指定したフォルダ名を削除したモジュールパスを生成する
-
-    #フォルダパスを整形して無視リストと比較する
-    def __is_ignore_module(self, root: str, dir: str, ignore_module: Set[str]) -> bool:
-        """Transform folder path to module path, compare with ignore list
-
-        Args:
-            root (str): Path to the add-on folder
-            dir (str): Current parent folder
-            ignore_module (Set[str]): Modules to ignore
-
-        Returns:
-            bool: Whether to ignore or not
-        """
-        rel = self.__get_relative_path(root)
-        rel_parts = rel.split(os.sep)
-        try:
-            rel = '.'.join(rel_parts[rel_parts.index(dir)+1:])
-        except IndexError:
-            rel = ""
-
-        return not rel == "" and rel in ignore_module
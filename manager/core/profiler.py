@@ -0,0 +1,231 @@
+#This program is distributed under the MIT License.
+#See the LICENSE file for details.
+
+from typing import Any, Dict, List, Iterator
+from contextlib import contextmanager, nullcontext, AbstractContextManager
+
+import os
+import sys
+import json
+import builtins
+import threading
+import tracemalloc
+from time import perf_counter_ns
+
+class Profiler:
+    """Records the wall time and call counts of each loading and registration phase.
+
+    Pass an instance to 'ProcLoader' or 'AddonManager' to enable it.
+    The results can be saved as a JSON report or in the Chrome 'trace_event' format (chrome://tracing, Perfetto).
+
+    In memory mode, 'tracemalloc' snapshots are taken around the discovery, the import of each module and the 'register'/'unregister'
+    function of each module, and the allocated bytes and blocks (including those of the modules imported by it) are recorded per module
+    together with the files that allocated the most. Taking snapshots is slow, so the timings are less accurate in this mode.
+    """
+
+    #集計から除外するファイル(計測自体の割り当て)。トレースを絞り込むより集計後に除く方が速い
+    __IGNORED_FILES = frozenset((tracemalloc.__file__, __file__))
+
+    def __init__(self, is_import_tree: bool = True, is_memory: bool = False, memory_files: int = 5) -> None:
+        """Initialize
+
+        Args:
+            is_import_tree (bool, optional): Record the imports triggered by each module as a nested tree. Defaults to True.
+            is_memory (bool, optional): Record the memory allocated by each module with 'tracemalloc' (tracing is started if it is not running). Defaults to False.
+            memory_files (int, optional): Number of files that allocated the most recorded for each module. Defaults to 5.
+        """
+        self.__is_import_tree = is_import_tree
+        self.__is_memory = is_memory
+        self.__memory_files = memory_files
+        self.__memory: Dict[str, Dict[str, Dict[str, Any]]] = {} #カテゴリ -> 名前 -> {'bytes', 'blocks', 'files': ファイル -> [バイト数, ブロック数]}
+        self.__is_tracing_started = is_memory and not tracemalloc.is_tracing()
+        if self.__is_tracing_started: tracemalloc.start()
+        self.__origin = perf_counter_ns()
+        self.__events: List[Dict[str, Any]] = []                 #trace_event形式のイベント
+        self.__stats: Dict[str, Dict[str, List[int]]] = {}       #カテゴリ -> 名前 -> [回数, 合計時間(ns)]
+        self.__imports: Dict[str, List[Dict[str, Any]]] = {}     #モジュール -> インポートの木
+        self.__import_stack: List[Dict[str, Any]] = []
+        self.__original_import = builtins.__import__
+
+    @contextmanager
+    def span(self, category: str, name: str) -> Iterator[None]:
+        """Measure the processing within the block
+
+        Args:
+            category (str): Phase name (example: 'import', 'register_class')
+            name (str): Target name (example: module name, class name)
+        """
+        start = perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.__record(category, name, start, perf_counter_ns())
+
+    @contextmanager
+    def import_span(self, name: str) -> Iterator[None]:
+        """Measure the import of a module, including a tree of the modules imported by it
+
+        Args:
+            name (str): Module name
+        """
+        if not self.__is_import_tree:
+            with self.memory_span('import', name), self.span('import', name): yield
+            return
+
+        root: Dict[str, Any] = {'name': name, 'ms': 0.0, 'children': []}
+        if not self.__import_stack: self.__original_import = builtins.__import__
+        self.__import_stack.append(root)
+        builtins.__import__ = self.__hooked_import
+        try:
+            with self.memory_span('import', name), self.span('import', name): yield
+        finally:
+            self.__import_stack.pop()
+            if not self.__import_stack: builtins.__import__ = self.__original_import
+            self.__imports[name] = root['children']
+
+    @contextmanager
+    def memory_span(self, category: str, name: str) -> Iterator[None]:
+        """Record the memory allocated within the block (only in memory mode)
+
+        Args:
+            category (str): Phase name (example: 'import', 'register')
+            name (str): Target name (example: module name)
+        """
+        if not self.__is_memory or not tracemalloc.is_tracing():
+            yield
+            return
+
+        before = tracemalloc.take_snapshot()
+        try:
+            yield
+        finally:
+            #スナップショットの時間を計測に含めないように、時間の計測より外側で取得する
+            self.__record_memory(category, name, before, tracemalloc.take_snapshot())
+
+    def stop(self) -> None:
+        """Stop tracing memory if this profiler started it (the recorded results are kept)"""
+        if self.__is_tracing_started and tracemalloc.is_tracing(): tracemalloc.stop()
+        self.__is_tracing_started = False
+
+    def report(self) -> Dict[str, Any]:
+        """Create a report of the measurement results
+
+        Returns:
+            Dict[str, Any]: Totals per phase, totals per target (slowest first), the import trees and,
+                in memory mode, the memory per target (largest first)
+        """
+        phases: Dict[str, Dict[str, Any]] = {}
+        items: Dict[str, List[Dict[str, Any]]] = {}
+        for category, names in self.__stats.items():
+            phases[category] = {'count': sum(v[0] for v in names.values()), 'total_ms': sum(v[1] for v in names.values()) / 1e6}
+            items[category] = sorted(
+                ({'name': name, 'count': v[0], 'total_ms': v[1] / 1e6} for name, v in names.items()),
+                key=lambda item: item['total_ms'], reverse=True
+            )
+
+        report: Dict[str, Any] = {'phases': phases, 'items': items, 'imports': self.__imports}
+        if self.__is_memory: report['memory'] = self.memory_report()
+        return report
+
+    def memory_report(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Get the memory allocated per target
+
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: Phase -> targets with 'bytes', 'blocks' and the files that allocated the most ('files'), largest first
+        """
+        result: Dict[str, List[Dict[str, Any]]] = {}
+        for category, names in self.__memory.items():
+            result[category] = sorted((
+                {
+                    'name': name, 'bytes': entry['bytes'], 'blocks': entry['blocks'],
+                    'files': [{'file': file, 'bytes': v[0], 'blocks': v[1]}
+                              for file, v in sorted(entry['files'].items(), key=lambda item: item[1][0], reverse=True)[:self.__memory_files]]
+                } for name, entry in names.items()),
+                key=lambda item: item['bytes'], reverse=True
+            )
+        return result
+
+    def format_memory(self, limit: int = 20) -> str:
+        """Format the memory allocated per target as a ranked table
+
+        Args:
+            limit (int, optional): Number of targets shown for each phase. Defaults to 20.
+
+        Returns:
+            str: Formatted table
+        """
+        lines: List[str] = []
+        for category, items in self.memory_report().items():
+            lines.append(f'[{category}] {sum(item["bytes"] for item in items) / 1024:.1f} KiB in {len(items)} targets')
+            for rank, item in enumerate(items[:limit], 1):
+                lines.append(f'{rank:>4}. {item["bytes"] / 1024:>10.1f} KiB {item["blocks"]:>8} blocks  {item["name"]}')
+                if item['files']: lines.append(f'{"":>6}largest: {item["files"][0]["file"]} ({item["files"][0]["bytes"] / 1024:.1f} KiB)')
+        return '\n'.join(lines)
+
+    def trace(self) -> Dict[str, Any]:
+        """Get the measurement results in the Chrome 'trace_event' format"""
+        return {'traceEvents': list(self.__events), 'displayTimeUnit': 'ms'}
+
+    def save(self, path: str) -> None:
+        """Save the report as JSON"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+
+    def save_trace(self, path: str) -> None:
+        """Save the results in the Chrome 'trace_event' format"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.trace(), f)
+
+    def __record(self, category: str, name: str, start: int, end: int) -> None:
+        """Add a measurement result"""
+        stat = self.__stats.setdefault(category, {}).setdefault(name, [0, 0])
+        stat[0] += 1
+        stat[1] += end - start
+
+        self.__events.append({
+            'name': name, 'cat': category, 'ph': 'X',
+            'ts': (start - self.__origin) / 1e3, 'dur': (end - start) / 1e3,
+            'pid': os.getpid(), 'tid': threading.get_ident()
+        })
+
+    def __record_memory(self, category: str, name: str, before: tracemalloc.Snapshot, after: tracemalloc.Snapshot) -> None:
+        """Add the difference between two snapshots"""
+        entry = self.__memory.setdefault(category, {}).setdefault(name, {'bytes': 0, 'blocks': 0, 'files': {}})
+        for stat in after.compare_to(before, 'filename'):
+            if not stat.size_diff and not stat.count_diff or stat.traceback[0].filename in self.__IGNORED_FILES: continue
+            entry['bytes'] += stat.size_diff
+            entry['blocks'] += stat.count_diff
+
+            file = entry['files'].setdefault(stat.traceback[0].filename, [0, 0])
+            file[0] += stat.size_diff
+            file[1] += stat.count_diff
+
+    def __hooked_import(self, name: str, globals: Any = None, locals: Any = None, fromlist: Any = (), level: int = 0) -> Any:
+        """'__import__' that records imports of modules that have not been loaded yet"""
+        if level or name in sys.modules or not threading.current_thread() is threading.main_thread():
+            return self.__original_import(name, globals, locals, fromlist, level)
+
+        node: Dict[str, Any] = {'name': name, 'ms': 0.0, 'children': []}
+        self.__import_stack[-1]['children'].append(node)
+        self.__import_stack.append(node)
+
+        start = perf_counter_ns()
+        try:
+            return self.__original_import(name, globals, locals, fromlist, level)
+        finally:
+            end = perf_counter_ns()
+            node['ms'] = (end - start) / 1e6
+            self.__import_stack.pop()
+            self.__record('nested_import', name, start, end)
+
+class NullProfiler:
+    """Profiler that records nothing. Used when profiling is disabled.
+    """
+
+    __NULL_CONTEXT: AbstractContextManager[None] = nullcontext()
+
+    def span(self, category: str, name: str) -> AbstractContextManager[None]: return self.__NULL_CONTEXT
+    def import_span(self, name: str) -> AbstractContextManager[None]: return self.__NULL_CONTEXT
+    def memory_span(self, category: str, name: str) -> AbstractContextManager[None]: return self.__NULL_CONTEXT
+
+NULL_PROFILER = NullProfiler()
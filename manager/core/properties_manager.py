@@ -1,16 +1,49 @@
 #This program is distributed under the MIT License.
 #See the LICENSE file for details.
 
-from typing import Self, List, Any
+from typing import Self, List, Dict, Any, Iterator
+from contextlib import contextmanager
 
 from .exceptions import ContextError
 from .proc_loader import ProcLoader
 
 from bpy.props import PointerProperty # type: ignore
 
+#プロパティを取得する関数オブジェクト
+class PropertyAccessor:
+    """Callable that retrieves a property whose name has already been resolved.
+
+    Create it with 'PropertiesManager().get_accessor()' and reuse it in 'draw()' and 'poll()'.
+    """
+
+    __slots__ = ('name', )
+
+    def __init__(self, name: str) -> None:
+        self.name = name #接頭辞付きのプロパティ名
+
+    def __call__(self, context: object) -> Any:
+        """Retrieve the property
+
+        Args:
+            context (object): Object to get property from.
+
+        Raises:
+            ValueError: Throws if the property doesn't exist.
+
+        Returns:
+            Any: Property object
+        """
+        try:
+            return getattr(context, self.name)
+        except AttributeError:
+            raise ValueError(f'Property "{self.name}" does not exist in {context}.') from None
+
 class PropertiesManager:
     """Manages Blender's properties.
 
+    Between 'begin_update()' and 'commit_update()', properties that are added again with the same class
+    are kept as they are, and only new, changed and no longer declared properties are applied to Blender.
+
     Raises:
         ContextError: Thrown if this class's state is invalid.
     """
@@ -26,8 +59,71 @@ class PropertiesManager:
         if self.__isInitialized: return
         self.__isInitialized = True
 
-        self.__properties: List[tuple[str, object]] = ([])
+        self.__properties: Dict[str, Dict[object, tuple[object, str | None]]] = {} #プロパティ名 -> 追加したクラス -> (プロパティのクラス, 所有者)(追加順)
         self.__name: str | None = None
+        self.__owner: str | None = None                                            #現在追加しているプロパティの所有者(モジュール名)
+        self.__owned_props: Dict[str, Dict[tuple[str, object], None]] = {}         #所有者 -> 追加した(プロパティ名, クラス)
+        self.__pending: Dict[tuple[str, object], object] | None = None             #更新中: 再度宣言されていない既存のプロパティ
+        self.__update_stats: Dict[str, int] = {}
+        self.__mangled: Dict[tuple[str, bool], str] = {}           #(名前, 修正の有無) -> 接頭辞付きの名前
+        self.__accessors: Dict[tuple[str, bool], PropertyAccessor] = {}
+
+    @contextmanager
+    def owner(self, name: str | None) -> Iterator[None]:
+        """Attribute the properties added within the block to the owner.
+
+        Args:
+            name (str | None): Owner name (usually a module name)
+        """
+        prev, self.__owner = self.__owner, name
+        try:
+            yield
+        finally:
+            self.__owner = prev
+
+    def delete_owner(self, name: str) -> int:
+        """Delete all properties added by the owner.
+
+        Args:
+            name (str): Owner name
+
+        Returns:
+            int: Number of deleted properties
+        """
+        return sum(self.__delete(prop_name, prop_type) for prop_name, prop_type in self.__owned_props.pop(name, {}))
+
+    def begin_update(self, owners: List[str] | None = None) -> None:
+        """Start re-applying the properties of the owners as a diff.
+
+        Properties added until 'commit_update()' with the same name, class and property group as an existing property
+        of these owners are not registered again. If only the property group differs (including a group recreated by reloading its module),
+        the property is replaced.
+
+        Args:
+            owners (List[str] | None, optional): Owners whose properties are declared again. All properties if None. Defaults to None.
+
+        Raises:
+            ContextError: Thrown if an update is already in progress.
+        """
+        if self.__pending is not None: raise ContextError('"begin_update()" was called before the previous update was committed.')
+
+        self.__pending = {}
+        for prop_name, prop_types in self.__properties.items():
+            for prop_type, (op, owner) in prop_types.items():
+                if owners is None or owner in owners: self.__pending[(prop_name, prop_type)] = op
+        self.__update_stats = {'added': 0, 'changed': 0, 'kept': 0, 'removed': 0}
+
+    def commit_update(self) -> Dict[str, int]:
+        """Delete the properties that were not declared again since 'begin_update()' and finish the update.
+
+        Returns:
+            Dict[str, int]: Number of properties that were 'added', 'changed', 'kept' and 'removed'
+        """
+        pending, self.__pending = self.__pending or {}, None
+        for prop_name, prop_type in pending:
+            if self.__delete(prop_name, prop_type): self.__update_stats['removed'] += 1
+
+        return self.__update_stats
 
     def set_name(self, name: str | None) -> None:
         """Registers the property's prefix.
@@ -37,6 +133,8 @@ class PropertiesManager:
         """
         if self.__name: return
         self.__name = name
+        self.__mangled.clear()
+        self.__accessors.clear()
 
     def add(self, prop_type: object, properties: List[tuple[str, object]] | tuple[str, object]) -> List[str]:
         """Registers a property in Blender.
@@ -61,11 +159,27 @@ class PropertiesManager:
             if ProcLoader.isDisabled(op): continue
 
             name_with_prefix = f"{self.__name}_{name}"
-            if hasattr(prop_type, name_with_prefix): raise ValueError(f'The property name "{name_with_prefix}" already exists in "{str(prop_type)}".')
-            setattr(prop_type, name_with_prefix, PointerProperty(type=op)) # プロパティを追加
+            key = (name_with_prefix, prop_type)
+            registered = self.__properties.get(name_with_prefix, {}).get(prop_type)
+
+            #更新中で既に登録されている場合は、プロパティのクラスが変わったときだけ登録し直す
+            if self.__pending is not None and key in self.__pending and registered:
+                del self.__pending[key]
+                self.__forget(name_with_prefix, prop_type)
+                if registered[0] is op and hasattr(prop_type, name_with_prefix): #再読込で作り直されたクラスは別のオブジェクトになる
+                    self.__update_stats['kept'] += 1
+                else:
+                    if hasattr(prop_type, name_with_prefix): delattr(prop_type, name_with_prefix) #detach()で削除されている場合がある
+                    setattr(prop_type, name_with_prefix, PointerProperty(type=op))
+                    self.__update_stats['changed'] += 1
+            else:
+                if hasattr(prop_type, name_with_prefix): raise ValueError(f'The property name "{name_with_prefix}" already exists in "{str(prop_type)}".')
+                setattr(prop_type, name_with_prefix, PointerProperty(type=op)) # プロパティを追加
+                if self.__pending is not None: self.__update_stats['added'] += 1
 
             register_name.append(name_with_prefix)
-            self.__properties.append((name_with_prefix, prop_type))
+            self.__properties.setdefault(name_with_prefix, {})[prop_type] = (op, self.__owner)
+            if self.__owner: self.__owned_props.setdefault(self.__owner, {})[key] = None
 
         return register_name
 
@@ -84,16 +198,33 @@ class PropertiesManager:
         Returns:
             Any: Property object
         """
-        if self.__name == None: raise ContextError('You must add a valid identifier with the "set_name()" method before you can use the "get()" method.')
+        try:
+            return getattr(context, self.__mangle(attr, is_mangling, 'get'))
+        except AttributeError:
+            raise ValueError(f'Property "{attr}" does not exist in {context}.') from None #属性がないとき
+
+    def get_accessor(self, attr: str, is_mangling: bool = True) -> PropertyAccessor:
+        """Get a callable that retrieves a property with a single attribute fetch.
 
-        register_name = ""
-        if is_mangling and not attr.startswith(self.__name): register_name = f"{self.__name}_{attr}" #修正モードかつ接頭辞がなければ追加する
-        else: register_name = attr
+        The property name is resolved only once, so this is cheaper than 'get()' in 'draw()' and 'poll()'.
 
-        if hasattr(context, register_name): return getattr(context, register_name)
+        Args:
+            attr (str): Property name. (Prefix optional)
+            is_mangling (bool, optional): Whether to add if no prefix. Defaults to True.
+
+        Raises:
+            ContextError: Throws if no prefix is set
 
-        raise ValueError(f'Property "{attr}" does not exist in {context}.') #属性がないとき
+        Returns:
+            PropertyAccessor: Function that receives the object to get the property from
+        """
+        key = (attr, is_mangling)
+        accessor = self.__accessors.get(key)
+        if accessor is None:
+            accessor = PropertyAccessor(self.__mangle(attr, is_mangling, 'get_accessor'))
+            self.__accessors[key] = accessor
 
+        return accessor
 
     def delete(self, prop_name: str) -> bool:
         """Deletes the specified property.
@@ -104,23 +235,81 @@ class PropertiesManager:
         Returns:
             bool: Whether the property was registered in this class.
         """
-        properties = self.__properties.copy() #ループ内でそのオブジェクトの要素数を変更できないのでコピーを作る
-        for name, prop_type in properties:
-            if not prop_name == name: continue
-            delattr(prop_type, name) #プロパティを削除
+        prop_types = self.__properties.get(prop_name)
+        if not prop_types: return False
+
+        return self.__delete(prop_name, next(iter(prop_types))) #最初に追加したクラスから削除する
 
-            try: self.__properties.remove((name, prop_type))
-            except ValueError: pass
+    def detach(self, groups: List[object]) -> int:
+        """Delete the properties that point to the property groups, keeping their records.
 
-            return True
+        Call it before the property groups are unregistered (a property would keep pointing to the removed group).
+        During an update, the properties added again are counted as changed, and the others are removed by 'commit_update()'.
 
-        return False
+        Args:
+            groups (List[object]): Property group classes that will be unregistered
+
+        Returns:
+            int: Number of deleted properties
+        """
+        targets = set(groups)
+        count = 0
+        for name, prop_types in self.__properties.items():
+            for prop_type, (op, _) in prop_types.items():
+                if op not in targets or not hasattr(prop_type, name): continue
+                delattr(prop_type, name)
+                count += 1
+
+        return count
 
     def unregister(self) -> None:
         """Deletes all registered properties."""
-        for name, prop_type in self.__properties:
-            delattr(prop_type, name)
+        for name, prop_types in self.__properties.items():
+            for prop_type in prop_types:
+                if hasattr(prop_type, name): delattr(prop_type, name) #detach()で削除されている場合がある
 
         self.__properties.clear()
+        self.__owned_props.clear()
+        self.__pending = None
+
+    @classmethod
+    def reset(cls) -> None:
+        """Delete all properties and discard the instance, so that the next call creates a new one."""
+        instance = cls.__dict__.get('_instance')
+        if instance is None: return
+
+        instance.unregister()
+        del cls._instance
+
+    def __delete(self, prop_name: str, prop_type: object) -> bool:
+        """Delete the property from the class"""
+        if not self.__forget(prop_name, prop_type): return False
+
+        if hasattr(prop_type, prop_name): delattr(prop_type, prop_name) #プロパティを削除(detach()で削除されている場合がある)
+        return True
+
+    def __forget(self, prop_name: str, prop_type: object) -> bool:
+        """Remove the property from the records without deleting it"""
+        prop_types = self.__properties.get(prop_name)
+        if not prop_types or prop_type not in prop_types: return False
+
+        _, owner = prop_types.pop(prop_type)
+        if not prop_types: del self.__properties[prop_name]
+        if owner: self.__owned_props.get(owner, {}).pop((prop_name, prop_type), None)
+
+        return True
+
+    def __mangle(self, attr: str, is_mangling: bool, method: str) -> str:
+        """Get the property name with the prefix (memoized)"""
+        if self.__name == None: raise ContextError(f'You must add a valid identifier with the "set_name()" method before you can use the "{method}()" method.')
+
+        key = (attr, is_mangling)
+        register_name = self.__mangled.get(key)
+        if register_name is None:
+            if is_mangling and not attr.startswith(self.__name): register_name = f"{self.__name}_{attr}" #修正モードかつ接頭辞がなければ追加する
+            else: register_name = attr
+            self.__mangled[key] = register_name
+
+        return register_name
 
     __isInitialized = False # これを付けないとなぜか何回も初期化される
@@ -0,0 +1,51 @@
+#This program is distributed under the MIT License.
+#See the LICENSE file for details.
+
+from typing import Any, Callable, List
+
+from .utils.gen_msg import MsgType, gen_msg
+
+class RegistrationJournal:
+    """Records the registration steps that have been applied, so that they can be undone in reverse order.
+
+    Only steps that actually changed Blender's state are recorded.
+    Steps that were skipped because they were already applied are not undone by a rollback.
+    """
+
+    def __init__(self) -> None:
+        self.__steps: List[tuple[str, Callable[[], Any]]] = [] #(ステップ名, 取り消す関数)
+
+    def __len__(self) -> int: return len(self.__steps)
+
+    @property
+    def steps(self) -> List[str]:
+        """Names of the recorded steps in the order they were applied"""
+        return [name for name, _ in self.__steps]
+
+    def record(self, name: str, undo: Callable[[], Any]) -> None:
+        """Record an applied step
+
+        Args:
+            name (str): Step name (example: class name, module name)
+            undo (Callable[[], Any]): Function that undoes the step
+        """
+        self.__steps.append((name, undo))
+
+    def rollback(self) -> List[tuple[str, Exception]]:
+        """Undo the recorded steps in reverse order
+
+        A step that fails to be undone is reported and the rollback continues.
+
+        Returns:
+            List[tuple[str, Exception]]: Names and exceptions of the steps that could not be undone
+        """
+        errors: List[tuple[str, Exception]] = []
+        while self.__steps:
+            name, undo = self.__steps.pop()
+            try:
+                undo()
+            except Exception as e:
+                errors.append((name, e))
+                print(gen_msg(RegistrationJournal, MsgType.ERROR, f'Failed to roll back "{name}". \n {e}'))
+
+        return errors
@@ -0,0 +1,112 @@
+#This program is distributed under the MIT License.
+#See the LICENSE file for details.
+
+from typing import Any, Callable, List, Self
+from time import perf_counter
+
+from .utils.gen_msg import MsgType, gen_msg
+
+from bpy.app import timers
+
+class RegistrationScheduler:
+    """Runs registration steps in time-sliced chunks driven by 'bpy.app.timers'.
+
+    Each timer call runs steps until the time budget is used up and then returns control to Blender,
+    so the UI stays responsive while a large add-on is being registered.
+    At least one step is run per call, even if it takes longer than the budget.
+    """
+
+    def __init__(self, steps: List[tuple[str, Callable[[], Any]]], budget_ms: float = 5.0, interval: float = 0.0) -> None:
+        """Initialize
+
+        Args:
+            steps (List[tuple[str, Callable[[], Any]]]): Pairs of step name and function, in the order to run them
+            budget_ms (float, optional): Time budget of each chunk in milliseconds. Defaults to 5.0.
+            interval (float, optional): Seconds between chunks. Defaults to 0.0.
+        """
+        self.__steps = steps
+        self.__budget = budget_ms / 1000
+        self.__interval = interval
+        self.__index = 0                                     #次に実行するステップ
+        self.__callbacks: List[Callable[[Self], Any]] = []
+        self.__errors: List[tuple[str, Exception]] = []
+        self.__is_cancelled = False
+        self.__timer = self.__tick #タイマーは関数オブジェクトの同一性で識別されるため、同じバウンドメソッドを使い続ける
+
+    @property
+    def is_done(self) -> bool:
+        """Whether all steps have been run"""
+        return self.__index >= len(self.__steps)
+
+    @property
+    def is_cancelled(self) -> bool: return self.__is_cancelled
+
+    @property
+    def progress(self) -> tuple[int, int]:
+        """Number of steps that have been run and the total number of steps"""
+        return (self.__index, len(self.__steps))
+
+    @property
+    def errors(self) -> List[tuple[str, Exception]]:
+        """Names and exceptions of the steps that failed"""
+        return list(self.__errors)
+
+    def add_done_callback(self, callback: Callable[[Self], Any]) -> None:
+        """Add a function called with this scheduler when all steps have been run.
+
+        If the steps have already been run, it is called immediately.
+
+        Args:
+            callback (Callable[[Self], Any]): Function to call
+        """
+        if self.is_done and not self.__is_cancelled: callback(self)
+        else: self.__callbacks.append(callback)
+
+    def start(self) -> None:
+        """Start running the steps from the timer
+        """
+        if self.is_done: self.__finish(); return
+        if not timers.is_registered(self.__timer): timers.register(self.__timer, first_interval=self.__interval)
+
+    def flush(self) -> None:
+        """Run all remaining steps immediately
+        """
+        if timers.is_registered(self.__timer): timers.unregister(self.__timer)
+        if self.__is_cancelled or self.is_done: return
+
+        self.__run(float('inf'))
+        self.__finish()
+
+    def cancel(self) -> None:
+        """Stop without running the remaining steps. The done callbacks are not called.
+        """
+        if timers.is_registered(self.__timer): timers.unregister(self.__timer)
+        self.__is_cancelled = True
+
+    def __tick(self) -> float | None:
+        """Timer function that runs one chunk"""
+        if self.__is_cancelled: return None
+
+        self.__run(perf_counter() + self.__budget)
+        if not self.is_done: return self.__interval
+
+        self.__finish()
+        return None
+
+    def __run(self, deadline: float) -> None:
+        """Run steps until the deadline"""
+        while not self.is_done:
+            name, step = self.__steps[self.__index]
+            self.__index += 1
+            try:
+                step()
+            except Exception as e: #タイマーから例外を投げると残りのステップが実行されないため記録して続行する
+                self.__errors.append((name, e))
+                print(gen_msg(RegistrationScheduler, MsgType.ERROR, f'Failed to register "{name}". \n {e}'))
+
+            if perf_counter() >= deadline: return
+
+    def __finish(self) -> None:
+        """Call the done callbacks"""
+        callbacks, self.__callbacks = self.__callbacks, []
+        for callback in callbacks: callback(self)
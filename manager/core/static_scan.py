@@ -0,0 +1,300 @@
+#This program is distributed under the MIT License.
+#See the LICENSE file for details.
+
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List, Set
+
+import ast
+import builtins
+
+from .utils.gen_msg import MsgType, gen_msg
+from .discovery_cache import DiscoveryCache
+
+#モジュールの静的解析の結果
+@dataclass
+class ModuleSummary:
+    """Result of the static analysis of a module
+    """
+
+    classes:        List[str] = field(default_factory=list) #アドオンのクラスである(可能性がある)クラス名
+    has_register:   bool      = False                       #モジュールレベルのregister()の有無
+    has_unregister: bool      = False                       #モジュールレベルのunregister()の有無
+    is_parsed:      bool      = True                        #構文解析に成功したか
+    imports:        List[str] = field(default_factory=list) #インポートしているモジュール(相対インポートは先頭に'.'が付く)
+
+    @property
+    def is_candidate(self) -> bool:
+        """Whether the module needs to be imported"""
+        return not self.is_parsed or bool(self.classes) or self.has_register or self.has_unregister
+
+class StaticScanner:
+    """Analyzes modules with 'ast' without importing them.
+
+    A class is reported if one of its bases resolves to a target class, or cannot be resolved statically
+    (for example a base imported from another module of the add-on). The results are memoized per file
+    and, if a cache is given, persisted with the modification time and size of the file.
+    """
+
+    #'bl_'で始まるBlender標準のモジュール(bl_ui等)はアドオンのクラスを継承している可能性がある
+    BLENDER_MODULE_PREFIX: str = 'bl_'
+
+    #基底クラスの判定結果
+    __NOT_TARGET: int = 0
+    __TARGET:     int = 1
+    __UNKNOWN:    int = 2
+
+    def __init__(self, target_classes: List[object], addon_name: str, cache: DiscoveryCache | None = None) -> None:
+        """Initialize
+
+        Args:
+            target_classes (List[object]): Classes to load
+            addon_name (str): Package name of the add-on
+            cache (DiscoveryCache | None, optional): Cache to persist the results. Defaults to None.
+        """
+        #'bpy.types'のクラスの__module__はBlenderでは'bpy_types'等になるため、インポートされる名前でも登録する
+        self.__targets: Set[str] = set(f'{c.__module__}.{c.__name__}' for c in target_classes) | set(f'bpy.types.{c.__name__}' for c in target_classes) # type: ignore
+        self.__addon_name = addon_name
+        self.__cache = cache
+        self.__memo: Dict[str, tuple[List[int], ModuleSummary]] = {}
+
+    #ファイルごとのリテラルの読み取り結果(パス -> (フィンガープリント, 識別子 -> 値))
+    __literal_memo: Dict[str, tuple[List[int], Dict[str, Any]]] = {}
+    __DYNAMIC: object = object() #リテラルで定義されていない
+
+    def scan(self, path: str, key: str | None = None) -> ModuleSummary:
+        """Analyze a module file
+
+        Args:
+            path (str): Absolute path to the module file
+            key (str | None, optional): Key of the persistent cache. The path is used if None. Defaults to None.
+
+        Returns:
+            ModuleSummary: Result of the analysis
+        """
+        fingerprint = DiscoveryCache.fingerprint(path)
+
+        memo = self.__memo.get(path)
+        if memo and memo[0] == fingerprint: return memo[1]
+
+        if key is None: key = path
+        cached = self.__cache.get('scan', key, fingerprint) if self.__cache else None
+        if cached is not None:
+            summary = ModuleSummary(**cached)
+        else:
+            summary = self.__analyze(path)
+            if self.__cache: self.__cache.set('scan', key, fingerprint, asdict(summary))
+
+        self.__memo[path] = (fingerprint, summary)
+        return summary
+
+    def __analyze(self, path: str) -> ModuleSummary:
+        """Parse the module and collect classes and module functions"""
+        tree = self.parse(path)
+        if tree is None: return ModuleSummary(is_parsed=False) #解析できない場合はインポートに任せる
+
+        summary = ModuleSummary()
+        imports: Dict[str, str] = {}       #ローカル名 -> 完全なモジュールパス
+        local_classes: Dict[str, int] = {} #モジュール内で定義された名前(クラスや別名)の判定結果
+
+        for node in self.iter_module_level(tree.body):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    if alias.asname: imports[alias.asname] = alias.name
+                    else: imports[alias.name.split('.')[0]] = alias.name.split('.')[0]
+            elif isinstance(node, ast.ImportFrom):
+                base = '.' * node.level + (node.module or '')
+                for alias in node.names:
+                    if alias.name == '*': continue
+                    name = alias.asname or alias.name
+                    imports[name] = f'{base}.{alias.name}' if node.module else f'{base}{alias.name}'
+                    self.__mark_function(summary, name)
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                self.__mark_function(summary, node.name)
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                for target in targets:
+                    for name in ast.walk(target):
+                        if isinstance(name, ast.Name): self.__mark_function(summary, name.id)
+                self.__record_alias(targets, node.value, imports, local_classes)
+            elif isinstance(node, ast.ClassDef):
+                verdicts = [self.__resolve_base(base, imports, local_classes) for base in node.bases]
+                verdict = max(verdicts, default=self.__NOT_TARGET)
+                local_classes[node.name] = verdict
+                if verdict != self.__NOT_TARGET and node.name not in summary.classes: summary.classes.append(node.name)
+
+        summary.imports = self.__collect_imports(tree)
+
+        return summary
+
+    @staticmethod
+    def __collect_imports(tree: ast.Module) -> List[str]:
+        """Collect all imported module names, including imports inside functions
+
+        For 'from x import y', both 'x' and 'x.y' are recorded because 'y' may be a sub-module.
+        """
+        imports: List[str] = []
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                imports += [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom):
+                base = '.' * node.level + (node.module or '')
+                imports.append(base)
+                imports += [f'{base}.{alias.name}' if node.module else f'{base}{alias.name}' for alias in node.names if not alias.name == '*']
+
+        return list(dict.fromkeys(imports))
+
+    @classmethod
+    def read_literal(cls, path: str, identifier: str, default: Any = None) -> Any:
+        """Read a module level variable assigned with a literal without importing the module
+
+        Args:
+            path (str): Path to the module file
+            identifier (str): Variable name
+            default (Any, optional): Value returned when the variable is not defined. Defaults to None.
+
+        Raises:
+            ValueError: Thrown if the variable is built dynamically (not a literal).
+
+        Returns:
+            Any: Value of the variable
+        """
+        fingerprint = DiscoveryCache.fingerprint(path)
+
+        memo = cls.__literal_memo.get(path)
+        if memo is None or memo[0] != fingerprint:
+            memo = (fingerprint, {})
+            cls.__literal_memo[path] = memo
+
+        if identifier not in memo[1]: memo[1][identifier] = cls.__find_literal(path, identifier)
+
+        value = memo[1][identifier]
+        if value is cls.__DYNAMIC: raise ValueError(f'"{identifier}" in "{path}" is not a literal.')
+
+        return default if value is None else value
+
+    @classmethod
+    def __find_literal(cls, path: str, identifier: str) -> Any:
+        """Find the last literal assignment of 'identifier'"""
+        tree = cls.parse(path)
+        if tree is None: return cls.__DYNAMIC
+
+        value: Any = None
+        for node in cls.iter_module_level(tree.body):
+            if isinstance(node, (ast.Assign, ast.AnnAssign)):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                if not any(isinstance(t, ast.Name) and t.id == identifier for t in targets): continue
+                try:
+                    value = ast.literal_eval(node.value) # type: ignore
+                except ValueError:
+                    value = cls.__DYNAMIC
+            elif isinstance(node, ast.AugAssign) and isinstance(node.target, ast.Name) and node.target.id == identifier:
+                value = cls.__DYNAMIC #'ignore += ...'等
+            elif isinstance(node, ast.Expr) and isinstance(node.value, ast.Call):
+                name = cls.dotted_name(node.value.func)
+                if name and name.split('.')[0] == identifier: value = cls.__DYNAMIC #'ignore.append(...)'等
+
+        return value
+
+    @staticmethod
+    def parse(path: str) -> ast.Module | None:
+        """Parse a file into an AST
+
+        Args:
+            path (str): Path to the file
+
+        Returns:
+            ast.Module | None: Syntax tree, or None if the file cannot be read or parsed
+        """
+        try:
+            with open(path, 'rb') as f:
+                return ast.parse(f.read(), path)
+        except (OSError, SyntaxError, ValueError) as e:
+            print(gen_msg(StaticScanner, MsgType.CAUTION, f'Failed to parse "{path}". \n {e}'))
+            return None
+
+    @staticmethod
+    def iter_module_level(body: List[ast.stmt]) -> List[ast.stmt]:
+        """Get the statements executed at module level, including the bodies of 'if' and 'try' blocks
+
+        Args:
+            body (List[ast.stmt]): Statements of the module
+
+        Returns:
+            List[ast.stmt]: Flattened statements
+        """
+        nodes: List[ast.stmt] = []
+        for node in body:
+            if isinstance(node, ast.If):
+                nodes += StaticScanner.iter_module_level(node.body + node.orelse)
+            elif isinstance(node, ast.Try):
+                nodes += StaticScanner.iter_module_level(node.body + node.orelse + node.finalbody + [stmt for h in node.handlers for stmt in h.body])
+            else:
+                nodes.append(node)
+        return nodes
+
+    @staticmethod
+    def dotted_name(node: ast.expr) -> str | None:
+        """Convert 'a.b.c' style expressions to a string"""
+        parts: List[str] = []
+        while isinstance(node, ast.Attribute):
+            parts.append(node.attr)
+            node = node.value
+        if not isinstance(node, ast.Name): return None
+        parts.append(node.id)
+        return '.'.join(reversed(parts))
+
+    @staticmethod
+    def __mark_function(summary: ModuleSummary, name: str) -> None:
+        """Record module level 'register' and 'unregister'"""
+        if name == 'register': summary.has_register = True
+        elif name == 'unregister': summary.has_unregister = True
+
+    def __record_alias(self, targets: List[ast.expr], value: ast.expr | None, imports: Dict[str, str], local_classes: Dict[str, int]) -> None:
+        """Record the names assigned at module level ('Base = Operator' is resolved like the name it refers to)"""
+        names = [target.id for target in targets if isinstance(target, ast.Name)]
+        dotted = self.dotted_name(value) if value is not None else None
+        head, _, rest = (dotted or '').partition('.')
+
+        for name in names:
+            if dotted and head in imports:
+                imports[name] = imports[head] + (f'.{rest}' if rest else '')
+                local_classes.pop(name, None)
+            else:
+                imports.pop(name, None)
+                #別名でなければ静的には分からない
+                local_classes[name] = local_classes[head] if dotted and not rest and head in local_classes else self.__UNKNOWN
+
+    def __resolve_base(self, node: ast.expr, imports: Dict[str, str], local_classes: Dict[str, int]) -> int:
+        """Determine whether a base class expression refers to a target class
+
+        Only names that are provably not target classes (built-in classes, classes of other libraries and local classes that are not targets)
+        are reported as not targets. Names that cannot be resolved statically are reported as unknown, so the module is imported.
+
+        Args:
+            node (ast.expr): Base class expression
+            imports (Dict[str, str]): Imported names
+            local_classes (Dict[str, int]): Results of the names defined before in the module
+
+        Returns:
+            int: Result of the determination
+        """
+        if isinstance(node, ast.Subscript): node = node.value #Generic[T]等
+
+        name = self.dotted_name(node)
+        if name is None: return self.__UNKNOWN #関数呼び出し等は静的に判定できない
+
+        head, _, rest = name.partition('.')
+        if head in local_classes: return local_classes[head] if not rest else self.__UNKNOWN
+
+        if head not in imports:
+            if hasattr(builtins, head) and not rest: return self.__NOT_TARGET
+            return self.__UNKNOWN #'import *'や関数内で定義された名前等
+
+        full_name = imports[head] + (f'.{rest}' if rest else '')
+        if full_name in self.__targets: return self.__TARGET
+
+        module = full_name.split('.')[0]
+        if full_name.startswith('.') or module == self.__addon_name or module.startswith(self.BLENDER_MODULE_PREFIX): return self.__UNKNOWN #アドオン内のクラスを継承している可能性がある
+        if module in ('bpy', 'bpy_types'): return self.__UNKNOWN #対象のクラスを継承したBlenderのクラス(NodeCustomGroup等)の可能性がある
+
+        return self.__NOT_TARGET
@@ -2,9 +2,9 @@
 
 from typing import Any
 
-from os.path import exists
-from bpy.path import abspath # type: ignore
-from ..core.utils.gen_msg import MsgType, gen_msg
+from .font_registry import FontRegistry
+from .text_layout import TextLayout, TextBlock
+from .redraw import RedrawScheduler
 
 import bpy
 import blf
@@ -14,6 +14,7 @@ class DrawText():
     def __init__(self, font_id: int | str | None=None) -> None:
         self.__handler: object | None = None
         self.__font_id: int = 0
+        self.__is_shared_font = False #FontRegistryから取得したフォントか
 
         self.__func: object | None = None
         self.__args: tuple[Any, ...] | None = None
@@ -26,12 +27,17 @@ class DrawText():
     def font_id(self) -> int: return self.__font_id
     @font_id.setter
     def font_id(self, id_or_path: int | str) -> None:
-        if isinstance(id_or_path, int):
-            self.__font_id = id_or_path
-        else:
-            abs_path: str = abspath(id_or_path)
-            if not exists(abs_path): raise ValueError(gen_msg(DrawText, MsgType.ERROR, f'Font "{abs_path}" not found.'))
-            self.__font_id = blf.load(abs_path)
+        #同じフォントファイルは読み込み済みのものを共有する
+        font_id = id_or_path if isinstance(id_or_path, int) else FontRegistry().acquire(id_or_path)
+        self.release_font()
+        self.__font_id = font_id
+        self.__is_shared_font = not isinstance(id_or_path, int)
+
+    def release_font(self) -> None:
+        """Release the font loaded from a path and return to the default font."""
+        if self.__is_shared_font: FontRegistry().release(self.__font_id)
+        self.__font_id = 0
+        self.__is_shared_font = False
 
     @property
     def func(self) -> object | None: return self.__func
@@ -54,11 +60,38 @@ class DrawText():
             color (tuple[float, float, float, float], optional): Color to display(red, green, blue, alpha). Defaults to (0.0, 0.0, 0.0, 0.0).
             size (float, optional): Size to display. Defaults to 10.
         """
-        blf.position(self.__font_id, pos[0], pos[1], pos[2])
-        blf.color(self.__font_id, color[0], color[1], color[2], color[3])
-        blf.size(self.__font_id, size)
+        FontRegistry().set_state(self.__font_id, pos, color, size) #変更がない状態は設定し直さない
         blf.draw(self.__font_id, text)
 
+    def draw_layout(self, text: str, pos: tuple[float, float, float], color: tuple[float, float, float, float]=(0.0, 0.0, 0.0, 0.0), size: float=10,
+                    width: float | None=None, align: str='LEFT', anchor: str='TOP_LEFT', line_spacing: float=1.2) -> TextBlock:
+        """Draw a text over multiple lines with wrapping, alignment and anchoring.
+
+        The layout is cached until the text, the size or the available width changes (see TextLayout).
+
+        Args:
+            text (str): Characters to display. Line breaks are kept.
+            pos (tuple[float, float, float]): Coordinates of the anchor(x, y, z).
+            color (tuple[float, float, float, float], optional): Color to display(red, green, blue, alpha). Defaults to (0.0, 0.0, 0.0, 0.0).
+            size (float, optional): Size to display. Defaults to 10.
+            width (float | None, optional): Width at which lines are wrapped. If None, the width from the position to the right edge of the region is used. Defaults to None.
+            align (str, optional): Alignment of the lines ('LEFT', 'CENTER', 'RIGHT'). Defaults to 'LEFT'.
+            anchor (str, optional): Point of the text placed at the position (example: 'TOP_LEFT', 'CENTER'). Defaults to 'TOP_LEFT'.
+            line_spacing (float, optional): Line height relative to the font height. Defaults to 1.2.
+
+        Returns:
+            TextBlock: Laid-out lines. Its 'left', 'bottom', 'width' and 'height' can be used to draw a background.
+        """
+        if width is None and bpy.context.region: width = bpy.context.region.width - pos[0]
+
+        block = TextLayout().layout(text, self.__font_id, size, width, align, anchor, line_spacing)
+        registry = FontRegistry()
+        for line, x, y in block.lines:
+            registry.set_state(self.__font_id, (pos[0] + x, pos[1] + y, pos[2]), color, size)
+            blf.draw(self.__font_id, line)
+
+        return block
+
 
     def display(self, func: object | None=None, args: tuple[Any, ...] | None=None, region_type: str="WINDOW", draw_type: str="POST_PIXEL") -> object | None:
         """Add a drawing function. If previously registered, arguments can be omitted."""
@@ -71,8 +104,8 @@ class DrawText():
         if self.__region_type is None or region_type != self.__region_type: self.__region_type = region_type
         if self.__draw_type is None or draw_type != self.__draw_type: self.__draw_type = draw_type
 
-        self.__handler = SpaceView3D.draw_handler_add(self.__func, (self, ) + self.__args, self.__region_type, self.__draw_type) # type: ignore
-        bpy.context.area.tag_redraw()
+        self.__handler = SpaceView3D.draw_handler_add(self.__draw_frame, self.__args or (), self.__region_type, self.__draw_type) # type: ignore
+        RedrawScheduler().tag_area_type('VIEW_3D')
         return self.__handler
 
     def erase(self) -> None:
@@ -80,7 +113,12 @@ class DrawText():
         if self.__handler is None: return
         SpaceView3D.draw_handler_remove(self.__handler, self.__region_type)
         self.__handler = None
-        bpy.context.area.tag_redraw()
+        RedrawScheduler().tag_area_type('VIEW_3D')
+
+    def __draw_frame(self, *args: Any) -> None:
+        """Draw handler. The font state may have been changed by other drawing code since the last call."""
+        FontRegistry().invalidate()
+        self.__func(self, *args) # type: ignore
 
     def clear(self) -> None:
         """Clear saved content."""
@@ -0,0 +1,144 @@
+# pyright: reportUnknownMemberType=false
+
+from typing import Self, Dict, List
+
+from os.path import exists
+from bpy.path import abspath # type: ignore
+from ..core.utils.gen_msg import MsgType, gen_msg
+
+import blf
+
+class FontRegistry:
+    """Process-wide registry of the fonts loaded with 'blf.load()'.
+
+    Each font file is loaded once and shared with reference counting, and is unloaded when the last user releases it.
+    It also remembers the last position, color and size set for each font, so that drawing code can skip
+    'blf' calls that would not change anything. The remembered state is only valid within one draw callback,
+    so call 'invalidate()' at the start of each callback (DrawText does this automatically).
+    """
+
+    #シングルトンパターン
+    def __new__(cls) -> Self:
+        """Always return the same instance.
+        """
+        if not hasattr(cls ,'_instance'): cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self) -> None:
+        if self.__isInitialized: return
+        self.__isInitialized = True
+
+        self.__fonts: Dict[str, List[int]] = {}   #フォントファイルの絶対パス -> [フォントID, 参照数]
+        self.__paths: Dict[int, str] = {}         #フォントID -> フォントファイルの絶対パス
+        self.__states: Dict[int, List[object]] = {} #フォントID -> [位置, 色, サイズ]
+
+    @classmethod
+    def reset(cls) -> None:
+        """Unload all fonts that are still acquired and discard the instance, so that the next call creates a new one.
+        """
+        instance = cls.__dict__.get('_instance')
+        if instance is None: return
+
+        for abs_path in instance.__fonts: blf.unload(abs_path)
+        del cls._instance
+
+    def acquire(self, path: str) -> int:
+        """Get the ID of a font file, loading it only if it is not loaded yet.
+
+        Args:
+            path (str): Path to the font file (Blender's relative paths can also be used)
+
+        Raises:
+            ValueError: Thrown if the font file does not exist.
+
+        Returns:
+            int: Font ID
+        """
+        abs_path: str = abspath(path)
+
+        font = self.__fonts.get(abs_path)
+        if font is None:
+            if not exists(abs_path): raise ValueError(gen_msg(FontRegistry, MsgType.ERROR, f'Font "{abs_path}" not found.'))
+            font = [blf.load(abs_path), 0]
+            self.__fonts[abs_path] = font
+            self.__paths[font[0]] = abs_path
+
+        font[1] += 1
+        return font[0]
+
+    def release(self, font_id: int) -> bool:
+        """Release a font obtained with 'acquire()'. The font is unloaded when it is no longer used.
+
+        Args:
+            font_id (int): Font ID
+
+        Returns:
+            bool: Whether the font was acquired from this registry
+        """
+        abs_path = self.__paths.get(font_id)
+        if abs_path is None: return False
+
+        font = self.__fonts[abs_path]
+        font[1] -= 1
+        if font[1] <= 0:
+            blf.unload(abs_path)
+            del self.__fonts[abs_path]
+            del self.__paths[font_id]
+            self.__states.pop(font_id, None)
+
+        return True
+
+    def count(self, font_id: int) -> int:
+        """Get the number of users of a font (0 if it was not acquired from this registry)"""
+        abs_path = self.__paths.get(font_id)
+        return self.__fonts[abs_path][1] if abs_path else 0
+
+    def set_state(self, font_id: int, pos: tuple[float, float, float], color: tuple[float, float, float, float], size: float) -> None:
+        """Set the position, color and size of a font, skipping the values that have not changed
+
+        Args:
+            font_id (int): Font ID
+            pos (tuple[float, float, float]): Coordinates (x, y, z)
+            color (tuple[float, float, float, float]): Color (red, green, blue, alpha)
+            size (float): Size
+        """
+        self.set_size(font_id, size)
+        state = self.__states[font_id]
+
+        if state[0] != pos:
+            blf.position(font_id, pos[0], pos[1], pos[2])
+            state[0] = pos
+        if state[1] != color:
+            blf.color(font_id, color[0], color[1], color[2], color[3])
+            state[1] = color
+
+    def set_size(self, font_id: int, size: float) -> None:
+        """Set only the size of a font, skipping the call if it has not changed (used before 'blf.dimensions()')
+
+        Args:
+            font_id (int): Font ID
+            size (float): Size
+        """
+        state = self.__states.get(font_id)
+        if state is None:
+            state = [None, None, None]
+            self.__states[font_id] = state
+
+        if state[2] != size:
+            blf.size(font_id, size)
+            state[2] = size
+
+    def path(self, font_id: int) -> str | None:
+        """Get the path of a font acquired from this registry (None for other fonts)"""
+        return self.__paths.get(font_id)
+
+    def invalidate(self, font_id: int | None = None) -> None:
+        """Forget the remembered state, because other code may have changed it
+
+        Args:
+            font_id (int | None, optional): Target font. All fonts if None. Defaults to None.
+        """
+        if font_id is None: self.__states.clear()
+        else: self.__states.pop(font_id, None)
+
+    __isInitialized = False
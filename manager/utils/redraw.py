@@ -0,0 +1,121 @@
+# pyright: reportUnknownMemberType=false
+
+from typing import Self, Dict, Set
+from time import perf_counter
+
+import bpy
+from bpy.app import timers
+
+class RedrawScheduler:
+    """Collects redraw requests and redraws each area once per timer tick.
+
+    Requests made while a flush is pending are merged, so a burst of overlay updates causes one redraw per area.
+    Flushes are limited to 'max_frequency' times per second. Requests work even when there is no area in the context.
+    """
+
+    #シングルトンパターン
+    def __new__(cls) -> Self:
+        """Always return the same instance.
+        """
+        if not hasattr(cls ,'_instance'): cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self) -> None:
+        if self.__isInitialized: return
+        self.__isInitialized = True
+
+        self.__areas: Dict[object, None] = {}  #再描画するエリア
+        self.__area_types: Set[str] = set()    #再描画するエリアの種類(例: 'VIEW_3D')
+        self.__min_interval = 1 / 60           #再描画の最小間隔(秒)
+        self.__last_flush = float('-inf')
+        self.__timer = self.__tick             #同じバウンドメソッドを使い続ける(理由はRegistrationSchedulerを参照)
+
+    @classmethod
+    def reset(cls) -> None:
+        """Cancel the pending redraw and discard the instance, so that the next call creates a new one.
+        """
+        instance = cls.__dict__.get('_instance')
+        if instance is None: return
+
+        instance.cancel()
+        del cls._instance
+
+    @property
+    def max_frequency(self) -> float:
+        """Maximum number of flushes per second"""
+        return 1 / self.__min_interval
+    @max_frequency.setter
+    def max_frequency(self, value: float) -> None:
+        if value <= 0: raise ValueError('"max_frequency" must be greater than 0.')
+        self.__min_interval = 1 / value
+
+    def is_pending(self) -> bool: return timers.is_registered(self.__timer)
+
+    def tag_area(self, area: object | None = None) -> None:
+        """Request a redraw of an area
+
+        Args:
+            area (object | None, optional): Target area. The area in the context if None (nothing is done if there is none). Defaults to None.
+        """
+        if area is None: area = bpy.context.area
+        if area is None: return
+
+        self.__areas[area] = None
+        self.__schedule()
+
+    def tag_area_type(self, area_type: str = 'VIEW_3D') -> None:
+        """Request a redraw of all areas of a type in all windows
+
+        Args:
+            area_type (str, optional): Type of the areas (example: 'VIEW_3D'). Defaults to 'VIEW_3D'.
+        """
+        self.__area_types.add(area_type)
+        self.__schedule()
+
+    def flush(self) -> int:
+        """Redraw the requested areas immediately
+
+        Returns:
+            int: Number of redrawn areas
+        """
+        if timers.is_registered(self.__timer): timers.unregister(self.__timer)
+        return self.__flush()
+
+    def cancel(self) -> None:
+        """Discard the pending requests (call it when the add-on is unregistered)."""
+        if timers.is_registered(self.__timer): timers.unregister(self.__timer)
+        self.__areas.clear()
+        self.__area_types.clear()
+
+    def __flush(self) -> int:
+        """Redraw the requested areas"""
+        areas, self.__areas = self.__areas, {}
+        area_types, self.__area_types = self.__area_types, set()
+        self.__last_flush = perf_counter()
+
+        if area_types:
+            for window in bpy.context.window_manager.windows:
+                for area in window.screen.areas:
+                    if area.type in area_types: areas[area] = None
+
+        count = 0
+        for area in areas:
+            try:
+                area.tag_redraw() # type: ignore
+                count += 1
+            except ReferenceError: pass #既に削除されたエリア
+
+        return count
+
+    def __schedule(self) -> None:
+        """Register the timer if it is not registered"""
+        if timers.is_registered(self.__timer): return
+
+        wait = self.__min_interval - (perf_counter() - self.__last_flush)
+        timers.register(self.__timer, first_interval=max(wait, 0.0))
+
+    def __tick(self) -> None:
+        """Timer function (returning None ends the timer)"""
+        self.__flush()
+
+    __isInitialized = False
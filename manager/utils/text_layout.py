@@ -0,0 +1,185 @@
+# pyright: reportUnknownMemberType=false
+
+from dataclasses import dataclass
+from typing import Self, Dict, List
+from collections import OrderedDict
+
+from .font_registry import FontRegistry
+
+import blf
+
+#レイアウト済みのテキスト
+@dataclass(frozen=True)
+class TextBlock:
+    """Result of laying out a text
+
+    The coordinates are offsets from the anchor position.
+    """
+
+    lines:  tuple[tuple[str, float, float], ...] #(行の文字列, xのオフセット, yのオフセット(ベースライン))
+    left:   float                                 #ブロックの左端のオフセット
+    bottom: float                                 #ブロックの下端のオフセット
+    width:  float
+    height: float
+
+class TextLayout:
+    """Lays out texts over multiple lines with wrapping, alignment and anchoring.
+
+    The measured widths are kept in an LRU cache keyed by (font, size, text), and the laid-out blocks are kept
+    until the text, the font, the size or the available width changes, so drawing a static text costs almost nothing per frame.
+    Fonts are identified by their file path when they were acquired from FontRegistry, because font IDs can be reused after unloading.
+    """
+
+    ALIGNS: Dict[str, float] = {'LEFT': 0.0, 'CENTER': 0.5, 'RIGHT': 1.0}
+    ANCHORS: Dict[str, tuple[float, float]] = { #(x, y)の割合(左下が0、右上が1)
+        'TOP_LEFT':    (0.0, 1.0), 'TOP':    (0.5, 1.0), 'TOP_RIGHT':    (1.0, 1.0),
+        'LEFT':        (0.0, 0.5), 'CENTER': (0.5, 0.5), 'RIGHT':        (1.0, 0.5),
+        'BOTTOM_LEFT': (0.0, 0.0), 'BOTTOM': (0.5, 0.0), 'BOTTOM_RIGHT': (1.0, 0.0),
+    }
+
+    #シングルトンパターン
+    def __new__(cls) -> Self:
+        """Always return the same instance.
+        """
+        if not hasattr(cls ,'_instance'): cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self) -> None:
+        if self.__isInitialized: return
+        self.__isInitialized = True
+
+        self.__widths: OrderedDict[tuple[object, float, str], tuple[float, float]] = OrderedDict() #(フォント, サイズ, 文字列) -> 寸法
+        self.__blocks: OrderedDict[tuple[object, ...], TextBlock] = OrderedDict()                 #レイアウトの条件 -> 結果
+        self.max_measurements = 4096
+        self.max_blocks = 256
+
+    @classmethod
+    def reset(cls) -> None:
+        """Discard the instance and its caches, so that the next call creates a new one.
+        """
+        if '_instance' in cls.__dict__: del cls._instance
+
+    def measure(self, font_id: int, size: float, text: str) -> tuple[float, float]:
+        """Get the width and height of a text
+
+        Args:
+            font_id (int): Font ID
+            size (float): Size
+            text (str): Text to measure
+
+        Returns:
+            tuple[float, float]: Width and height
+        """
+        key = (FontRegistry().path(font_id) or font_id, size, text)
+
+        dimensions = self.__widths.get(key)
+        if dimensions is not None:
+            self.__widths.move_to_end(key)
+            return dimensions
+
+        FontRegistry().set_size(font_id, size)
+        dimensions = blf.dimensions(font_id, text)
+        self.__widths[key] = dimensions
+        if len(self.__widths) > self.max_measurements: self.__widths.popitem(last=False)
+
+        return dimensions
+
+    def layout(self, text: str, font_id: int, size: float, width: float | None = None, align: str = 'LEFT', anchor: str = 'TOP_LEFT', line_spacing: float = 1.2) -> TextBlock:
+        """Lay out a text
+
+        Args:
+            text (str): Text to lay out. Line breaks are kept.
+            font_id (int): Font ID
+            size (float): Size
+            width (float | None, optional): Width at which lines are wrapped. Lines are not wrapped if None. Defaults to None.
+            align (str, optional): Alignment of the lines ('LEFT', 'CENTER', 'RIGHT'). Defaults to 'LEFT'.
+            anchor (str, optional): Point of the block placed at the position (example: 'TOP_LEFT', 'CENTER'). Defaults to 'TOP_LEFT'.
+            line_spacing (float, optional): Line height relative to the font height. Defaults to 1.2.
+
+        Raises:
+            ValueError: Thrown if the alignment or anchor is unknown.
+
+        Returns:
+            TextBlock: Laid-out lines
+        """
+        key = (text, FontRegistry().path(font_id) or font_id, size, width, align, anchor, line_spacing)
+
+        block = self.__blocks.get(key)
+        if block is not None:
+            self.__blocks.move_to_end(key)
+            return block
+
+        if align not in self.ALIGNS: raise ValueError(f'Unknown alignment "{align}". Use one of {list(self.ALIGNS)}.')
+        if anchor not in self.ANCHORS: raise ValueError(f'Unknown anchor "{anchor}". Use one of {list(self.ANCHORS)}.')
+
+        lines: List[str] = []
+        for paragraph in text.split('\n'): lines += self.__wrap(paragraph, font_id, size, width)
+
+        widths = [self.measure(font_id, size, line)[0] for line in lines]
+        line_height = self.measure(font_id, size, 'Hg')[1] * line_spacing
+        block_width = max(widths, default=0.0)
+        block_height = line_height * len(lines)
+
+        ax, ay = self.ANCHORS[anchor]
+        left = -ax * block_width
+        bottom = -ay * block_height
+        ratio = self.ALIGNS[align]
+
+        block = TextBlock(
+            tuple((line, left + ratio * (block_width - w), bottom + block_height - (i + 1) * line_height) for i, (line, w) in enumerate(zip(lines, widths))),
+            left, bottom, block_width, block_height
+        )
+
+        self.__blocks[key] = block
+        if len(self.__blocks) > self.max_blocks: self.__blocks.popitem(last=False)
+
+        return block
+
+    def clear(self) -> None:
+        """Clear the caches."""
+        self.__widths.clear()
+        self.__blocks.clear()
+
+    def __wrap(self, paragraph: str, font_id: int, size: float, width: float | None) -> List[str]:
+        """Wrap a paragraph at word boundaries (words longer than the width are split by characters)"""
+        if width is None or self.measure(font_id, size, paragraph)[0] <= width: return [paragraph]
+
+        space = self.measure(font_id, size, ' ')[0]
+        lines: List[str] = []
+        line: List[str] = []
+        line_width = 0.0
+
+        for word in paragraph.split(' '):
+            word_width = self.measure(font_id, size, word)[0]
+
+            #1単語が幅を超える場合は文字単位で分割する
+            if word_width > width:
+                if line: lines.append(' '.join(line))
+                pieces = self.__split_word(word, font_id, size, width)
+                lines += pieces[:-1]
+                line, line_width = [pieces[-1]], self.measure(font_id, size, pieces[-1])[0]
+                continue
+
+            next_width = line_width + (space if line else 0.0) + word_width
+            if line and next_width > width:
+                lines.append(' '.join(line))
+                line, line_width = [word], word_width
+            else:
+                line.append(word)
+                line_width = next_width
+
+        lines.append(' '.join(line))
+        return lines
+
+    def __split_word(self, word: str, font_id: int, size: float, width: float) -> List[str]:
+        """Split a word into pieces that fit in the width"""
+        pieces: List[str] = []
+        start = 0
+        for end in range(1, len(word) + 1):
+            if end - start > 1 and self.measure(font_id, size, word[start:end])[0] > width:
+                pieces.append(word[start:end - 1])
+                start = end - 1
+        pieces.append(word[start:])
+        return pieces
+
+    __isInitialized = False
@@ -0,0 +1,190 @@
+# pyright: reportUnknownMemberType=false
+
+from typing import Any, Dict, List
+
+from .font_registry import FontRegistry
+from .redraw import RedrawScheduler
+
+import blf
+from bpy.types import SpaceView3D
+
+class TextOverlay:
+    """Draws many texts with a single draw handler.
+
+    The items are stored column by column in lists, and removed slots are reused, so adding, updating and removing
+    an item does not install or remove a draw handler. The items are drawn grouped by font and size to reduce state changes.
+    The draw handler is installed when the first item is added and removed when the overlay becomes empty.
+    """
+
+    def __init__(self, space: Any = SpaceView3D, region_type: str = "WINDOW", draw_type: str = "POST_PIXEL", area_type: str = "VIEW_3D") -> None:
+        """Initialize
+
+        Args:
+            space (Any, optional): Space class to draw in. Defaults to SpaceView3D.
+            region_type (str, optional): Region to draw in. Defaults to "WINDOW".
+            draw_type (str, optional): Drawing timing. Defaults to "POST_PIXEL".
+            area_type (str, optional): Type of the areas redrawn when the texts change. Defaults to "VIEW_3D".
+        """
+        self.__space = space
+        self.__region_type = region_type
+        self.__draw_type = draw_type
+        self.__area_type = area_type
+        self.__handler: object | None = None
+
+        #アイテムの各要素(インデックスはスロット番号)
+        self.__texts: List[str] = []
+        self.__positions: List[tuple[float, float, float]] = []
+        self.__colors: List[tuple[float, float, float, float]] = []
+        self.__sizes: List[float] = []
+        self.__fonts: List[int] = []
+
+        self.__slots: Dict[int, int] = {}                         #アイテムID -> スロット番号
+        self.__free: List[int] = []                               #空いているスロット番号
+        self.__groups: Dict[tuple[int, float], Dict[int, None]] = {} #(フォントID, サイズ) -> スロット番号
+        self.__order: List[tuple[int, float]] | None = None       #描画するグループの順番(Noneは再計算が必要)
+        self.__next_id = 0
+
+    def __len__(self) -> int: return len(self.__slots)
+    def __contains__(self, item: int) -> bool: return item in self.__slots
+
+    def is_drawing(self) -> bool: return self.__handler is not None
+
+    def add(self, text: str, pos: tuple[float, float, float], color: tuple[float, float, float, float]=(0.0, 0.0, 0.0, 1.0), size: float=10, font_id: int=0) -> int:
+        """Add a text
+
+        Args:
+            text (str): Characters to display.
+            pos (tuple[float, float, float]): Coordinates to display(x, y, z).
+            color (tuple[float, float, float, float], optional): Color to display(red, green, blue, alpha). Defaults to (0.0, 0.0, 0.0, 1.0).
+            size (float, optional): Size to display. Defaults to 10.
+            font_id (int, optional): Font ID (see FontRegistry). Defaults to 0.
+
+        Returns:
+            int: ID of the item
+        """
+        if self.__free:
+            slot = self.__free.pop()
+            self.__texts[slot], self.__positions[slot], self.__colors[slot], self.__sizes[slot], self.__fonts[slot] = text, pos, color, size, font_id
+        else:
+            slot = len(self.__texts)
+            self.__texts.append(text)
+            self.__positions.append(pos)
+            self.__colors.append(color)
+            self.__sizes.append(size)
+            self.__fonts.append(font_id)
+
+        item = self.__next_id
+        self.__next_id += 1
+        self.__slots[item] = slot
+        self.__group_add(slot)
+
+        if self.__handler is None: self.__handler = self.__space.draw_handler_add(self.__draw, (), self.__region_type, self.__draw_type)
+        self.__tag_redraw()
+
+        return item
+
+    def update(self, item: int, text: str | None=None, pos: tuple[float, float, float] | None=None, color: tuple[float, float, float, float] | None=None,
+               size: float | None=None, font_id: int | None=None) -> None:
+        """Change a text. Omitted values are not changed.
+
+        Args:
+            item (int): ID of the item
+            text (str | None, optional): Characters to display. Defaults to None.
+            pos (tuple[float, float, float] | None, optional): Coordinates to display(x, y, z). Defaults to None.
+            color (tuple[float, float, float, float] | None, optional): Color to display(red, green, blue, alpha). Defaults to None.
+            size (float | None, optional): Size to display. Defaults to None.
+            font_id (int | None, optional): Font ID. Defaults to None.
+
+        Raises:
+            KeyError: Thrown if the item does not exist.
+        """
+        slot = self.__slots[item]
+
+        if text is not None: self.__texts[slot] = text
+        if pos is not None: self.__positions[slot] = pos
+        if color is not None: self.__colors[slot] = color
+        if (size is not None and size != self.__sizes[slot]) or (font_id is not None and font_id != self.__fonts[slot]):
+            self.__group_remove(slot)
+            if size is not None: self.__sizes[slot] = size
+            if font_id is not None: self.__fonts[slot] = font_id
+            self.__group_add(slot)
+
+        self.__tag_redraw()
+
+    def remove(self, item: int) -> bool:
+        """Remove a text
+
+        Args:
+            item (int): ID of the item
+
+        Returns:
+            bool: Whether the item existed
+        """
+        slot = self.__slots.pop(item, None)
+        if slot is None: return False
+
+        self.__group_remove(slot)
+        self.__texts[slot] = ''
+        self.__free.append(slot)
+
+        if not self.__slots: self.__remove_handler()
+        self.__tag_redraw()
+
+        return True
+
+    def clear(self) -> None:
+        """Remove all texts and the draw handler."""
+        self.__texts.clear()
+        self.__positions.clear()
+        self.__colors.clear()
+        self.__sizes.clear()
+        self.__fonts.clear()
+        self.__slots.clear()
+        self.__free.clear()
+        self.__groups.clear()
+        self.__order = None
+
+        self.__remove_handler()
+        self.__tag_redraw()
+
+    def __draw(self) -> None:
+        """Draw handler"""
+        registry = FontRegistry()
+        registry.invalidate() #前回の呼び出しから他の描画処理で状態が変わっている可能性がある
+
+        if self.__order is None: self.__order = sorted(self.__groups)
+
+        texts, positions, colors = self.__texts, self.__positions, self.__colors
+        for key in self.__order:
+            font_id, size = key
+            for slot in self.__groups[key]:
+                registry.set_state(font_id, positions[slot], colors[slot], size)
+                blf.draw(font_id, texts[slot])
+
+    def __group_add(self, slot: int) -> None:
+        """Add a slot to the group of its font and size"""
+        key = (self.__fonts[slot], self.__sizes[slot])
+        group = self.__groups.get(key)
+        if group is None:
+            group = self.__groups[key] = {}
+            self.__order = None
+        group[slot] = None
+
+    def __group_remove(self, slot: int) -> None:
+        """Remove a slot from the group of its font and size"""
+        key = (self.__fonts[slot], self.__sizes[slot])
+        group = self.__groups[key]
+        del group[slot]
+        if not group:
+            del self.__groups[key]
+            self.__order = None
+
+    def __remove_handler(self) -> None:
+        """Remove the draw handler if it is installed"""
+        if self.__handler is None: return
+        self.__space.draw_handler_remove(self.__handler, self.__region_type)
+        self.__handler = None
+
+    def __tag_redraw(self) -> None:
+        """Request a redraw (redraws requested within one timer tick are merged)"""
+        RedrawScheduler().tag_area_type(self.__area_type)
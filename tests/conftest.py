@@ -0,0 +1,39 @@
+"""Tests run against the 'bpy' stand-in used by the benchmarks."""
+
+from typing import Any, Callable
+from types import ModuleType
+
+import sys
+import itertools
+from importlib import import_module
+from os.path import dirname, join, abspath
+
+import pytest
+
+ROOT_DIR = dirname(dirname(abspath(__file__)))
+BENCH_DIR = join(ROOT_DIR, 'benchmarks')
+sys.path[:0] = [join(BENCH_DIR, 'bpy_stub'), BENCH_DIR, ROOT_DIR]
+
+from tree_gen import TreeShape, generate
+
+_counter = itertools.count()
+
+@pytest.fixture
+def make_addon(tmp_path: Any, monkeypatch: pytest.MonkeyPatch) -> Callable[..., tuple[str, str, ModuleType]]:
+    """Generate an add-on tree with a unique package name
+
+    Returns a function that takes a 'TreeShape' and returns the path to '__init__.py', the package name and the 'addon_manager' module.
+    """
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    def make(shape: TreeShape | None = None) -> tuple[str, str, ModuleType]:
+        package = f'test_addon_{next(_counter)}'
+        init_path = generate(str(tmp_path), shape or TreeShape(modules=10, keymap_ratio=0.0), package)
+        return init_path, package, import_module(f'{package}.manager.core.addon_manager')
+
+    return make
+
+def registered_classes(package: str) -> list[type]:
+    """Get the classes of an add-on that are registered in the stand-in"""
+    return [value for name, mdl in list(sys.modules.items()) if name.startswith(f'{package}.') and mdl is not None
+            for value in vars(mdl).values() if isinstance(value, type) and value.__dict__.get('is_registered')]
@@ -0,0 +1,13 @@
+from types import ModuleType
+
+from manager.core.class_classifier import ClassClassifier
+
+class Target: pass
+
+def test_classes_are_yielded_in_name_order():
+    mdl = ModuleType('addon.module')
+    for name in ('Zeta', 'Alpha', 'Mid'): #定義順は名前順と異なる
+        setattr(mdl, name, type(name, (Target, ), {'__module__': mdl.__name__}))
+    mdl.Imported = type('Imported', (Target, ), {'__module__': 'other'})
+
+    assert [clazz.__name__ for clazz, _ in ClassClassifier([Target]).iter_classes(mdl)] == ['Alpha', 'Mid', 'Zeta']
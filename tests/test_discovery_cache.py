@@ -0,0 +1,32 @@
+import os
+import shutil
+from importlib import import_module
+from os.path import dirname, join
+
+from manager.core.discovery_cache import DiscoveryCache
+
+def test_removed_folders_are_discarded_from_the_cache(make_addon, tmp_path):
+    init_path, package, _ = make_addon()
+    proc_loader = import_module(f'{package}.manager.core.proc_loader')
+    operators = join(dirname(init_path), 'operators')
+    for sub in ('kept', join('removed', 'nested')):
+        os.makedirs(join(operators, sub))
+        open(join(operators, sub, '__init__.py'), 'w').close()
+
+    cache_path = join(str(tmp_path), 'cache.json')
+    proc_loader.ProcLoader(init_path, cache_path=cache_path).load_files(['operators'])
+    keys = DiscoveryCache(cache_path).keys('dirs')
+    assert join(package, 'operators', 'removed', 'nested') in keys
+
+    shutil.rmtree(join(operators, 'removed'))
+    proc_loader.ProcLoader(init_path, cache_path=cache_path).load_files(['operators'])
+    assert sorted(DiscoveryCache(cache_path).keys('dirs')) == sorted(key for key in keys if os.sep + 'removed' not in key)
+
+def test_symlinked_folders_are_not_walked(make_addon):
+    init_path, package, _ = make_addon()
+    proc_loader = import_module(f'{package}.manager.core.proc_loader')
+    operators = join(dirname(init_path), 'operators')
+    os.symlink(dirname(init_path), join(operators, 'loop')) #自分自身の親を指すリンク
+
+    modules = proc_loader.ProcLoader(init_path).load_files(['operators'])
+    assert modules and not any('.loop.' in mdl for mdl in modules)
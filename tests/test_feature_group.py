@@ -0,0 +1,52 @@
+import os
+import sys
+from os.path import dirname, join
+
+import pytest
+
+from conftest import registered_classes
+
+TOOL = '''from bpy.types import Operator
+class FEATURE_OT_{0}(Operator):
+    bl_label = "{0}"
+'''
+
+def make_feature(init_path: str, is_broken: bool) -> None:
+    folder = join(dirname(init_path), 'nodes')
+    os.makedirs(folder)
+    open(join(folder, '__init__.py'), 'w').close()
+    for name in ('a', 'b'):
+        with open(join(folder, f'{name}.py'), 'w') as f: f.write(TOOL.format(name))
+    if is_broken:
+        with open(join(folder, 'zz_broken.py'), 'w') as f: f.write('def register(): raise RuntimeError("broken")\n')
+
+def test_failed_activation_leaves_nothing_registered(make_addon):
+    init_path, package, addon_manager = make_addon()
+    make_feature(init_path, is_broken=True)
+    feature_group = sys.modules[f'{package}.manager.core.feature_group']
+
+    addon = addon_manager.AddonManager(init_path, ['operators'], package, feature_groups=[feature_group.FeatureGroup('nodes', ['nodes'])])
+    addon.register()
+    registered = registered_classes(package)
+
+    with pytest.raises(RuntimeError): addon.activate_feature('nodes')
+
+    assert not addon.is_feature_active('nodes')
+    assert registered_classes(package) == registered
+    assert not [name for name in sys.modules if name.startswith(f'{package}.nodes.')]
+
+def test_activation_and_deactivation(make_addon):
+    init_path, package, addon_manager = make_addon()
+    make_feature(init_path, is_broken=False)
+    feature_group = sys.modules[f'{package}.manager.core.feature_group']
+
+    addon = addon_manager.AddonManager(init_path, ['operators'], package, feature_groups=[feature_group.FeatureGroup('nodes', ['nodes'])])
+    addon.register()
+    registered = registered_classes(package)
+
+    assert addon.activate_feature('nodes')
+    assert {cls.__name__ for cls in registered_classes(package)} - {cls.__name__ for cls in registered} == {'FEATURE_OT_a', 'FEATURE_OT_b'}
+
+    assert addon.deactivate_feature('nodes')
+    assert not [name for name in sys.modules if name.startswith(f'{package}.nodes.')]
+    addon.unregister()
@@ -0,0 +1,97 @@
+import sys
+import itertools
+from os.path import dirname, join
+
+import pytest
+
+import bpy
+from manager.core.dependency_graph import DependencyGraph
+from manager.core.hot_reload import HotReloader
+
+from conftest import registered_classes
+
+_counter = itertools.count()
+
+def test_dependents_are_sorted_after_their_imports():
+    graph = DependencyGraph()
+    graph.add('c', ['b'])
+    graph.add('b', ['a'])
+    graph.add('a', [])
+    graph.add('other', [])
+
+    assert graph.affected(['a']) == ['a', 'b', 'c']
+    assert graph.affected(['b']) == ['b', 'c']
+    assert graph.affected(['other']) == ['other']
+    assert graph.affected(['unknown']) == []
+
+def test_replaced_imports_update_the_dependents():
+    graph = DependencyGraph()
+    graph.add('a', [])
+    graph.add('b', ['a'])
+    graph.add('b', [])
+
+    assert graph.affected(['a']) == ['a']
+
+def test_cycle_keeps_the_order_of_addition():
+    graph = DependencyGraph()
+    graph.add('base', [])
+    graph.add('x', ['base', 'y'])
+    graph.add('y', ['x'])
+
+    assert graph.affected(['base']) == ['base', 'x', 'y']
+
+@pytest.fixture
+def package(tmp_path, monkeypatch):
+    """Create a package where 'b' imports 'a' and 'c' is independent"""
+    name = f'test_reload_{next(_counter)}'
+    root = tmp_path / name
+    root.mkdir()
+    (root / '__init__.py').write_text('')
+    (root / 'a.py').write_text('VALUE = 1\n')
+    (root / 'b.py').write_text('from . import a\nVALUE = a.VALUE\n')
+    (root / 'c.py').write_text('VALUE = 1\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    __import__(f'{name}.b')
+    __import__(f'{name}.c')
+    yield name, root
+    for mdl in [mdl for mdl in sys.modules if mdl == name or mdl.startswith(name + '.')]: del sys.modules[mdl]
+
+def test_changed_module_is_reloaded_with_its_dependents(package):
+    name, root = package
+    reloader = HotReloader(name)
+    assert reloader.plan() == []
+
+    (root / 'a.py').write_text('VALUE = 200\n')
+    assert reloader.changed() == [f'{name}.a']
+
+    names = reloader.plan()
+    assert names == [f'{name}.a', f'{name}.b']
+
+    reloader.reload(names)
+    assert sys.modules[f'{name}.b'].VALUE == 200
+    assert reloader.plan() == [] #再読込した状態が基準になる
+
+def test_failed_reload_registers_the_modules_again(make_addon):
+    init_path, package, addon_manager = make_addon()
+    flag = f'{package}_flag'
+    module = join(dirname(init_path), 'operators', 'zz_flag.py')
+    source = f'import bpy\ndef register(): bpy.context.scene.{flag} = True\ndef unregister(): del bpy.context.scene.{flag}\n'
+    with open(module, 'w') as f: f.write(source)
+
+    addon = addon_manager.AddonManager(init_path, ['operators'], package, is_debug_mode=True)
+    addon.register()
+    classes = registered_classes(package)
+
+    with open(module, 'w') as f: f.write(source + 'def broken(:\n')
+    for _ in range(2): #失敗したモジュールは次の呼び出しで再び読み込まれる(unregister()は一度だけ呼ばれる)
+        with pytest.raises(SyntaxError): addon.reload_changed()
+        assert getattr(bpy.context.scene, flag)
+        assert registered_classes(package) == classes
+
+    with open(module, 'w') as f: f.write(source + '# fixed\n')
+    assert addon.reload_changed() == [f'{package}.operators.zz_flag']
+    assert getattr(bpy.context.scene, flag)
+
+    addon.unregister()
+    assert not hasattr(bpy.context.scene, flag)
@@ -0,0 +1,43 @@
+import pytest
+
+from bpy import context
+from manager.core.keymap_manager import Key, KeymapManager
+
+class TEST_OT_a:
+    bl_idname = 'test.a'
+
+class TEST_OT_b:
+    bl_idname = 'test.b'
+
+@pytest.fixture
+def manager():
+    KeymapManager.reset()
+    yield KeymapManager()
+    KeymapManager.reset()
+
+def items() -> list[str]:
+    return [item.idname for keymap in context.window_manager.keyconfigs.addon.keymaps.values() for item in keymap.keymap_items]
+
+def test_delete_pair_and_operator(manager):
+    kms = manager.add([Key(TEST_OT_a, 'A'), Key(TEST_OT_a, 'B'), Key(TEST_OT_b, 'C')])
+
+    assert manager.delete(kms[0])
+    assert not manager.delete(kms[0])
+    assert manager.delete(TEST_OT_a)
+    assert items() == ['test.b']
+
+def test_delete_owner(manager):
+    with manager.owner('addon.a'): manager.add(Key(TEST_OT_a, 'A'))
+    with manager.owner('addon.b'): manager.add(Key(TEST_OT_b, 'B'))
+
+    assert manager.delete_owner('addon.a') == 1
+    assert items() == ['test.b']
+    assert not manager.delete(TEST_OT_a)
+
+def test_update_removes_keys_that_are_not_declared_again(manager):
+    with manager.owner('addon.a'): manager.add([Key(TEST_OT_a, 'A'), Key(TEST_OT_b, 'B')])
+
+    manager.begin_update(['addon.a'])
+    with manager.owner('addon.a'): manager.add(Key(TEST_OT_a, 'A'))
+    assert manager.commit_update() == {'added': 0, 'kept': 1, 'removed': 1}
+    assert items() == ['test.a']
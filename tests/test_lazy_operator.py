@@ -0,0 +1,33 @@
+from os.path import join
+
+from manager.core.lazy_operator import LazyOperator
+
+OPERATOR = '''from bpy.types import Operator
+
+class A(Operator):
+    bl_idname = 'test.a'
+    bl_label = 'A'
+
+    def execute(self, context): return {'FINISHED'}
+'''
+
+def parse(tmp_path, source: str, class_names: list[str]):
+    path = join(str(tmp_path), 'module.py')
+    with open(path, 'w') as f: f.write(source)
+    return LazyOperator.parse(path, 'addon.module', class_names)
+
+def test_operators_are_read(tmp_path):
+    specs = parse(tmp_path, OPERATOR, ['A'])
+    assert specs is not None and [(s.name, s.attributes['bl_idname']) for s in specs] == [('A', 'test.a')]
+
+def test_module_without_operators_is_imported(tmp_path):
+    assert parse(tmp_path, 'VALUE = 1\n', []) is None
+
+def test_classes_missed_by_the_scanner_are_imported(tmp_path):
+    #スキャナーが一部のクラスしか見つけなかった場合、遅延読み込みするとそのクラスが登録されない
+    source = OPERATOR + '\nBase = Operator\n\nclass B(Base):\n    bl_idname = "test.b"\n'
+    assert parse(tmp_path, source, ['A']) is None
+
+def test_disabled_operators_are_not_loaded(tmp_path):
+    source = 'from bpy.types import Operator\nfrom .manager import disable\n\n@disable\nclass A(Operator):\n    bl_idname = "test.a"\n'
+    assert parse(tmp_path, source, ['A']) == []
@@ -0,0 +1,54 @@
+import pytest
+
+from manager.core.properties_manager import PropertiesManager
+
+def group(name: str, module: str = 'addon.props') -> type:
+    return type(name, (), {'__module__': module})
+
+@pytest.fixture
+def manager():
+    PropertiesManager.reset()
+    manager = PropertiesManager()
+    manager.set_name('addon')
+    yield manager
+    PropertiesManager.reset()
+
+def test_same_property_group_is_kept(manager):
+    Scene = type('Scene', (), {})
+    Settings = group('Settings')
+    with manager.owner('addon.props'): manager.add(Scene, ('settings', Settings))
+
+    manager.begin_update(['addon.props'])
+    with manager.owner('addon.props'): manager.add(Scene, ('settings', Settings))
+    assert manager.commit_update() == {'added': 0, 'changed': 0, 'kept': 1, 'removed': 0}
+
+def test_reloaded_property_group_is_changed(manager):
+    Scene = type('Scene', (), {})
+    Settings = group('Settings')
+    with manager.owner('addon.props'): manager.add(Scene, ('settings', Settings))
+
+    #再読込では古いクラスを解除する前にプロパティを削除し、同じ名前の別のクラスで追加し直す
+    assert manager.detach([Settings]) == 1
+    assert not hasattr(Scene, 'addon_settings')
+
+    manager.begin_update(['addon.props'])
+    with manager.owner('addon.props'): manager.add(Scene, ('settings', group('Settings')))
+    assert manager.commit_update() == {'added': 0, 'changed': 1, 'kept': 0, 'removed': 0}
+    assert hasattr(Scene, 'addon_settings')
+
+def test_detached_property_that_is_not_added_again_is_removed(manager):
+    Scene = type('Scene', (), {})
+    Settings = group('Settings')
+    with manager.owner('addon.props'): manager.add(Scene, ('settings', Settings))
+    manager.detach([Settings])
+
+    manager.begin_update(['addon.props'])
+    assert manager.commit_update() == {'added': 0, 'changed': 0, 'kept': 0, 'removed': 1}
+
+def test_other_property_group_is_changed(manager):
+    Scene = type('Scene', (), {})
+    with manager.owner('addon.props'): manager.add(Scene, ('settings', group('Settings')))
+
+    manager.begin_update(['addon.props'])
+    with manager.owner('addon.props'): manager.add(Scene, ('settings', group('OtherSettings')))
+    assert manager.commit_update() == {'added': 0, 'changed': 1, 'kept': 0, 'removed': 0}
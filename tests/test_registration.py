@@ -0,0 +1,36 @@
+from os.path import dirname, join
+
+import pytest
+
+from conftest import registered_classes
+
+def test_register_rolls_back_when_a_module_fails(make_addon):
+    init_path, package, addon_manager = make_addon()
+    with open(join(dirname(init_path), 'operators', 'zz_broken.py'), 'w') as f:
+        f.write('def register(): raise RuntimeError("broken")\n')
+
+    addon = addon_manager.AddonManager(init_path, ['operators'], package)
+    with pytest.raises(RuntimeError): addon.register()
+
+    assert registered_classes(package) == []
+
+def test_register_and_unregister(make_addon):
+    init_path, package, addon_manager = make_addon()
+
+    addon = addon_manager.AddonManager(init_path, ['operators'], package)
+    addon.register()
+    assert registered_classes(package)
+
+    addon.unregister()
+    assert registered_classes(package) == []
+
+def test_failed_module_is_reported_and_skipped(make_addon):
+    init_path, package, addon_manager = make_addon()
+    broken = join(dirname(init_path), 'operators', 'zz_broken.py')
+    with open(broken, 'w') as f: f.write('raise ValueError("broken")\n')
+
+    addon = addon_manager.AddonManager(init_path, ['operators'], package)
+    addon.register()
+
+    assert registered_classes(package)
+    assert [(f.module, f.path, f.error) for f in addon.import_report.failures] == [(f'{package}.operators.zz_broken', broken, 'ValueError')]
@@ -0,0 +1,33 @@
+from os.path import join
+
+import pytest
+
+from manager.core.static_scan import StaticScanner
+
+#Blenderでは'bpy.types'のクラスの__module__は'bpy_types'になる
+BlenderOperator = type('Operator', (), {'__module__': 'bpy_types'})
+BlenderPanel = type('Panel', (), {'__module__': 'bpy_types'})
+
+def scan(tmp_path, source: str) -> list[str]:
+    path = join(str(tmp_path), 'module.py')
+    with open(path, 'w') as f: f.write(source)
+    return StaticScanner([BlenderOperator, BlenderPanel], 'addon').scan(path).classes
+
+@pytest.mark.parametrize('source', [
+    'from bpy.types import Operator\nclass A(Operator): pass\n',
+    'import bpy\nclass A(bpy.types.Operator): pass\n',
+    'from bpy import types\nclass A(types.Operator): pass\n',
+    'import bpy.types as t\nclass A(t.Operator): pass\n',
+])
+def test_targets_use_the_import_names_of_bpy_types(tmp_path, source):
+    assert scan(tmp_path, source) == ['A']
+
+def test_alias_of_a_target_is_a_target(tmp_path):
+    assert scan(tmp_path, 'from bpy.types import Operator\nBase = Operator\nclass B(Base): pass\n') == ['B']
+
+def test_unresolved_names_are_imported(tmp_path):
+    assert scan(tmp_path, 'Base = make_base()\nclass B(Base): pass\n') == ['B']
+    assert scan(tmp_path, 'def f():\n    pass\nclass B(Undefined): pass\n') == ['B']
+
+def test_provable_non_targets_are_skipped(tmp_path):
+    assert scan(tmp_path, 'from collections import OrderedDict\nclass A(dict): pass\nclass B(OrderedDict): pass\nclass C(A): pass\n') == []